@@ -0,0 +1,128 @@
+# bulk_pricing.py
+
+import csv
+import json
+from decimal import Decimal
+
+from currency_manager import (
+    EXCHANGE_RATE, parse_price, format_amount, round_price, bgn_to_eur, eur_to_bgn
+)
+from session_manager import write_session_file
+
+# Repricing operations
+OP_RATE = "rate"                # recompute the converted column with a (new) exchange rate
+OP_PERCENT = "percent"          # change prices by a percentage
+OP_PRICE_LIST = "price_list"    # set prices from a {key: price} mapping
+
+# Direction follows the CurrencyManager modes
+BGN_TO_EUR = "bgn_to_eur"
+EUR_TO_BGN = "eur_to_bgn"
+MANUAL = "manual"
+
+class PriceColumns:
+    """
+    Parsed BGN/EUR prices of a label list, one Decimal (or None for an empty
+    price) per label. All repricing math runs over these columns in one pass;
+    the labels are only touched again when the results are written back.
+    """
+    def __init__(self, labels, indices=None):
+        self.indices = list(range(len(labels))) if indices is None else [i for i in indices if 0 <= i < len(labels)]
+        self.bgn = [parse_price(labels[i].get("bgn", {}).get("text", ""), "bgn") for i in self.indices]
+        self.eur = [parse_price(labels[i].get("eur", {}).get("text", ""), "eur") for i in self.indices]
+        self.keys = [label_key(labels[i]) for i in self.indices]
+
+def label_key(label):
+    # Price lists match on the product SKU when the label carries one, else on the main text
+    sku = label.get("sku")
+    if sku:
+        return str(sku).strip().lower()
+    return " ".join(label.get("main", {}).get("text", "").split()).lower()
+
+def _scale(column, factor):
+    return [round_price(v * factor) if v is not None else None for v in column]
+
+def _convert(column, direction, rate, target):
+    """Converted column; where the source price is empty the target keeps its own price."""
+    convert = bgn_to_eur if direction == BGN_TO_EUR else eur_to_bgn
+    return [convert(v, rate) if v is not None else old for v, old in zip(column, target)]
+
+def reprice(labels, operation, value=None, direction=BGN_TO_EUR, rate=EXCHANGE_RATE, indices=None):
+    """
+    Compute new prices for labels (or only for indices) without modifying them.
+    - OP_RATE: value is ignored, the target column is recomputed from the source with rate.
+    - OP_PERCENT: value is the change in percent (e.g. -10 or "2.5").
+    - OP_PRICE_LIST: value is a {key: Decimal} mapping of source prices (see label_key).
+    direction picks the source column (bgn_to_eur / eur_to_bgn); manual changes both
+    columns independently and never converts.
+    Returns {index: {"bgn": text, "eur": text}} for labels whose prices change.
+    """
+    cols = PriceColumns(labels, indices)
+    rate = Decimal(str(rate))
+    source_is_bgn = direction != EUR_TO_BGN
+    src = cols.bgn if source_is_bgn else cols.eur
+
+    if operation == OP_RATE:
+        new_src = src
+    elif operation == OP_PERCENT:
+        factor = 1 + Decimal(str(value)) / 100
+        new_src = _scale(src, factor)
+    elif operation == OP_PRICE_LIST:
+        prices = value or {}
+        new_src = [round_price(prices[k]) if k in prices else v for k, v in zip(cols.keys, src)]
+    else:
+        raise ValueError(f"Unknown repricing operation: {operation}")
+
+    if direction == MANUAL:
+        new_bgn = new_src
+        new_eur = _scale(cols.eur, factor) if operation == OP_PERCENT else cols.eur
+    elif source_is_bgn:
+        new_bgn, new_eur = new_src, _convert(new_src, BGN_TO_EUR, rate, cols.eur)
+    else:
+        new_eur, new_bgn = new_src, _convert(new_src, EUR_TO_BGN, rate, cols.bgn)
+
+    changes = {}
+    for pos, idx in enumerate(cols.indices):
+        if new_bgn[pos] == cols.bgn[pos] and new_eur[pos] == cols.eur[pos]:
+            continue
+        changes[idx] = {"bgn": format_amount(new_bgn[pos]), "eur": format_amount(new_eur[pos])}
+    return changes
+
+def apply_price_changes(labels, changes):
+    """Write the result of reprice() into the label dicts. Returns the changed indices."""
+    for idx, prices in changes.items():
+        for which, text in prices.items():
+            labels[idx][which]["text"] = text
+    return sorted(changes)
+
+def load_price_list(path):
+    """
+    Read a price list CSV: first column is the SKU or product name, second the new price.
+    Both "," and ";" separated files are accepted; rows without a valid price are skipped.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        prices = {}
+        for row in csv.reader(f, dialect):
+            if len(row) < 2:
+                continue
+            price = parse_price(row[1], "bgn")
+            if price is None:
+                continue
+            prices[" ".join(row[0].split()).lower()] = price
+    return prices
+
+def reprice_session_file(path, operation, value=None, direction=BGN_TO_EUR, rate=EXCHANGE_RATE):
+    """Reprice every label of a saved session file and write it back once. Returns the change count."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    labels = data.get("labels", [])
+    changes = reprice(labels, operation, value, direction, rate)
+    if changes:
+        apply_price_changes(labels, changes)
+        write_session_file(path, data)
+    return len(changes)
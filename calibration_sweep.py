@@ -0,0 +1,61 @@
+# calibration_sweep.py
+
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QPen, QColor, QFont
+
+OFFSET = "offset"
+GAPS = "gaps"
+DEFAULT_STEP_MM = {OFFSET: 0.5, GAPS: 0.2}
+MARKER_INSET_MM = 3.0  # the marker frame sits this far inside the label when its delta is zero
+CAPTION_MM = 2.6       # text height of the cell captions
+CROSS_MM = 4.0
+
+PARAM_NAMES = {"sheet_left": "Ляво", "sheet_top": "Горе", "col_gap": "Колони", "row_gap": "Редове"}
+
+def _steps(count):
+    """Step indices centred on zero: 3 -> -1, 0, 1; 4 -> -2, -1, 0, 1."""
+    return [i - count // 2 for i in range(count)]
+
+def sweep_cells(kind, rows, cols, step):
+    """
+    One variant per slot, row-major: (parameter deltas, marker shift in mm).
+    OFFSET moves sheet_left by column and sheet_top by row. GAPS changes col_gap
+    by row and row_gap by column; a label then moves by its column (row) index
+    times the gap delta, so in the right row the markers sit alike all along it.
+    """
+    xs, ys = _steps(cols), _steps(rows)
+    cells = []
+    for row in range(rows):
+        for col in range(cols):
+            if kind == GAPS:
+                d_col, d_row = round(ys[row] * step, 3), round(xs[col] * step, 3)
+                cells.append(({"col_gap": d_col, "row_gap": d_row}, (col * d_col, row * d_row)))
+            else:
+                dx, dy = round(xs[col] * step, 3), round(ys[row] * step, 3)
+                cells.append(({"sheet_left": dx, "sheet_top": dy}, (dx, dy)))
+    return cells
+
+def zero_cell(rows, cols):
+    """Slot of the variant without any change."""
+    return (rows // 2) * cols + cols // 2
+
+def cell_caption(deltas):
+    return "  ".join(f"{PARAM_NAMES[key]} {value:+.2f}" for key, value in deltas.items())
+
+def paint_sweep(painter, rects, px_per_mm, cells):
+    """Marker frame, centre cross, number and deltas of every cell; rects are the slots in device units."""
+    inset = MARKER_INSET_MM * px_per_mm
+    arm = CROSS_MM / 2 * px_per_mm
+    font = QFont("Arial")
+    font.setPixelSize(max(1, round(CAPTION_MM * px_per_mm)))
+    painter.setFont(font)
+    painter.setPen(QPen(QColor("#111"), max(1.0, 0.25 * px_per_mm)))
+    for n, ((x, y, w, h), (deltas, (dx, dy))) in enumerate(zip(rects, cells), 1):
+        frame = QRectF(x + dx * px_per_mm + inset, y + dy * px_per_mm + inset, w - 2 * inset, h - 2 * inset)
+        painter.drawRect(frame)
+        c = frame.center()
+        painter.drawLine(QPointF(c.x() - arm, c.y()), QPointF(c.x() + arm, c.y()))
+        painter.drawLine(QPointF(c.x(), c.y() - arm), QPointF(c.x(), c.y() + arm))
+        text_box = frame.adjusted(inset / 2, inset / 4, -inset / 2, -inset / 4)
+        painter.drawText(text_box, Qt.AlignHCenter | Qt.AlignTop, f"№{n}")
+        painter.drawText(text_box, Qt.AlignHCenter | Qt.AlignBottom, cell_caption(deltas))
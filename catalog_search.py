@@ -0,0 +1,161 @@
+# catalog_search.py
+
+from PyQt5.QtWidgets import (
+    QCompleter, QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QListWidget, QListWidgetItem,
+    QPushButton, QLabel, QFileDialog, QAbstractItemView, QMessageBox
+)
+from PyQt5.QtCore import QObject, QEvent, QModelIndex, QStringListModel, Qt, pyqtSignal
+
+from currency_manager import format_amount
+
+MIN_QUERY_LEN = 2
+
+def product_caption(product):
+    price = format_amount(product.get("bgn"))
+    caption = product["name"]
+    if product.get("second"):
+        caption += f" – {product['second']}"
+    if price:
+        caption += f"   [{price} лв.]"
+    return caption
+
+class CatalogCompleter(QObject):
+    """
+    Typeahead for a text field (QTextEdit or QLineEdit) backed by a ProductCatalog.
+    Every edit runs one prepared FTS query; picking an entry emits product_chosen(dict).
+    """
+    product_chosen = pyqtSignal(dict)
+
+    def __init__(self, text_widget, catalog, limit=12, parent=None):
+        super().__init__(parent or text_widget)
+        self.widget = text_widget
+        self.catalog = catalog
+        self.limit = limit
+        self._results = []
+        self.model = QStringListModel(self)
+        self.completer = QCompleter(self.model, self)
+        self.completer.setWidget(text_widget)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.completer.activated[QModelIndex].connect(self._on_activated)
+        # Installed after QCompleter's own filter, so it runs first: Enter picks the
+        # entry instead of reaching a multi-line QTextEdit as a newline
+        self.completer.popup().installEventFilter(self)
+        if hasattr(text_widget, "toPlainText"):
+            text_widget.textChanged.connect(lambda: self._on_text_changed(text_widget.toPlainText()))
+        else:
+            text_widget.textEdited.connect(self._on_text_changed)
+
+    def _on_text_changed(self, text):
+        popup = self.completer.popup()
+        if not self.widget.hasFocus() or len(text.strip()) < MIN_QUERY_LEN:
+            popup.hide()
+            return
+        self._results = self.catalog.search(text, limit=self.limit)
+        if not self._results:
+            popup.hide()
+            return
+        self.model.setStringList([product_caption(p) for p in self._results])
+        rect = self.widget.cursorRect() if hasattr(self.widget, "cursorRect") else self.widget.rect()
+        rect.setWidth(max(self.widget.width(), 360))
+        self.completer.complete(rect)
+
+    def _on_activated(self, index):
+        row = index.row()
+        if 0 <= row < len(self._results):
+            self.product_chosen.emit(self._results[row])
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            popup = self.completer.popup()
+            index = popup.currentIndex()
+            popup.hide()
+            if index.isValid():
+                self._on_activated(index)
+            return True
+        return super().eventFilter(obj, event)
+
+class CatalogSearchDialog(QDialog):
+    """Search the catalog and create labels from the selected results."""
+    def __init__(self, catalog, parent=None, sync_callback=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.sync_callback = sync_callback  # sync_callback(export_path, delete_missing) -> summary text
+        self.setWindowTitle("Каталог с продукти")
+        self.setMinimumSize(520, 480)
+        layout = QVBoxLayout(self)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Търси продукт…")
+        self.search_edit.textChanged.connect(self._run_search)
+        layout.addWidget(self.search_edit)
+
+        self.results = QListWidget()
+        self.results.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        layout.addWidget(self.results, 1)
+
+        self.info = QLabel()
+        layout.addWidget(self.info)
+
+        btn_row = QHBoxLayout()
+        import_btn = QPushButton("Импорт CSV…")
+        import_btn.clicked.connect(self._import_csv)
+        self.create_btn = QPushButton("Създай етикети")
+        self.create_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Затвори")
+        cancel_btn.clicked.connect(self.reject)
+        btn_row.addWidget(import_btn)
+        if sync_callback is not None:
+            sync_btn = QPushButton("Синхронизация с ERP…")
+            sync_btn.setToolTip("Прилага само променените редове от нощния експорт")
+            sync_btn.clicked.connect(self._sync_export)
+            btn_row.addWidget(sync_btn)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.create_btn)
+        btn_row.addWidget(cancel_btn)
+        layout.addLayout(btn_row)
+        self._update_info()
+
+    def _update_info(self):
+        self.info.setText(f"Продукти в каталога: {self.catalog.count()}")
+
+    def _run_search(self, text):
+        self.results.clear()
+        for product in self.catalog.search(text, limit=200):
+            item = QListWidgetItem(product_caption(product))
+            item.setData(Qt.UserRole, product)
+            self.results.addItem(item)
+        self.results.selectAll()
+
+    def _import_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт на продукти", "", "CSV (*.csv *.txt)")
+        if not path:
+            return
+        try:
+            count = self.catalog.import_csv(path)
+        except Exception as e:
+            QMessageBox.warning(self, "Грешка", f"Неуспешен импорт:\n{e}")
+            return
+        QMessageBox.information(self, "Успех", f"Импортирани продукти: {count}")
+        self._update_info()
+        self._run_search(self.search_edit.text())
+
+    def _sync_export(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Експорт от ERP", "", "Експорт (*.csv *.txt *.sqlite *.sqlite3 *.db)")
+        if not path:
+            return
+        delete_missing = QMessageBox.question(
+            self, "Синхронизация", "Да изтрия ли от каталога продуктите, които липсват в експорта?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes
+        try:
+            summary = self.sync_callback(path, delete_missing)
+        except Exception as e:
+            QMessageBox.warning(self, "Грешка", f"Неуспешна синхронизация:\n{e}")
+            return
+        QMessageBox.information(self, "Синхронизация", summary)
+        self._update_info()
+        self._run_search(self.search_edit.text())
+
+    def selected_products(self):
+        items = sorted(self.results.selectedItems(), key=self.results.row)
+        return [item.data(Qt.UserRole) for item in items]
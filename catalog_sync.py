@@ -0,0 +1,169 @@
+# catalog_sync.py
+
+import sys
+import csv
+import json
+import sqlite3
+
+from currency_manager import EXCHANGE_RATE, CurrencyManager
+from price_table import PriceTable
+from product_catalog import ProductCatalog, db_row, fill_label_converted, product_from_row
+from session_manager import session_files, write_session_file
+
+EXPORT_TABLE = "products"
+
+def _normalize_record(record):
+    rec = {(k or "").strip().lower(): ("" if v is None else str(v).strip()) for k, v in record.items()}
+    return {k: rec.get(k, "") for k in ("sku", "name", "second", "bgn", "eur", "unit", "updated_at")}
+
+def read_export(path, table=EXPORT_TABLE):
+    """
+    Yield normalized product records from an ERP/POS export.
+    A .csv/.txt file needs a header row; a SQLite file needs a table (default "products")
+    with the same column names. An optional "updated_at" column speeds up change detection.
+    """
+    if path.lower().endswith((".csv", ".txt")):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            for record in csv.DictReader(f, dialect=dialect):
+                yield _normalize_record(record)
+    else:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            conn.row_factory = sqlite3.Row
+            for row in conn.execute(f'SELECT * FROM "{table}"'):
+                yield _normalize_record(dict(row))
+        finally:
+            conn.close()
+
+class SyncResult:
+    """Summary of one sync run; reprint lists {"session", "index", "sku"} entries."""
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self.changed_skus = set()
+        self.reprint = []
+
+    def summary(self):
+        return (f"Нови: {self.inserted}, променени: {self.updated}, изтрити: {self.deleted}, "
+                f"без промяна: {self.unchanged}, етикети за повторен печат: {len(self.reprint)}")
+
+class CatalogSync:
+    """
+    Incremental import of a full nightly export into the ProductCatalog.
+    Rows are compared with the previous import by updated_at (when the export has it)
+    and by content hash; only new, changed and removed products are written, and only
+    labels linked (by "sku") to changed products are refreshed. Refreshed labels no
+    longer match their print history, so "print only changed" picks them up.
+    Products missing from the export are deleted only with delete_missing=True,
+    since the catalog may also hold products imported by hand.
+    A price a product lacks is converted like a catalog fill does: in the session's
+    own conversion mode, or mode for the in-memory labels and older sessions.
+    """
+    def __init__(self, catalog, delete_missing=False, mode=CurrencyManager.BGN_TO_EUR, rate=EXCHANGE_RATE):
+        self.catalog = catalog
+        self.delete_missing = delete_missing
+        self.mode = mode
+        self.rate = rate
+
+    def sync(self, export_path, labels=None, labels_session="", session_paths=(), table=EXPORT_TABLE,
+             price_table=None):
+        """
+        Apply the export to the catalog, then refresh linked labels in the in-memory
+        labels list (reported under labels_session) and in the given session files.
+        price_table, when given, holds the current links of labels and gets the changed
+        products it has rows for.
+        """
+        result = SyncResult()
+        known = self.catalog.sync_state()
+        seen = set()
+        upserts = []
+        changed_products = {}
+        for record in read_export(export_path, table):
+            sku = record["sku"]
+            if not sku or sku in seen:
+                continue
+            seen.add(sku)
+            previous = known.get(sku)
+            # Same non-empty updated_at as last time: the ERP did not touch the row
+            if previous and record["updated_at"] and previous[1] == record["updated_at"] and previous[0]:
+                result.unchanged += 1
+                continue
+            row = db_row(record)
+            if previous and previous[0] == row[6]:
+                result.unchanged += 1
+                if previous[1] != row[7]:
+                    upserts.append(row)  # keep updated_at current, content is the same
+                continue
+            if previous:
+                result.updated += 1
+            else:
+                result.inserted += 1
+            upserts.append(row)
+            changed_products[row[0]] = product_from_row(row[:6])
+
+        deleted = [sku for sku in known if sku not in seen] if self.delete_missing else []
+        self.catalog.apply_rows(upserts, deleted)
+        result.deleted = len(deleted)
+        result.changed_skus = set(changed_products)
+
+        if changed_products:
+            if price_table is not None:
+                for sku, product in changed_products.items():
+                    if price_table.find_sku(sku) is not None:
+                        price_table.upsert_product(product)
+            if labels is not None:
+                result.reprint += [{"session": labels_session, "index": idx, "sku": sku}
+                                   for idx, sku in refresh_labels(labels, changed_products, self.mode, self.rate,
+                                                                  price_table)]
+            for path in session_paths:
+                result.reprint += [{"session": path, "index": idx, "sku": sku}
+                                   for idx, sku in refresh_session_file(path, changed_products, self.mode, self.rate)]
+        return result
+
+def refresh_labels(labels, products, mode=CurrencyManager.BGN_TO_EUR, rate=EXCHANGE_RATE, price_table=None):
+    """
+    Rewrite texts of labels linked to products {sku: product}. Returns [(index, sku)] that changed.
+    Labels are found through the price table's sku -> label links (linked here when not given).
+    """
+    links = price_table if price_table is not None else PriceTable().link_labels(labels)
+    changed = []
+    for sku, product in products.items():
+        for idx in links.labels_for(sku):
+            label = labels[idx]
+            before = [label.get(k, {}).get("text", "") for k in ("main", "second", "bgn", "eur")]
+            fill_label_converted(label, product, mode, rate)
+            after = [label[k]["text"] for k in ("main", "second", "bgn", "eur")]
+            if before != after:
+                changed.append((idx, label["sku"]))
+    return sorted(changed)
+
+def refresh_session_file(path, products, mode=CurrencyManager.BGN_TO_EUR, rate=EXCHANGE_RATE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    changed = refresh_labels(data.get("labels", []), products, data.get("conversion_mode", mode), rate)
+    if changed:
+        write_session_file(path, data)
+    return changed
+
+if __name__ == "__main__":
+    # Nightly use: python catalog_sync.py [--delete-missing] <export.csv|export.sqlite> [table]
+    args = [a for a in sys.argv[1:] if a != "--delete-missing"]
+    if not args:
+        print("Употреба: catalog_sync.py [--delete-missing] <експорт.csv | експорт.sqlite> [таблица]")
+        sys.exit(2)
+    catalog = ProductCatalog()
+    result = CatalogSync(catalog, delete_missing="--delete-missing" in sys.argv).sync(
+        args[0], session_paths=session_files(), table=args[1] if len(args) > 1 else EXPORT_TABLE)
+    catalog.close()
+    print(result.summary())
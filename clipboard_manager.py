@@ -1,21 +1,27 @@
 # clipboard_manager.py
 
-from PyQt5.QtCore import QObject
-from PyQt5.QtWidgets import QShortcut
+import copy
+import json
+from PyQt5.QtCore import QObject, QMimeData
+from PyQt5.QtWidgets import QShortcut, QApplication
 from PyQt5.QtGui import QKeySequence
 
+# Custom MIME type used for label blocks on the system clipboard
+LABEL_MIME_TYPE = "application/x-labeltool-labels"
+
 class ClipboardManager(QObject):
     """
     Handles Ctrl+C / Ctrl+V copy-paste for a grid of label dicts,
-    using a SelectionManager to know which labels are selected.
-    Now also supports copy/paste from context menu on hovered index.
+    using a selection object (anything with get_selected()) to know which labels are selected.
+    Copies N labels as one block that keeps their relative row/col layout and
+    stores it on the system clipboard as JSON under LABEL_MIME_TYPE, so a block
+    can be pasted into another running instance as well.
     """
-    def __init__(self, parent_widget, labels, selection_manager, update_callback):
+    def __init__(self, parent_widget, labels, selection_manager, update_callback, cols=3):
         super().__init__(parent_widget)
         self.labels = labels
         self.selection = selection_manager
-        self.clipboard = None
-        self.clipboard_style = None
+        self.cols = max(1, int(cols))
         self.last_copied_idx = None  # For UI context (optional)
         self.update_callback = update_callback
 
@@ -23,57 +29,136 @@ class ClipboardManager(QObject):
         QShortcut(QKeySequence("Ctrl+C"), parent_widget, activated=self.copy)
         QShortcut(QKeySequence("Ctrl+V"), parent_widget, activated=self.paste)
 
-    # Copy first selected item (for keyboard shortcut)
+    # --- Block helpers ---
+    def _valid_indices(self, indices):
+        return sorted({idx for idx in indices if idx is not None and 0 <= idx < len(self.labels)})
+
+    def _block_cells(self, indices, style_only=False):
+        # Cells are stored relative to the top-left corner of the block
+        rows_cols = [divmod(idx, self.cols) for idx in indices]
+        top = min(r for r, _ in rows_cols)
+        left = min(c for _, c in rows_cols)
+        cells = []
+        for idx, (row, col) in zip(indices, rows_cols):
+            label = self.labels[idx]
+            if style_only:
+                label = {k: {kk: vv for kk, vv in v.items() if kk != "text"}
+                         for k, v in label.items() if isinstance(v, dict)}
+            cells.append({"row": row - top, "col": col - left, "label": label})
+        return cells
+
+    def top_left_index(self, indices):
+        indices = self._valid_indices(indices)
+        if not indices:
+            return None
+        top = min(idx // self.cols for idx in indices)
+        left = min(idx % self.cols for idx in indices)
+        return top * self.cols + left
+
+    # --- System clipboard ---
+    def _write_payload(self, kind, indices):
+        indices = self._valid_indices(indices)
+        if not indices:
+            return False
+        payload = {"kind": kind, "cols": self.cols, "cells": self._block_cells(indices, style_only=(kind == "style"))}
+        mime = QMimeData()
+        mime.setData(LABEL_MIME_TYPE, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        if kind == "labels":
+            # Plain text fallback for pasting into other applications
+            mime.setText("\n".join(self.labels[idx].get("main", {}).get("text", "") for idx in indices))
+        QApplication.clipboard().setMimeData(mime)
+        self.last_copied_idx = indices[0]
+        return True
+
+    def _read_raw(self):
+        mime = QApplication.clipboard().mimeData()
+        if mime is None or not mime.hasFormat(LABEL_MIME_TYPE):
+            return None
+        return bytes(mime.data(LABEL_MIME_TYPE))
+
+    def _read_payload(self):
+        raw = self._read_raw()
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if payload.get("kind") not in ("labels", "style") or not payload.get("cells"):
+            return None
+        return payload
+
+    # Copy the selection as a block (for keyboard shortcut)
     def copy(self):
-        idxs = self.selection.get_selected()
-        if not idxs:
-            return
-        self.copy_from_index(idxs[0])
+        self.copy_indices(self.selection.get_selected())
 
     # Copy the full label (from a specific index, e.g. hovered for context menu)
     def copy_from_index(self, idx):
-        if idx is None or idx < 0 or idx >= len(self.labels):
-            return
-        self.clipboard = {k: self.labels[idx][k].copy() for k in self.labels[idx]}
-        self.clipboard_style = None
-        self.last_copied_idx = idx
+        return self.copy_indices([idx])
+
+    def copy_indices(self, indices):
+        return self._write_payload("labels", indices)
 
     # Copy style only (for keyboard shortcut)
     def copy_style(self):
-        idxs = self.selection.get_selected()
-        if not idxs:
-            return
-        self.copy_style_from_index(idxs[0])
+        self.copy_style_indices(self.selection.get_selected())
 
     # Copy only style info from a specific index (for context menu)
     def copy_style_from_index(self, idx):
-        if idx is None or idx < 0 or idx >= len(self.labels):
-            return
-        self.clipboard_style = {k: {kk: vv for kk, vv in self.labels[idx][k].items() if kk != "text"} for k in self.labels[idx]}
-        self.clipboard = None
-        self.last_copied_idx = idx
+        return self.copy_style_indices([idx])
+
+    def copy_style_indices(self, indices):
+        return self._write_payload("style", indices)
 
     # Paste to current selection (for keyboard shortcut)
     def paste(self):
         idxs = self.selection.get_selected()
-        self.paste_to_indices(idxs)
+        self.paste_at(self.top_left_index(idxs), fill_indices=idxs)
 
     # Paste to a given list of indices (for context menu)
     def paste_to_indices(self, indices):
-        if not indices:
-            return
-        if self.clipboard:
-            for idx in indices:
-                if 0 <= idx < len(self.labels):
-                    for k in self.labels[idx]:
-                        self.labels[idx][k] = self.clipboard[k].copy()
-        elif self.clipboard_style:
-            for idx in indices:
-                if 0 <= idx < len(self.labels):
-                    for k in self.labels[idx]:
-                        for sk, vv in self.clipboard_style[k].items():
-                            self.labels[idx][k][sk] = vv
-        self.update_callback()
+        self.paste_at(self.top_left_index(indices), fill_indices=indices)
+
+    def paste_at(self, anchor_idx, fill_indices=None):
+        """
+        Paste the clipboard block with its top-left cell at anchor_idx.
+        A single copied label is pasted into every index of fill_indices instead.
+        Rows continue onto the following sheets only as far as the label list reaches
+        (the editor holds one sheet); cells outside the grid columns or past the last
+        label are dropped, and the list is never extended.
+        Returns the list of changed indices.
+        """
+        payload = self._read_payload()
+        if payload is None or anchor_idx is None:
+            return []
+        cells = payload["cells"]
+        fan_out = len(cells) == 1 and bool(fill_indices)
+        if fan_out:
+            targets = [(idx, 0) for idx in self._valid_indices(fill_indices)]
+        else:
+            anchor_row, anchor_col = divmod(anchor_idx, self.cols)
+            targets = []
+            for n, cell in enumerate(cells):
+                col = anchor_col + cell["col"]
+                idx = (anchor_row + cell["row"]) * self.cols + col
+                if col < self.cols and 0 <= idx < len(self.labels):
+                    targets.append((idx, n))
+        if not targets:
+            return []
+
+        changed = []
+        for idx, n in targets:
+            # Every fan-out target after the first needs its own copy of the decoded dict
+            label = copy.deepcopy(cells[n]["label"]) if fan_out and changed else cells[n]["label"]
+            if payload["kind"] == "labels":
+                self.labels[idx] = label
+            else:
+                for k, style in label.items():
+                    if isinstance(self.labels[idx].get(k), dict):
+                        self.labels[idx][k].update(style)
+            changed.append(idx)
+        self.update_callback(changed)
+        return changed
 
     def has_clipboard(self):
-        return bool(self.clipboard) or bool(self.clipboard_style)
+        return self._read_raw() is not None
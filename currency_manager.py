@@ -1,6 +1,62 @@
 from PyQt5.QtCore import QObject, QEvent, pyqtSignal
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import re
 
+EXCHANGE_RATE = Decimal("1.95583")  # BGN to EUR (fixed rate)
+CENT = Decimal("0.01")
+
+_BGN_SIGN_RE = re.compile(r"лв\.?$", re.IGNORECASE)
+_NON_NUMERIC_RE = re.compile(r"[^0-9.]")
+
+def strip_sign(text, which):
+    t = text.strip().replace(" ", "")
+    if which == "bgn":
+        t = _BGN_SIGN_RE.sub("", t)
+    elif which == "eur":
+        t = t.replace("€", "")
+    return t
+
+def clean_input(text):
+    t = _NON_NUMERIC_RE.sub("", text.replace(",", "."))
+    if t.count(".") > 1:
+        first = t.find(".")
+        t = t[:first+1] + t[first+1:].replace(".", "")
+    return t
+
+def parse_price(text, which):
+    """Parse a BGN/EUR field text into an exact Decimal, or None if it holds no number."""
+    clean = clean_input(strip_sign(text or "", which))
+    if not clean or clean == ".":
+        return None
+    try:
+        return Decimal(clean)
+    except InvalidOperation:
+        return None
+
+def round_price(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def format_amount(value):
+    # Stored label text: rounded half-up to cents, without trailing zeros ("12.50" -> "12.5")
+    if value is None:
+        return ""
+    s = f"{round_price(value):f}"
+    return s.rstrip("0").rstrip(".") if "." in s else s
+
+def bgn_to_eur(value, rate=EXCHANGE_RATE):
+    return round_price(value / rate)
+
+def eur_to_bgn(value, rate=EXCHANGE_RATE):
+    return round_price(value * rate)
+
+def convert_missing(bgn, eur, mode, rate=EXCHANGE_RATE):
+    """(bgn, eur) with an empty price converted from the other one, as typing does in that conversion mode."""
+    if eur is None and bgn is not None and mode in (CurrencyManager.BGN_TO_EUR, CurrencyManager.BOTH):
+        eur = bgn_to_eur(bgn, rate)
+    elif bgn is None and eur is not None and mode in (CurrencyManager.EUR_TO_BGN, CurrencyManager.BOTH):
+        bgn = eur_to_bgn(eur, rate)
+    return bgn, eur
+
 class CurrencyManager(QObject):
     price_converted = pyqtSignal(str, str)  # which ("bgn" or "eur"), value (as string)
 
@@ -14,7 +70,7 @@ class CurrencyManager(QObject):
         self.bgn_field = bgn_field
         self.eur_field = eur_field
         self.mode = self.BGN_TO_EUR
-        self.exchange_rate = 1.95583  # BGN to EUR
+        self.exchange_rate = EXCHANGE_RATE  # BGN to EUR
 
         self._last_clean = {"bgn": "", "eur": ""}
 
@@ -34,20 +90,10 @@ class CurrencyManager(QObject):
         return self.mode
 
     def _strip_sign(self, text, which):
-        t = text.strip().replace(" ", "")
-        if which == "bgn":
-            t = re.sub(r"лв\.?$", "", t, flags=re.IGNORECASE)
-        elif which == "eur":
-            t = t.replace("€", "")
-        return t
+        return strip_sign(text, which)
 
     def _clean_input(self, text):
-        t = text.replace(",", ".")
-        t = re.sub(r"[^0-9.]", "", t)
-        if t.count(".") > 1:
-            first = t.find(".")
-            t = t[:first+1] + t[first+1:].replace(".", "")
-        return t
+        return clean_input(text)
 
     def eventFilter(self, obj, event):
         if event.type() == QEvent.FocusIn:
@@ -74,7 +120,7 @@ class CurrencyManager(QObject):
         field = self.bgn_field if which == "bgn" else self.eur_field
         val = field.text()
         clean = self._clean_input(self._strip_sign(val, which))
-        value = float(clean) if clean else 0.0
+        value = parse_price(clean, which) or Decimal(0)
         self._last_clean[which] = clean
 
         formatted = self._format_bgn(value) if which == "bgn" else self._format_eur(value)
@@ -83,47 +129,27 @@ class CurrencyManager(QObject):
         field.blockSignals(False)
 
         # Conversion logic with signal
-        if self.mode == self.BGN_TO_EUR and which == "bgn":
-            eur_val = round(value / self.exchange_rate, 2)
-            self._last_clean["eur"] = f"{eur_val:.2f}".rstrip("0").rstrip(".")
-            eur_display = self._format_eur(eur_val) if eur_val else ""
-            self.eur_field.blockSignals(True)
-            self.eur_field.setText(eur_display)
-            self.eur_field.blockSignals(False)
-            self.price_converted.emit("eur", self._last_clean["eur"])
-        elif self.mode == self.EUR_TO_BGN and which == "eur":
-            bgn_val = round(value * self.exchange_rate, 2)
-            self._last_clean["bgn"] = f"{bgn_val:.2f}".rstrip("0").rstrip(".")
-            bgn_display = self._format_bgn(bgn_val) if bgn_val else ""
-            self.bgn_field.blockSignals(True)
-            self.bgn_field.setText(bgn_display)
-            self.bgn_field.blockSignals(False)
-            self.price_converted.emit("bgn", self._last_clean["bgn"])
-        elif self.mode == self.BOTH:
-            if which == "bgn":
-                eur_val = round(value / self.exchange_rate, 2)
-                self._last_clean["eur"] = f"{eur_val:.2f}".rstrip("0").rstrip(".")
-                eur_display = self._format_eur(eur_val) if eur_val else ""
-                self.eur_field.blockSignals(True)
-                self.eur_field.setText(eur_display)
-                self.eur_field.blockSignals(False)
-                self.price_converted.emit("eur", self._last_clean["eur"])
-            else:
-                bgn_val = round(value * self.exchange_rate, 2)
-                self._last_clean["bgn"] = f"{bgn_val:.2f}".rstrip("0").rstrip(".")
-                bgn_display = self._format_bgn(bgn_val) if bgn_val else ""
-                self.bgn_field.blockSignals(True)
-                self.bgn_field.setText(bgn_display)
-                self.bgn_field.blockSignals(False)
-                self.price_converted.emit("bgn", self._last_clean["bgn"])
+        if which == "bgn" and self.mode in (self.BGN_TO_EUR, self.BOTH):
+            self._set_converted("eur", bgn_to_eur(value, self.exchange_rate))
+        elif which == "eur" and self.mode in (self.EUR_TO_BGN, self.BOTH):
+            self._set_converted("bgn", eur_to_bgn(value, self.exchange_rate))
         # MANUAL: do nothing
 
+    def _set_converted(self, which, value):
+        field = self.bgn_field if which == "bgn" else self.eur_field
+        self._last_clean[which] = format_amount(value)
+        display = (self._format_bgn(value) if which == "bgn" else self._format_eur(value)) if value else ""
+        field.blockSignals(True)
+        field.setText(display)
+        field.blockSignals(False)
+        self.price_converted.emit(which, self._last_clean[which])
+
     def _format_bgn(self, value):
-        s = f"{value:.2f}".rstrip("0").rstrip(".")
+        s = format_amount(Decimal(value))
         return f"{s} лв." if s else ""
 
     def _format_eur(self, value):
-        s = f"{value:.2f}".rstrip("0").rstrip(".")
+        s = format_amount(Decimal(value))
         return f"€{s}" if s else ""
 
     def get_clean_bgn(self):
@@ -86,6 +86,13 @@ class FieldToolbar(QWidget):
         self.bg_color_btn.setToolTip("Цвят на фона")
         layout.addWidget(self.bg_color_btn)
 
+        # Auto-fit: shrink the font until the text fits the label
+        self.fit_btn = QToolButton()
+        self.fit_btn.setCheckable(True)
+        self.fit_btn.setText("↔")
+        self.fit_btn.setToolTip("Смали шрифта, за да се побере текстът")
+        layout.addWidget(self.fit_btn)
+
         layout.addStretch(1)
         self.setLayout(layout)
 
@@ -97,7 +104,8 @@ class FieldToolbar(QWidget):
             "italic": self.italic_btn.isChecked(),
             "align": Qt.AlignLeft,
             "font_color": "#222",
-            "bg_color": "#fff"
+            "bg_color": "#fff",
+            "fit": False
         }
         self._block_signals = False
 
@@ -106,6 +114,7 @@ class FieldToolbar(QWidget):
         self.font_size.valueChanged.connect(self._emit_style)
         self.bold_btn.toggled.connect(self._emit_style)
         self.italic_btn.toggled.connect(self._emit_style)
+        self.fit_btn.toggled.connect(self._emit_style)
         self.align_left.clicked.connect(lambda: self._set_align(Qt.AlignLeft))
         self.align_center.clicked.connect(lambda: self._set_align(Qt.AlignCenter))
         self.align_right.clicked.connect(lambda: self._set_align(Qt.AlignRight))
@@ -141,7 +150,8 @@ class FieldToolbar(QWidget):
                 Qt.AlignRight
             ),
             "font_color": self._state.get("font_color", "#222"),
-            "bg_color": self._state.get("bg_color", "#fff")
+            "bg_color": self._state.get("bg_color", "#fff"),
+            "fit": self.fit_btn.isChecked()
         }
         self.style_changed.emit(self._state.copy())
 
@@ -194,6 +204,7 @@ class FieldToolbar(QWidget):
             self.bold_btn.setChecked(style["bold"])
         if "italic" in style:
             self.italic_btn.setChecked(style["italic"])
+        self.fit_btn.setChecked(style.get("fit", False))
         if "align" in style:
             self._set_align(style["align"])
         if "font_color" in style:
@@ -2,24 +2,31 @@ import sys, os, json
 from functools import partial
 
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QMessageBox, QSizePolicy
+    QApplication, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QMessageBox, QSizePolicy,
+    QScrollArea, QComboBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QRectF
 
 from left_pane import LeftPaneWidget
-from preview_pane import PREVIEW_LABEL_SCALE, PreviewPaneWidget
+from preview_pane import PREVIEW_LABEL_SCALE, PreviewPaneWidget, FIT_PAGE, FIT_WIDTH
 
 from currency_manager import CurrencyManager
 from session_manager import SessionManager
-
-from label_drawing import draw_label_print
+from clipboard_manager import ClipboardManager
+from product_catalog import ProductCatalog
+from price_table import PriceTable
+from printer_profiles import printer_profiles, profile_from_printer
+from preflight import Preflight
+from catalog_search import CatalogCompleter
+
+from sheet_picture import SheetPictureCache
+from print_history import label_fingerprint, has_content
+from label_layout import QPainterBackend, layout_sheet, page_size_mm, render_pages
+from label_units import RECORD_DPI
+from sheet_settings import load_sheet_settings, sheet_settings_store
 
 MM_TO_PX = 72 / 25.4
 
-def sheet_settings_path():
-    from pathlib import Path
-    return os.path.join(str(Path.home()), "AppData", "Roaming", "LabelTool", "sheet_settings.json")
-
 def blank_label():
     return {
         "main":    {"text": "", "font": "Arial", "size": 15, "bold": False, "italic": False, "align": Qt.AlignCenter, "font_color": "#222", "bg_color": "#fff"},
@@ -29,18 +36,6 @@ def blank_label():
         "logo":    {"position": "без лого", "size": 24, "opacity": 1.0}
     }
 
-def load_sheet_settings():
-    path = sheet_settings_path()
-    print("Loading sheet settings from:", path)
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data  # <-- Return the whole dict, not just data.get("params", {})
-        except Exception:
-            return {}
-    return {}
-
 class LabelSheetEditor(QWidget):
     def __init__(self, fonts=None):
         super().__init__()
@@ -83,8 +78,28 @@ class LabelSheetEditor(QWidget):
             label_h_mm=self.label_h_mm,
             spacing_px=12
         )
-        right_panel.addWidget(QLabel("Кликни за да избереш. Кликни с десен бутон за меню."))
-        right_panel.addWidget(self.preview_pane, stretch=1)
+        preview_header = QHBoxLayout()
+        preview_header.addWidget(QLabel("Кликни за да избереш. Кликни с десен бутон за меню."))
+        preview_header.addStretch(1)
+        self.cb_zoom = QComboBox()
+        self.cb_zoom.setToolTip("Мащаб на прегледа (Ctrl + колелце)")
+        # Item data: a fit mode name or a zoom factor
+        self.cb_zoom.addItem("Цял лист", FIT_PAGE)
+        self.cb_zoom.addItem("По ширина", FIT_WIDTH)
+        for percent in (50, 75, 100, 150, 200):
+            self.cb_zoom.addItem(f"{percent}%", percent / 100)
+        self.cb_zoom.activated.connect(self.on_zoom_selected)
+        self.lbl_zoom = QLabel()
+        preview_header.addWidget(self.cb_zoom)
+        preview_header.addWidget(self.lbl_zoom)
+        right_panel.addLayout(preview_header)
+        self.preview_scroll = QScrollArea()
+        self.preview_scroll.setWidgetResizable(True)
+        self.preview_scroll.setMinimumSize(600, 400)
+        self.preview_scroll.setWidget(self.preview_pane)
+        self.preview_pane.zoom_changed.connect(self.on_preview_zoom_changed)
+        self.on_preview_zoom_changed(self.preview_pane.zoom())
+        right_panel.addWidget(self.preview_scroll, stretch=1)
         main_h.addLayout(right_panel, 1)
         self.setLayout(main_h)
 
@@ -93,6 +108,18 @@ class LabelSheetEditor(QWidget):
             self.left_pane.field_inputs['bgn'], self.left_pane.field_inputs['eur']
         )
         self.session_manager = SessionManager(self)
+        self.sheet_picture = SheetPictureCache(self)
+        self.clipboard_manager = ClipboardManager(self, self.labels, self, self.on_labels_pasted, cols=self.cols)
+        self.catalog = ProductCatalog()
+        self.price_table = PriceTable()
+        self.printer_profiles = printer_profiles()
+        self.preflight = Preflight(self)
+        self.preflight.issues_changed.connect(self.preview_pane.set_issues)
+        # Calibration edits arrive in memory; nothing rereads sheet_settings.json
+        sheet_settings_store().changed.connect(lambda _: self.refresh_preview())
+        self.left_pane.set_printer_profiles(self.printer_profiles.names(), self.printer_profiles.active)
+        self.catalog_completer = CatalogCompleter(self.left_pane.field_inputs['main'], self.catalog)
+        self.catalog_completer.product_chosen.connect(self.on_product_chosen)
 
         # --- Currency: Connect signal for preview update ---
         self.currency_manager.price_converted.connect(self.on_converted_price)
@@ -102,7 +129,18 @@ class LabelSheetEditor(QWidget):
         self.left_pane.style_changed.connect(self.on_field_style_changed)
         self.left_pane.conversion_changed.connect(self.currency_manager.set_mode)
         self.left_pane.print_clicked.connect(self.do_print)
+        self.left_pane.print_preview_clicked.connect(self.do_print_preview)
+        self.left_pane.print_changed_clicked.connect(self.do_print_changed)
+        self.left_pane.sheet_stock_clicked.connect(self.do_sheet_stock)
+        self.left_pane.print_queue_clicked.connect(self.do_print_queue)
+        self.left_pane.quick_print_clicked.connect(self.do_quick_print)
+        self.left_pane.save_profile_clicked.connect(self.do_save_printer_profile)
+        self.left_pane.printer_profile_selected.connect(self.printer_profiles.set_active)
         self.left_pane.pdf_clicked.connect(self.do_export_pdf)
+        self.left_pane.image_clicked.connect(self.do_export_image)
+        self.left_pane.zpl_clicked.connect(self.do_export_zpl)
+        self.left_pane.reprice_clicked.connect(self.do_reprice)
+        self.left_pane.catalog_clicked.connect(self.do_catalog_search)
 
         # --- Signal wiring: PREVIEW GRID <-> EDITOR LOGIC ---
         self.preview_pane.label_clicked.connect(self.on_label_clicked)
@@ -133,6 +171,44 @@ class LabelSheetEditor(QWidget):
         self.session_manager.save_session()
         self.refresh_preview()
 
+    def do_reprice(self):
+        from PyQt5.QtWidgets import QDialog
+        from reprice_dialog import RepriceDialog, SCOPE_SELECTED, SCOPE_SESSIONS
+        import bulk_pricing
+        dlg = RepriceDialog(self)
+        if dlg.exec_() != QDialog.Accepted:
+            return
+        op, value, rate, scope = dlg.get_request()
+        direction = self.currency_manager.get_mode()
+        indices = self.selected if scope == SCOPE_SELECTED else None
+        if op == bulk_pricing.OP_PRICE_LIST:
+            # Only labels the price list can match: linked to one of its SKUs, or matched by name
+            reachable = self.price_table.labels_for_keys(value or {})
+            indices = reachable if indices is None else sorted(set(indices) & set(reachable))
+        changes = bulk_pricing.reprice(self.labels, op, value, direction, rate, indices=indices)
+        count = len(changes)
+        if scope == SCOPE_SESSIONS:
+            from session_manager import session_files
+            for path in session_files(os.path.dirname(self.session_manager.session_path)):
+                if os.path.abspath(path) == os.path.abspath(self.session_manager.session_path):
+                    continue
+                try:
+                    count += bulk_pricing.reprice_session_file(path, op, value, direction, rate)
+                except (OSError, ValueError, KeyError, AttributeError):
+                    continue
+        self.apply_price_changes(changes)
+        QMessageBox.information(self, "Промяна на цени", f"Променени етикети: {count}")
+
+    def apply_price_changes(self, changes):
+        # One write-back, one session save and one repaint for the whole batch
+        if not changes:
+            return
+        from bulk_pricing import apply_price_changes
+        apply_price_changes(self.labels, changes)
+        self.update_edit_panel_from_selection()
+        self.session_manager.save_session()
+        self.refresh_preview()
+
     def on_field_edited(self, key, value):
         sel = self.selected
         if not sel:
@@ -157,6 +233,20 @@ class LabelSheetEditor(QWidget):
         # No toolbar anymore, but if you want to keep track of active_field for future use
         return super().eventFilter(obj, ev)
 
+    def on_zoom_selected(self, index):
+        data = self.cb_zoom.itemData(index)
+        if isinstance(data, float):
+            self.preview_pane.set_zoom_mode(None, data)
+        else:
+            self.preview_pane.set_zoom_mode(data)
+
+    def on_preview_zoom_changed(self, zoom):
+        self.lbl_zoom.setText(f"{zoom * 100:.0f}%")
+        pane = self.preview_pane
+        current = pane.zoom_mode or round(pane.manual_zoom, 2)
+        # Wheel zooms between the presets leave the combo blank
+        self.cb_zoom.setCurrentIndex(self.cb_zoom.findData(current))
+
     def on_label_clicked(self, idx, event):
         if event.modifiers() & Qt.ControlModifier:
             if idx in self.selected:
@@ -181,50 +271,129 @@ class LabelSheetEditor(QWidget):
         copystyle_action = menu.addAction("Копирай Стил")
         menu.addSeparator()
         paste_action = menu.addAction("Постави")
+        paste_action.setEnabled(self.clipboard_manager.has_clipboard())
         menu.addSeparator()
         delete_action = menu.addAction("Изчисти")
+        menu.addSeparator()
+        product_action = menu.addAction("Всички етикети на продукта")
+        product_action.setEnabled(bool(self.labels[idx].get("sku")))
+        find_action = menu.addAction("Намери етикети по продукт…")
         action = menu.exec_(self.preview_pane.mapToGlobal(event.pos()))
         sel = self.selected
+        # Right-click on a selected label acts on the whole selection (copied as one block)
+        targets = sel if idx in sel else [idx]
 
         if action == copy_action:
-            self.clipboard = {k: self.labels[idx][k].copy() for k in self.labels[idx]}
-            self.clipboard_style = None
+            self.clipboard_manager.copy_indices(targets)
         elif action == copystyle_action:
-            self.clipboard_style = {k: {kk: vv for kk, vv in self.labels[idx][k].items() if kk != "text"} for k in self.labels[idx]}
-            self.clipboard = None
+            self.clipboard_manager.copy_style_indices(targets)
         elif action == paste_action:
-            if idx not in sel:
-                if hasattr(self, 'clipboard') and self.clipboard:
-                    for k in self.labels[idx]:
-                        self.labels[idx][k] = self.clipboard[k].copy()
-                elif hasattr(self, 'clipboard_style') and self.clipboard_style:
-                    for k in self.labels[idx]:
-                        for sk, vv in self.clipboard_style[k].items():
-                            self.labels[idx][k][sk] = vv
-                self.selected = [idx]
-                self.update_edit_panel_from_selection()
-                self.refresh_preview()  # <-- Add this here
-            else:
-                if hasattr(self, 'clipboard') and self.clipboard:
-                    for idx2 in sel:
-                        for k in self.labels[idx2]:
-                            self.labels[idx2][k] = self.clipboard[k].copy()
-                elif hasattr(self, 'clipboard_style') and self.clipboard_style:
-                    for idx2 in sel:
-                        for k in self.labels[idx2]:
-                            for sk, vv in self.clipboard_style[k].items():
-                                self.labels[idx2][k][sk] = vv
-                self.update_edit_panel_from_selection()
-                self.refresh_preview()  # <-- And here
+            anchor = self.clipboard_manager.top_left_index(targets)
+            self.clipboard_manager.paste_at(anchor, fill_indices=targets)
+            return
         elif action == delete_action:
             for idx2 in sel:
                 self.labels[idx2] = blank_label()
+            self.relink_labels()
             self.update_edit_panel_from_selection()
             self.refresh_preview()  # <-- And here too, for consistency
+        elif action == product_action:
+            self.select_labels(self.price_table.labels_for(self.labels[idx]["sku"]))
+        elif action == find_action:
+            from PyQt5.QtWidgets import QInputDialog
+            text, ok = QInputDialog.getText(self, "Етикети по продукт", "Код (SKU) или име на продукт:")
+            if ok and text.strip() and not self.select_product_labels(text):
+                QMessageBox.information(self, "Етикети по продукт", "Няма етикети за този продукт.")
 
         self.session_manager.save_session()
 
+    def on_labels_pasted(self, indices):
+        if not indices:
+            return
+        self.relink_labels()
+        self.selected = list(indices)
+        self.ensure_at_least_one_selected()
+        self.update_edit_panel_from_selection()
+        self.refresh_preview()
+        self.session_manager.save_session()
+
+    def fill_labels_from_products(self, products, start_idx=None):
+        """Fill consecutive labels (from start_idx or the first selected) with catalog products."""
+        if start_idx is None:
+            start_idx = min(self.selected) if self.selected else 0
+        filled = []
+        for idx, product in zip(range(start_idx, len(self.labels)), products):
+            self.fill_from_product(idx, product)
+            filled.append(idx)
+        self.on_labels_pasted(filled)
+        return filled
+
+    def fill_from_product(self, idx, product):
+        """fill_label, with a price the product lacks converted in the current conversion mode."""
+        cm = self.currency_manager
+        row = self.price_table.upsert_product(product)
+        self.price_table.fill_label(self.labels[idx], row, cm.get_mode(), cm.exchange_rate)
+
+    def relink_labels(self):
+        """Relink the price table to the labels' SKUs; products not in it yet get their catalog row."""
+        self.price_table.link_labels(self.labels)
+        for label in self.labels:
+            sku = label.get("sku")
+            if sku and self.price_table.find_sku(sku) is None:
+                product = self.catalog.get(sku)
+                if product:
+                    self.price_table.upsert_product(product)
+
+    def select_product_labels(self, text):
+        """Select the labels of the product with SKU text, else of products whose name matches text."""
+        row = self.price_table.find_sku(text)
+        rows = [row] if row is not None else self.price_table.search(text)
+        return self.select_labels(self.price_table.labels_for_rows(rows))
+
+    def select_labels(self, indices):
+        if indices:
+            self.selected = list(indices)
+            self.ensure_at_least_one_selected()
+            self.update_edit_panel_from_selection()
+            self.refresh_preview()
+        return indices
 
+    def on_product_chosen(self, product):
+        # Typeahead pick: fill every selected label with the product
+        for idx in self.selected:
+            self.fill_from_product(idx, product)
+        self.on_labels_pasted(self.selected)
+
+    def do_catalog_search(self):
+        from PyQt5.QtWidgets import QDialog
+        from catalog_search import CatalogSearchDialog
+        dlg = CatalogSearchDialog(self.catalog, self, sync_callback=self.do_catalog_sync)
+        if dlg.exec_() != QDialog.Accepted:
+            return
+        products = dlg.selected_products()
+        filled = self.fill_labels_from_products(products)
+        if len(products) > len(filled):
+            QMessageBox.information(self, "Каталог", f"Попълнени етикети: {len(filled)} от {len(products)} (листът е пълен).")
+
+    def do_catalog_sync(self, export_path, delete_missing=False):
+        """
+        Apply an ERP export to the catalog and to linked labels; selects the labels it changed.
+        "Print only changed" finds them in every session through the print history.
+        """
+        from catalog_sync import CatalogSync
+        from session_manager import session_files
+        current = os.path.abspath(self.session_manager.session_path)
+        others = [p for p in session_files(os.path.dirname(current)) if os.path.abspath(p) != current]
+        cm = self.currency_manager
+        result = CatalogSync(self.catalog, delete_missing, cm.get_mode(), cm.exchange_rate).sync(
+            export_path, labels=self.labels, labels_session=current, session_paths=others,
+            price_table=self.price_table)
+        changed_here = [e["index"] for e in result.reprint if e["session"] == current]
+        self.on_labels_pasted(changed_here)
+        return result.summary()
+
+    def get_selected(self):
+        return self.selected.copy()
 
     def ensure_at_least_one_selected(self):
         if not self.selected or self.selected[0] >= len(self.labels):
@@ -233,6 +402,32 @@ class LabelSheetEditor(QWidget):
 
     def refresh_preview(self):
         self.preview_pane.update_labels(self.labels)
+        settings = load_sheet_settings()
+        self.preflight.schedule(self.labels, settings, self.print_font_scale(settings))
+
+    def confirm_preflight(self, title, settings=None, labels=None, dpi=RECORD_DPI):
+        """
+        Check all labels as printed at dpi; True when there is nothing to report or the user
+        chooses to go on. labels defaults to the editor's; others (e.g. queued sessions)
+        are not marked on the preview.
+        """
+        from preflight import check_labels, issues_summary
+        settings = settings if settings is not None else load_sheet_settings()
+        issues = check_labels(self.labels if labels is None else labels, settings, self.print_font_scale(settings), dpi)
+        if labels is None:
+            self.preview_pane.set_issues(issues)
+        if not issues:
+            return True
+        answer = QMessageBox.warning(
+            self, title, "Проверката преди печат откри проблеми:\n\n"
+            + issues_summary(issues, self.rows * self.cols) + "\n\nПродължи въпреки това?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        return answer == QMessageBox.Yes
+
+    def closeEvent(self, event):
+        self.preflight.wait()
+        self.preview_pane.tiles.shutdown()
+        super().closeEvent(event)
 
     def update_edit_panel_from_selection(self):
         sel = self.selected
@@ -293,98 +488,327 @@ class LabelSheetEditor(QWidget):
         self.left_pane.logo_size.blockSignals(False)
         self.left_pane.logo_opacity.blockSignals(False)
 
+    def print_font_scale(self, settings=None):
+        # === Load print font scale live from calibration ===
+        settings = settings if settings is not None else load_sheet_settings()
+        params = settings.get("params", {})
+        base_print_scale = float(params.get("print_font_scale", 12.0))
+        return base_print_scale / PREVIEW_LABEL_SCALE
+
+    def print_snapshot(self):
+        """(render, settings, font scale) fixed on the GUI thread for a print that runs in a worker."""
+        settings = load_sheet_settings()
+        render = partial(self.render_sheet, debug_boxes=self.debug_draw_boxes)
+        return render, settings, self.print_font_scale(settings)
+
+    def paint_sheet(self, painter, dpi, settings=None):
+        """Replay the recorded sheet at dpi; it is re-recorded only when labels or calibration change."""
+        settings = settings if settings is not None else load_sheet_settings()
+        self.sheet_picture.paint(painter, dpi, settings, self.print_font_scale(settings))
+
     def do_print(self):
         from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-        from PyQt5.QtGui import QPainter
+        from sheet_packing import SheetStock, commit_plan, plan_summary
+        stock = SheetStock(self.rows, self.cols)
+        pages = self.plan_sheet(stock)
+        if not pages:
+            QMessageBox.information(self, "Печат", "Няма попълнени етикети за печат.")
+            return
+        # Only partial sheets need the user to feed particular sheets in order
+        if any(page["sheet"] is not None for page in pages) and \
+                QMessageBox.question(self, "Печат", plan_summary(pages)) != QMessageBox.Yes:
+            return
         printer = QPrinter(QPrinter.HighResolution)
         printer.setPageSize(QPrinter.A4)
         printer.setOrientation(QPrinter.Portrait)
         dialog = QPrintDialog(printer, self)
-        if dialog.exec_() == QPrintDialog.Accepted:
-            painter = QPainter(printer)
-            # === Load print font scale live from calibration ===
-            settings = load_sheet_settings()
-            params = settings.get("params", {})
-            base_print_scale = float(params.get("print_font_scale", 12.0))
-            print_font_scale = base_print_scale / PREVIEW_LABEL_SCALE
-            self.render_sheet(painter, printer.resolution(), print_font_scale=print_font_scale)
+        if dialog.exec_() != QPrintDialog.Accepted:
+            return
+        # Checked once the printer is chosen: text keeps its pixel size, so the fit depends on its dpi
+        if self.confirm_preflight("Печат", dpi=printer.resolution()) and self.print_pages_to(printer, pages):
+            commit_plan(stock, pages, self.left_pane.keep_leftover_chk.isChecked())
+
+    def plan_sheet(self, stock):
+        """
+        Pages of (slot, (index, label)) for the sheet's labels with content. With no partial
+        sheets in stock the sheet prints as laid out and its blank positions stay free;
+        otherwise the labels fill the partial sheets first (see plan_job).
+        """
+        from sheet_packing import plan_job
+        items = [(idx, label) for idx, label in enumerate(self.labels[:self.rows * self.cols]) if has_content(label)]
+        if not items:
+            return []
+        if not stock.sheets:
+            return [{"sheet": None, "placements": [(idx, (idx, label)) for idx, label in items]}]
+        return plan_job(items, stock)
+
+    def print_pages_to(self, printer, pages, settings=None):
+        """Print planned pages of the current session's labels; True when the job was spooled."""
+        from PyQt5.QtPrintSupport import QPrinter
+        from PyQt5.QtGui import QPainter
+        from print_history import PrintHistory
+        painter = QPainter()
+        if not painter.begin(printer):
+            return False
+        settings = settings if settings is not None else load_sheet_settings()
+        font_scale = self.print_font_scale(settings)
+        dpi = printer.resolution()
+        render_pages(QPainterBackend(painter, dpi, printer),
+                     [self.layout_page([(slot, label) for slot, (_, label) in page["placements"]], settings, font_scale, dpi)
+                      for page in pages])
+        if painter.end() and printer.printerState() != QPrinter.Error:
+            session = self.session_manager.session_path
+            PrintHistory().record([(session, idx, label_fingerprint(label))
+                                   for page in pages for _, (idx, label) in page["placements"]])
+            return True
+        return False
+
+    def do_print_preview(self):
+        """Replay the recorded sheet on screen at the preview printer's resolution, as it will print."""
+        from PyQt5.QtPrintSupport import QPrinter, QPrintPreviewDialog
+        from PyQt5.QtGui import QPainter
+        printer = QPrinter(QPrinter.HighResolution)
+        printer.setPageSize(QPrinter.A4)
+        printer.setOrientation(QPrinter.Portrait)
+        dialog = QPrintPreviewDialog(printer, self)
+        dialog.setWindowTitle("Преглед за печат")
+
+        def paint(preview_printer):
+            painter = QPainter(preview_printer)
+            self.paint_sheet(painter, preview_printer.resolution())
             painter.end()
 
+        dialog.paintRequested.connect(paint)
+        dialog.exec_()
+
+    def print_sheet_to(self, printer, settings=None):
+        """Print the current sheet on a configured printer; returns True when the job was spooled."""
+        from PyQt5.QtPrintSupport import QPrinter
+        from PyQt5.QtGui import QPainter
+        from print_history import PrintHistory, label_fingerprint
+        painter = QPainter()
+        if not painter.begin(printer):
+            return False
+        self.paint_sheet(painter, printer.resolution(), settings)
+        if painter.end() and printer.printerState() != QPrinter.Error:
+            session = self.session_manager.session_path
+            PrintHistory().record([(session, idx, label_fingerprint(label)) for idx, label in enumerate(self.labels)])
+            return True
+        return False
+
+    def do_quick_print(self):
+        """Print with the active printer profile's cached printer and its calibration, without a dialog."""
+        printer = self.printer_profiles.printer()
+        if printer is None:
+            self.do_save_printer_profile()
+            return
+        if not printer.isValid():
+            QMessageBox.warning(self, "Бърз печат", f"Принтерът „{printer.printerName()}“ не е наличен.")
+            return
+        settings = self.printer_profiles.settings(load_sheet_settings())
+        if not self.confirm_preflight("Бърз печат", settings, dpi=printer.resolution()):
+            return
+        if not self.print_sheet_to(printer, settings):
+            QMessageBox.warning(self, "Бърз печат", "Грешка при печат.")
+
+    def do_save_printer_profile(self):
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
+        from PyQt5.QtWidgets import QInputDialog
+        printer = QPrinter(QPrinter.HighResolution)
+        printer.setPageSize(QPrinter.A4)
+        printer.setOrientation(QPrinter.Portrait)
+        dialog = QPrintDialog(printer, self)
+        dialog.setWindowTitle("Нов принтерен профил")
+        if dialog.exec_() != QPrintDialog.Accepted:
+            return
+        name, ok = QInputDialog.getText(self, "Нов принтерен профил", "Име на профила:", text=printer.printerName())
+        if not ok or not name.strip():
+            return
+        self.printer_profiles.store(name.strip(), profile_from_printer(printer, load_sheet_settings().get("params", {})))
+        self.left_pane.set_printer_profiles(self.printer_profiles.names(), self.printer_profiles.active)
+
+    def do_print_changed(self):
+        """Print only labels changed since their last print, across all sessions, packed onto the fewest sheets."""
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
+        from PyQt5.QtGui import QPainter
+        from print_history import PrintHistory
+        from sheet_packing import SheetStock, plan_job, expand_copies, commit_plan, plan_summary
+        from session_manager import session_files
+        history = PrintHistory()
+        current = os.path.abspath(self.session_manager.session_path)
+        jobs = [(current, idx, label, fp) for idx, label, fp in history.changed_labels(current, self.labels)]
+        for path in session_files(os.path.dirname(current)):
+            if os.path.abspath(path) == current:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    labels = json.load(f).get("labels", [])
+            except (OSError, ValueError):
+                continue
+            jobs += [(path, idx, label, fp) for idx, label, fp in history.changed_labels(path, labels)]
+        if not jobs:
+            QMessageBox.information(self, "Печат", "Няма променени етикети от последния печат.")
+            return
+
+        stock = SheetStock(self.rows, self.cols)
+        copies = self.left_pane.copies_spin.value()
+        pages = plan_job(expand_copies([(job, copies) for job in jobs]), stock)
+        if QMessageBox.question(self, "Печат", plan_summary(pages)) != QMessageBox.Yes:
+            return
+        printer = QPrinter(QPrinter.HighResolution)
+        printer.setPageSize(QPrinter.A4)
+        printer.setOrientation(QPrinter.Portrait)
+        dialog = QPrintDialog(printer, self)
+        if dialog.exec_() != QPrintDialog.Accepted:
+            return
+        painter = QPainter(printer)
+        settings = load_sheet_settings()
+        font_scale = self.print_font_scale(settings)
+        dpi = printer.resolution()
+        render_pages(QPainterBackend(painter, dpi, printer),
+                     [self.layout_page([(slot, job[2]) for slot, job in page["placements"]], settings, font_scale, dpi)
+                      for page in pages])
+        # Only a job that reached the spooler counts as printed
+        if painter.end() and printer.printerState() != QPrinter.Error:
+            history.record([(session, idx, fp) for session, idx, _, fp in jobs])
+            commit_plan(stock, pages, self.left_pane.keep_leftover_chk.isChecked())
+            QMessageBox.information(self, "Печат", f"Отпечатани етикети: {len(jobs)} на {len(pages)} лист(а).")
+
+    def do_sheet_stock(self):
+        from sheet_packing import SheetStock, SheetStockDialog
+        SheetStockDialog(SheetStock(self.rows, self.cols), self).exec_()
+
+    def do_print_queue(self):
+        from print_queue import PrintQueue, PrintQueueDialog
+        # The queue prints session files, so the current labels must be on disk
+        self.session_manager.save_session()
+        if getattr(self, "print_queue_dialog", None) is None:
+            self.print_queue_dialog = PrintQueueDialog(
+                PrintQueue(), self.rows, self.cols, self.print_snapshot, self.confirm_preflight,
+                current_session=self.session_manager.session_path, parent=self
+            )
+        self.print_queue_dialog.show()
+        self.print_queue_dialog.raise_()
+
     def do_export_pdf(self):
         from PyQt5.QtGui import QPagedPaintDevice, QPdfWriter, QPainter
         from PyQt5.QtWidgets import QFileDialog
+        if not self.confirm_preflight("PDF"):
+            return
         path, _ = QFileDialog.getSaveFileName(self, "Запази PDF", "", "PDF Files (*.pdf)")
         if not path:
             return
-        pdf = QPdfWriter(path)
-        pdf.setPageSize(QPagedPaintDevice.A4)
-        pdf.setResolution(300)
-        painter = QPainter(pdf)
-        # === Load print font scale live from calibration ===
         settings = load_sheet_settings()
-        params = settings.get("params", {})
-        base_print_scale = float(params.get("print_font_scale", 12.0))
-        print_font_scale = base_print_scale / PREVIEW_LABEL_SCALE
-        self.render_sheet(painter, 300, print_font_scale=print_font_scale)
-        painter.end()
+        page = self.layout_page(list(enumerate(self.labels[:self.rows * self.cols])), settings,
+                                self.print_font_scale(settings), RECORD_DPI)
+        try:
+            try:
+                from label_layout import ReportLabBackend
+                render_pages(ReportLabBackend(path, *page_size_mm(settings)), [page])
+            except ImportError:
+                # No ReportLab: the same items through Qt's own PDF writer
+                pdf = QPdfWriter(path)
+                pdf.setPageSize(QPagedPaintDevice.A4)
+                pdf.setResolution(RECORD_DPI)
+                painter = QPainter(pdf)
+                render_pages(QPainterBackend(painter, RECORD_DPI, pdf), [page])
+                painter.end()
+        except OSError as e:
+            QMessageBox.warning(self, "Грешка", f"Неуспешен запис:\n{e}")
+            return
         QMessageBox.information(self, "Успех", "PDF файлът е запазен успешно.")
 
-    def render_sheet(self, qp, dpi, print_font_scale=1.0):
+    def do_export_zpl(self):
+        """Build a ZPL job for the selected labels (all labels if one or none is selected)."""
+        from zpl_backend import ZplBuilder, ZplPreviewDialog
+        settings = load_sheet_settings()
+        params = settings.get("params", {})
+        indices = self.get_selected() if len(self.selected) > 1 else range(len(self.labels))
+        builder = ZplBuilder(float(params.get("label_w", 63.5)), float(params.get("label_h", 38.1)),
+                             self.print_font_scale(settings), int(params.get("zpl_dpi", 203)))
+        zpl = builder.job([self.labels[i] for i in indices], copies=self.left_pane.copies_spin.value())
+        if zpl.strip():
+            ZplPreviewDialog(zpl, self).exec_()
+        else:
+            QMessageBox.information(self, "ZPL", "Няма попълнени етикети.")
+
+    def export_svg(self, path):
+        """Vector SVG of the sheet from the backend-neutral layout (no raster step, no DPI)."""
+        from label_layout import SvgBackend
         settings = load_sheet_settings()
+        page = self.layout_page(list(enumerate(self.labels[:self.rows * self.cols])), settings,
+                                self.print_font_scale(settings), RECORD_DPI)
+        try:
+            paths = render_pages(SvgBackend(path, *page_size_mm(settings)), [page])
+        except OSError as e:
+            QMessageBox.warning(self, "Грешка", f"Неуспешен запис:\n{e}")
+            return
+        QMessageBox.information(self, "Успех", "Запазено:\n" + "\n".join(paths))
+
+    def do_export_image(self):
+        """Export the sheet as PNG or (multi-page) TIFF, rendered in bands to keep memory flat."""
+        from PyQt5.QtWidgets import QFileDialog, QInputDialog
+        from raster_export import export_raster
+        from print_queue import read_session_labels
+        from session_manager import session_files
+        path, chosen = QFileDialog.getSaveFileName(self, "Запази изображение", "",
+                                                   "PNG (*.png);;TIFF (*.tif *.tiff);;SVG (*.svg)")
+        if not path:
+            return
+        if not path.lower().endswith((".png", ".tif", ".tiff", ".svg")):
+            path += {"TIFF": ".tif", "SVG": ".svg"}.get(chosen.split(" ")[0], ".png")
+        if path.lower().endswith(".svg"):
+            self.export_svg(path)
+            return
+        dpi, ok = QInputDialog.getItem(self, "Резолюция", "DPI:", ["300", "600", "1200"], 1, False)
+        if not ok:
+            return
+        settings = load_sheet_settings()
+        params = settings.get("params", {})
+        font_scale = self.print_font_scale(settings)
+        dpi = int(dpi)
+        pages = [self.layout_page(list(enumerate(self.labels[:self.rows * self.cols])), settings, font_scale, dpi)]
+        if path.lower().endswith((".tif", ".tiff")) and QMessageBox.question(
+                self, "TIFF", "Да добавя ли всички запазени сесии като отделни страници?") == QMessageBox.Yes:
+            per_page = self.rows * self.cols
+            current = os.path.abspath(self.session_manager.session_path)
+            for session in session_files(os.path.dirname(current)):
+                if os.path.abspath(session) == current:
+                    continue
+                labels = read_session_labels(session)
+                for start in range(0, len(labels), per_page):
+                    placements = list(enumerate(labels[start:start + per_page]))
+                    pages.append(self.layout_page(placements, settings, font_scale, dpi))
+        try:
+            paths = export_raster(path, pages, dpi,
+                                  float(params.get("page_w", 210)), float(params.get("page_h", 297)))
+        except OSError as e:
+            QMessageBox.warning(self, "Грешка", f"Неуспешен запис:\n{e}")
+            return
+        QMessageBox.information(self, "Успех", "Запазено:\n" + "\n".join(paths))
+
+    def render_sheet(self, qp, dpi, print_font_scale=1.0, placements=None, settings=None, debug_boxes=None):
+        """
+        Paint one sheet at dpi through the backend-neutral layout (the same items SVG
+        and ReportLab get). placements is a list of (position index, label dict);
+        by default the editor's labels fill the positions in order.
+        settings overrides the saved calibration (e.g. a printer profile's own).
+        """
+        if settings is None:
+            settings = load_sheet_settings()
+        if placements is None:
+            placements = list(enumerate(self.labels[:self.rows * self.cols]))
         params = settings.get("params", {})
-        hw_left = float(params.get('hw_left', 0))
-        hw_top = float(params.get('hw_top', 0))
-        hw_right = float(params.get('hw_right', 0))
-        hw_bottom = float(params.get('hw_bottom', 0))
-        sheet_left = float(params.get('sheet_left', 0))
-        sheet_top = float(params.get('sheet_top', 0))
-        label_w = float(params.get('label_w', 63.5))
-        label_h = float(params.get('label_h', 38.1))
-        col_gap = float(params.get('col_gap', 0))
-        row_gap = float(params.get('row_gap', 0))
-        rows = int(params.get('rows', 3))
-        cols = int(params.get('cols', 3))
-        scale_correction = float(params.get('user_scale_factor', 1.0))
-        page_w = float(params.get('page_w', 210))
-        page_h = float(params.get('page_h', 297))
-
-        skip_hw_margin = settings.get("skip_hw_margin", False)
-        if skip_hw_margin:
-            hw_left = hw_top = hw_right = hw_bottom = 0
-
-        # Correct: always read font_scale_factor from the ROOT of settings!
-        font_scale_factor = float(settings.get("font_scale_factor", 1.0))
-
-        px_per_mm = dpi / 25.4 * scale_correction
-        page_w_px = round(page_w * px_per_mm)
-        page_h_px = round(page_h * px_per_mm)
-
-        qp.setRenderHint(qp.Antialiasing)
-        qp.setBrush(Qt.white)
-        qp.setPen(Qt.NoPen)
-        qp.drawRect(0, 0, page_w_px, page_h_px)
-
-        idx = 0
-        for row in range(rows):
-            for col in range(cols):
-                if idx >= len(self.labels):
-                    break
-                x_mm = hw_left + sheet_left + col * (label_w + col_gap)
-                y_mm = hw_top + sheet_top + row * (label_h + row_gap)
-                x = round(x_mm * px_per_mm)
-                y = round(y_mm * px_per_mm)
-                w = round(label_w * px_per_mm)
-                h = round(label_h * px_per_mm)
-                if self.debug_draw_boxes:
-                    from PyQt5.QtGui import QPen, QColor
-                    qp.save()
-                    qp.setPen(QPen(QColor("#FF3333"), 2, Qt.DashLine))
-                    qp.setBrush(Qt.NoBrush)
-                    qp.drawRect(x, y, w, h)
-                    qp.restore()
-                # --- Increase padding for all labels (10px times scale) ---
-                draw_label_print(qp, x, y, w, h, self.labels[idx], font_scale=print_font_scale, scale=1.0, corner_radius=float(params.get('corner_radius', 2.5)), margin=30)
-                idx += 1
+        px_per_mm = dpi / 25.4 * float(params.get('user_scale_factor', 1.0))
+        page_w, page_h = page_size_mm(settings)
+        qp.fillRect(QRectF(0, 0, page_w * px_per_mm, page_h * px_per_mm), Qt.white)
+        QPainterBackend(qp, dpi).draw(self.layout_page(placements, settings, print_font_scale, dpi, debug_boxes))
+
+    def layout_page(self, placements, settings, font_scale, dpi, debug_boxes=None):
+        """layout_sheet() with the editor's debug outline setting."""
+        if debug_boxes is None:
+            debug_boxes = self.debug_draw_boxes
+        return layout_sheet(placements, settings, font_scale, dpi, debug_boxes)
 
 if __name__ == "__main__":
     from PyQt5.QtGui import QFontDatabase
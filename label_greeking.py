@@ -0,0 +1,80 @@
+# label_greeking.py
+
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QColor
+
+from label_units import TEXT_FIELDS, LINE_HEIGHT, SCREEN_DPI, field_text
+from print_history import label_fingerprint
+from text_fit import advance_cache, line_widths
+
+GREEK_CACHE_SIZE = 1024
+BAR_HEIGHT = 0.55  # bar height as a fraction of the em, roughly the x-height
+BAR_ALPHA = 110
+
+_bars = OrderedDict()
+_bars_lock = threading.Lock()  # page thumbnails are greeked off the GUI thread
+
+def greek_bars(label, w, h, scale, dpi=SCREEN_DPI):
+    """
+    [(x, y, w, h, color)] placeholder bars, one per wrapped text line, relative to the
+    label's top-left corner in draw_label_preview's units. Lines come from cached glyph
+    advances, so no QTextDocument is laid out; the result is cached per label.
+    dpi is the logical DPI the point sizes are laid out at (the painted device's).
+    """
+    cache_key = (label_fingerprint(label), w, h, scale, dpi)
+    with _bars_lock:
+        bars = _bars.get(cache_key)
+        if bars is not None:
+            _bars.move_to_end(cache_key)
+            return bars
+    margin = int(6 * scale)
+    box_w = w - 2 * margin
+    bars, top = [], 0.0
+    for key in TEXT_FIELDS:
+        field = label.get(key, {})
+        text = field_text(key, field.get("text", "")).strip()
+        if not text:
+            continue
+        cache = advance_cache(field.get("font", "Arial"), field.get("bold", False), field.get("italic", False))
+        em = max(1, int(field.get("size", 15))) * dpi / 72
+        line_h = cache.line_height * em * LINE_HEIGHT
+        align = field.get("align", Qt.AlignCenter)
+        for width in line_widths(text, box_w, em, cache):
+            width = min(width, box_w)
+            if align == Qt.AlignLeft:
+                x = margin
+            elif align == Qt.AlignRight:
+                x = margin + box_w - width
+            else:
+                x = margin + (box_w - width) / 2
+            bars.append((x, top + (line_h - em * BAR_HEIGHT) / 2, width, em * BAR_HEIGHT,
+                         field.get("font_color", "#222")))
+            top += line_h
+    # Centred like draw_label_preview, including its upward nudge
+    shift = (h - top) / 2 - 1.5 * scale
+    bars = [(x, y + shift, bw, bh, color) for x, y, bw, bh, color in bars]
+    with _bars_lock:
+        _bars[cache_key] = bars
+        if len(_bars) > GREEK_CACHE_SIZE:
+            _bars.popitem(last=False)
+    return bars
+
+def draw_label_greeked(painter, x, y, w, h, label, scale=1.0, corner_radius=2.5):
+    """Cheap stand-in for draw_label_preview when the label is too small to read."""
+    painter.save()
+    painter.setPen(QColor("#cccccc"))
+    painter.setBrush(QColor("#fff"))
+    painter.drawRoundedRect(x, y, w, h, corner_radius, corner_radius)
+    logo = label.get("logo") or {}
+    if logo.get("position", "без лого") != "без лого":
+        size = logo.get("size", 24)
+        lx = x + 6 if logo.get("position") == "долу ляво" else x + w - size - 6
+        painter.fillRect(QRectF(lx, y + h - size - 6, size, size), QColor(0, 0, 0, 30))
+    for bx, by, bw, bh, color in greek_bars(label, w, h, scale, painter.device().logicalDpiY()):
+        color = QColor(color)
+        color.setAlpha(BAR_ALPHA)
+        painter.fillRect(QRectF(x + bx, y + by, bw, bh), color)
+    painter.restore()
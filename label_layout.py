@@ -0,0 +1,310 @@
+# label_layout.py
+
+import os
+import base64
+from collections import namedtuple
+
+from PyQt5.QtGui import QColor, QFont, QPainter, QRawFont
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtSvg import QSvgRenderer
+
+from label_units import TEXT_FIELDS, LINE_HEIGHT, RECORD_DPI, PRINT_MARGIN_PX, field_text, px_to_mm, text_height_mm
+from print_history import label_fingerprint
+from sheet_geometry import sheet_geometry
+from text_fit import advance_cache, fit_label
+
+# Backend-neutral layout of labels in millimetres (origin top left, y down),
+# measured with the same glyph advances auto-fit uses (see text_fit.py).
+
+Rect = namedtuple("Rect", "x y w h radius fill stroke")
+TextRun = namedtuple("TextRun", "x y w text family size bold italic color")  # y is the baseline
+Image = namedtuple("Image", "x y w h path opacity")
+
+def logo_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "logo.svg")
+
+def wrap_text(text, max_w, size_mm, cache):
+    """Greedy word wrap on measured advances; a single over-long word gets its own line."""
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and cache.width(candidate) * size_mm > max_w:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return [(line, cache.width(line) * size_mm) for line in lines]
+
+def text_lines(label, box_w, font_scale, dpi=RECORD_DPI):
+    """The label's wrapped text lines, top to bottom: (field, family, bold, italic, em, height, ascent, text, advance) in mm."""
+    lines = []
+    for key in TEXT_FIELDS:
+        field = label.get(key, {})
+        text = field_text(key, field.get("text", ""))
+        if not text.strip():
+            continue
+        family = field.get("font", "Arial")
+        bold, italic = field.get("bold", False), field.get("italic", False)
+        size = text_height_mm(field.get("size", 15), font_scale, dpi)
+        cache = advance_cache(family, bold, italic)
+        height = cache.line_height * size
+        ascent = cache.ascent * size
+        for line, advance in wrap_text(text, box_w, size, cache):
+            lines.append((field, family, bold, italic, size, height, ascent, line, advance))
+    return lines
+
+def text_block(label, w, font_scale, dpi=RECORD_DPI, margin_px=PRINT_MARGIN_PX):
+    """(height in mm of the label's text block, True when a word is wider than the text box)."""
+    box_w = w - 2 * px_to_mm(margin_px, dpi)
+    lines = text_lines(label, box_w, font_scale, dpi)
+    return sum(l[5] for l in lines) * LINE_HEIGHT, any(l[8] > box_w + 1e-6 for l in lines)
+
+def layout_label(label, w, h, font_scale, corner_radius=2.5, margin_px=PRINT_MARGIN_PX, dpi=RECORD_DPI):
+    """Items of one label relative to its top-left corner, all in mm; pixel sizes are device pixels at dpi."""
+    items = [Rect(0, 0, w, h, px_to_mm(corner_radius, dpi), "#ffffff", "#cccccc")]
+    logo = label.get("logo") or {}
+    if logo.get("position", "без лого") != "без лого" and os.path.exists(logo_path()):
+        size = px_to_mm(logo.get("size", 24) * font_scale, dpi)
+        margin = px_to_mm(6 * font_scale, dpi)
+        x = margin if logo.get("position") == "долу ляво" else w - size - margin
+        items.append(Image(x, h - size - margin, size, size, logo_path(), logo.get("opacity", 1.0)))
+
+    margin = px_to_mm(margin_px, dpi)
+    box_w = w - 2 * margin
+    lines = text_lines(label, box_w, font_scale, dpi)
+    y = (h - sum(l[5] for l in lines) * LINE_HEIGHT) / 2
+    for field, family, bold, italic, size, height, ascent, line, advance in lines:
+        line_h = height * LINE_HEIGHT
+        align = field.get("align", Qt.AlignCenter)
+        if align == Qt.AlignLeft:
+            x = margin
+        elif align == Qt.AlignRight:
+            x = margin + box_w - advance
+        else:
+            x = margin + (box_w - advance) / 2
+        bg = field.get("bg_color", "#fff")
+        if QColor(bg) != QColor("#fff"):
+            items.append(Rect(x, y, advance, line_h, 0, bg, None))
+        items.append(TextRun(x, y + (line_h - height) / 2 + ascent, advance, line,
+                             family, size, bold, italic, field.get("font_color", "#222")))
+        y += line_h
+    return items
+
+def offset_items(items, dx, dy):
+    return [item._replace(x=item.x + dx, y=item.y + dy) for item in items]
+
+def layout_sheet(placements, settings, font_scale, dpi=RECORD_DPI, debug_boxes=False):
+    """
+    Page items in mm for [(slot, label)] using the calibration settings. Each distinct
+    label is laid out once; copies reuse the same layout at another offset. dpi is the
+    resolution of the device the page is for (text and margins keep their pixel size).
+    debug_boxes outlines every used position in red.
+    """
+    params = settings.get("params", {})
+    scale = float(params.get("user_scale_factor", 1.0))
+    label_w, label_h = float(params.get("label_w", 63.5)), float(params.get("label_h", 38.1))
+    radius = float(params.get("corner_radius", 2.5))
+    rects = sheet_geometry(params, hw_offset=not settings.get("skip_hw_margin", False)).device_rects(scale)
+    cache = {}
+    page = []
+    for slot, label in placements:
+        if slot >= len(rects):
+            continue
+        fp = label_fingerprint(label)
+        if fp not in cache:
+            fitted = fit_label(label, label_w, label_h, font_scale, dpi)
+            cache[fp] = layout_label(fitted, label_w * scale, label_h * scale, font_scale, radius, dpi=dpi)
+        x, y, w, h = rects[slot]
+        if debug_boxes:
+            page.append(Rect(x, y, w, h, 0, None, "#ff3333"))
+        page += offset_items(cache[fp], x, y)
+    return page
+
+def page_size_mm(settings):
+    params = settings.get("params", {})
+    return float(params.get("page_w", 210)), float(params.get("page_h", 297))
+
+# --- Backends ---
+# Every output shares one protocol: draw(items) outputs one page of layout items
+# (starting a new page is the backend's job) and finish() completes the output and
+# returns the written paths. render_pages() runs a backend over a list of pages.
+
+def render_pages(backend, pages):
+    for items in pages:
+        backend.draw(items)
+    return backend.finish()
+
+class QPainterBackend:
+    """
+    Draws onto any QPainter device (printer, QPdfWriter, QImage, QPicture) at dpi.
+    paged is the device when it has pages (QPrinter, QPdfWriter): pages after the
+    first start with paged.newPage(). The painter is ended by whoever began it.
+    """
+    def __init__(self, painter, dpi, paged=None):
+        self.painter = painter
+        self.k = dpi / 25.4
+        self.paged = paged
+        self.pages = 0
+
+    def draw(self, items):
+        if self.pages and self.paged is not None:
+            self.paged.newPage()
+        self.pages += 1
+        p, k = self.painter, self.k
+        p.save()
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setRenderHint(QPainter.TextAntialiasing)
+        for item in items:
+            if isinstance(item, Rect):
+                p.setPen(QColor(item.stroke) if item.stroke else Qt.NoPen)
+                p.setBrush(QColor(item.fill) if item.fill else Qt.NoBrush)
+                p.drawRoundedRect(QRectF(item.x * k, item.y * k, item.w * k, item.h * k), item.radius * k, item.radius * k)
+            elif isinstance(item, TextRun):
+                font = QFont(item.family)
+                font.setPixelSize(max(1, round(item.size * k)))
+                font.setBold(item.bold)
+                font.setItalic(item.italic)
+                # Unhinted glyphs keep the linear advances the layout measured
+                font.setHintingPreference(QFont.PreferNoHinting)
+                p.setFont(font)
+                p.setPen(QColor(item.color))
+                p.drawText(QPointF(item.x * k, item.y * k), item.text)
+            elif isinstance(item, Image):
+                p.setOpacity(item.opacity)
+                QSvgRenderer(item.path).render(p, QRectF(item.x * k, item.y * k, item.w * k, item.h * k))
+                p.setOpacity(1.0)
+        p.restore()
+
+    def finish(self):
+        return []
+
+def _xml(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+class SvgBackend:
+    """Writes pages as standalone SVG files in millimetre user units: name.svg, name_2.svg, ..."""
+    def __init__(self, path, page_w, page_h):
+        self.stem = path[:-4] if path.lower().endswith(".svg") else path
+        self.page_w = page_w
+        self.page_h = page_h
+        self.paths = []
+        self._images = {}
+
+    def _image_href(self, path):
+        if path not in self._images:
+            with open(path, "rb") as f:
+                self._images[path] = "data:image/svg+xml;base64," + base64.b64encode(f.read()).decode("ascii")
+        return self._images[path]
+
+    def render(self, items):
+        out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.page_w}mm" height="{self.page_h}mm" '
+               f'viewBox="0 0 {self.page_w} {self.page_h}">',
+               f'<rect width="{self.page_w}" height="{self.page_h}" fill="#ffffff"/>']
+        for item in items:
+            if isinstance(item, Rect):
+                stroke = f' stroke="{item.stroke}" stroke-width="0.1"' if item.stroke else ""
+                out.append(f'<rect x="{item.x:.3f}" y="{item.y:.3f}" width="{item.w:.3f}" height="{item.h:.3f}" '
+                           f'rx="{item.radius:.3f}" fill="{item.fill or "none"}"{stroke}/>')
+            elif isinstance(item, TextRun):
+                weight = ' font-weight="bold"' if item.bold else ""
+                style = ' font-style="italic"' if item.italic else ""
+                out.append(f'<text x="{item.x:.3f}" y="{item.y:.3f}" font-family="{_xml(item.family)}" '
+                           f'font-size="{item.size:.3f}"{weight}{style} fill="{item.color}" '
+                           f'textLength="{item.w:.3f}" lengthAdjust="spacingAndGlyphs">{_xml(item.text)}</text>')
+            elif isinstance(item, Image):
+                out.append(f'<image x="{item.x:.3f}" y="{item.y:.3f}" width="{item.w:.3f}" height="{item.h:.3f}" '
+                           f'opacity="{item.opacity}" href="{self._image_href(item.path)}"/>')
+        out.append("</svg>")
+        return "\n".join(out)
+
+    def draw(self, items):
+        out = f"{self.stem}.svg" if not self.paths else f"{self.stem}_{len(self.paths) + 1}.svg"
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(self.render(items))
+        self.paths.append(out)
+
+    def finish(self):
+        return self.paths
+
+def bundled_fonts():
+    """{(family lower, bold, italic): ttf path} of the fonts shipped in ./fonts (the ones main.py loads into Qt)."""
+    fonts = {}
+    fonts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+    if os.path.isdir(fonts_dir):
+        for name in sorted(os.listdir(fonts_dir)):
+            if name.lower().endswith(".ttf"):
+                path = os.path.join(fonts_dir, name)
+                raw = QRawFont(path, 10)
+                if raw.isValid():
+                    key = (raw.familyName().lower(), raw.weight() >= QFont.Bold, raw.style() != QFont.StyleNormal)
+                    fonts.setdefault(key, path)
+    return fonts
+
+class ReportLabBackend:
+    """
+    PDF through a ReportLab canvas (optional dependency: the constructor raises
+    ImportError without it). Fonts are embedded from ./fonts, the same files Qt
+    measured the layout with, falling back to DejaVu Sans for Cyrillic.
+    """
+    def __init__(self, path, page_w, page_h):
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.units import mm
+        self.path = path
+        self.mm = mm
+        self.page_h = page_h
+        self.canvas = canvas.Canvas(path, pagesize=(page_w * mm, page_h * mm))
+        self.fonts = bundled_fonts()
+        self._registered = {}
+
+    def _font(self, family, bold, italic):
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        key = (family.lower(), bold, italic)
+        path = self.fonts.get(key) or self.fonts.get((family.lower(), False, False)) \
+            or self.fonts.get(("dejavu sans", bold, italic)) or self.fonts.get(("dejavu sans", False, False))
+        if path is None:
+            return "Helvetica"
+        if path not in self._registered:
+            name = os.path.splitext(os.path.basename(path))[0]
+            pdfmetrics.registerFont(TTFont(name, path))
+            self._registered[path] = name
+        return self._registered[path]
+
+    def draw(self, items):
+        from reportlab.graphics import renderPDF
+        c, mm = self.canvas, self.mm
+        top = self.page_h
+        for item in items:
+            if isinstance(item, Rect):
+                if item.fill:
+                    c.setFillColor(QColor(item.fill).name())
+                if item.stroke:
+                    c.setStrokeColor(QColor(item.stroke).name())
+                    c.setLineWidth(0.1 * mm)
+                c.roundRect(item.x * mm, (top - item.y - item.h) * mm, item.w * mm, item.h * mm, item.radius * mm,
+                            stroke=1 if item.stroke else 0, fill=1 if item.fill else 0)
+            elif isinstance(item, TextRun):
+                c.setFillColor(QColor(item.color).name())
+                c.setFont(self._font(item.family, item.bold, item.italic), item.size * mm)
+                c.drawString(item.x * mm, (top - item.y) * mm, item.text)
+            elif isinstance(item, Image):
+                try:
+                    from svglib.svglib import svg2rlg
+                except ImportError:
+                    continue
+                drawing = svg2rlg(item.path)
+                if drawing is None or not drawing.width:
+                    continue
+                c.saveState()
+                c.translate(item.x * mm, (top - item.y - item.h) * mm)
+                c.scale(item.w * mm / drawing.width, item.h * mm / drawing.height)
+                renderPDF.draw(drawing, c, 0, 0)
+                c.restoreState()
+        c.showPage()
+
+    def finish(self):
+        self.canvas.save()
+        return [self.path]
@@ -0,0 +1,132 @@
+# label_tiles.py
+
+import copy
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QThread, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+
+from label_drawing import draw_label_preview
+from print_history import label_fingerprint
+
+TILE_CACHE_BYTES = 64 * 1024 * 1024  # rendered label images kept, all zooms together
+
+def render_tile(label, w, h, scale, zoom, dpi, corner_radius):
+    """draw_label_preview of one label into a transparent image zoom times the size of w x h."""
+    image = QImage(max(1, round(w * zoom)), max(1, round(h * zoom)), QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    # Point sizes lay out at the screen's DPI, as when painting on the widget
+    image.setDotsPerMeterX(round(dpi / 0.0254))
+    image.setDotsPerMeterY(round(dpi / 0.0254))
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.scale(image.width() / w, image.height() / h)
+    draw_label_preview(painter, 0, 0, w, h, label, scale=scale, corner_radius=corner_radius)
+    painter.end()
+    return image
+
+class _Token:
+    """Shared between a task and the cache; set when nobody waits for the tile any more."""
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+class _TileSignals(QObject):
+    rendered = pyqtSignal(object, QImage)  # tile key, image
+
+class _TileTask(QRunnable):
+    def __init__(self, key, label, args, token, signals):
+        super().__init__()
+        self.key = key
+        self.label = label
+        self.args = args
+        self.token = token
+        self.signals = signals
+
+    def run(self):
+        # A label edited again before its turn came is skipped without rendering
+        if self.token.cancelled:
+            return
+        image = render_tile(self.label, *self.args)
+        if not self.token.cancelled:
+            self.signals.rendered.emit(self.key, image)
+
+class LabelTiles(QObject):
+    """
+    Label images for the preview, rendered on a thread pool. tile() never lays
+    out text on the GUI thread: it returns the ready image, or while one is being
+    rendered the slot's previous image (stale) or None for a placeholder.
+    tile_ready fires when a slot's image arrives. A slot asking for a different
+    tile (its label edited, zoom changed) cancels the render it was waiting for.
+    """
+    tile_ready = pyqtSignal(int)  # slot
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, QThread.idealThreadCount() - 1))
+        self._images = OrderedDict()  # key -> QImage, LRU bounded by TILE_CACHE_BYTES
+        self._bytes = 0
+        self._shown = {}    # slot -> key of the image it last showed
+        self._waiting = {}  # slot -> key it waits for
+        self._pending = {}  # key -> (token, set of waiting slots)
+        self._signals = _TileSignals(self)
+        self._signals.rendered.connect(self._on_rendered)
+
+    def tile(self, slot, label, w, h, scale, zoom, dpi, corner_radius):
+        """(image or None, fresh)."""
+        key = (label_fingerprint(label), w, h, scale, round(zoom, 4), dpi, corner_radius)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self._stop_waiting(slot)
+            self._shown[slot] = key
+            return image, True
+        if self._waiting.get(slot) != key:
+            self._stop_waiting(slot)
+            self._waiting[slot] = key
+            if key in self._pending:
+                self._pending[key][1].add(slot)  # an identical label is already being rendered
+            else:
+                token = _Token()
+                self._pending[key] = (token, {slot})
+                # Snapshot: the editor keeps mutating its label dicts in place
+                task = _TileTask(key, copy.deepcopy(label), (w, h, scale, zoom, dpi, corner_radius),
+                                 token, self._signals)
+                self.pool.start(task)
+        return self._images.get(self._shown.get(slot)), False
+
+    def _stop_waiting(self, slot):
+        key = self._waiting.pop(slot, None)
+        if key is None or key not in self._pending:
+            return
+        token, slots = self._pending[key]
+        slots.discard(slot)
+        if not slots:
+            token.cancelled = True
+            del self._pending[key]
+
+    def _on_rendered(self, key, image):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return  # cancelled after it finished
+        self._images[key] = image
+        self._bytes += image.sizeInBytes()
+        while self._bytes > TILE_CACHE_BYTES and len(self._images) > 1:
+            _, old = self._images.popitem(last=False)
+            self._bytes -= old.sizeInBytes()
+        for slot in pending[1]:
+            if self._waiting.get(slot) == key:
+                del self._waiting[slot]
+                self._shown[slot] = key
+                self.tile_ready.emit(slot)
+
+    def shutdown(self):
+        """Cancel everything queued and wait for the renders in progress."""
+        for token, _ in self._pending.values():
+            token.cancelled = True
+        self._pending.clear()
+        self._waiting.clear()
+        self.pool.clear()
+        self.pool.waitForDone()
@@ -0,0 +1,31 @@
+# label_units.py
+
+# Units shared by the print recording, the backend-neutral layout, auto-fit and preflight.
+# The Qt print path lays text out at screen DPI, so a point size * font scale becomes the
+# same number of device pixels on every printer, and so do the print margin and the logo.
+# Their size in mm therefore depends on the device resolution: every path converts with
+# the dpi of the device it is for (sheet_picture.py records each sheet at that dpi).
+RECORD_DPI = 300  # the PDF export's resolution; the default before a printer is chosen
+SCREEN_DPI = 96
+LINE_HEIGHT = 1.2  # proportional line height used by build_label_document
+TEXT_FIELDS = ("main", "second", "bgn", "eur")
+MEASURE_PX = 100  # fonts are measured once at this pixel size and scaled linearly
+PRINT_MARGIN_PX = 30  # draw_label_print margin in device pixels (print_margin_mm for a dpi)
+
+def px_to_mm(px, dpi=RECORD_DPI):
+    return px / dpi * 25.4
+
+def print_margin_mm(dpi=RECORD_DPI):
+    return px_to_mm(PRINT_MARGIN_PX, dpi)
+
+def text_height_mm(size, font_scale, dpi=RECORD_DPI):
+    """Printed em size in mm of a label field point size at dpi (truncated like build_label_document)."""
+    return px_to_mm(max(1, int(size * font_scale)) * SCREEN_DPI / 72, dpi)
+
+def field_text(key, text):
+    # Same currency decoration as build_label_document
+    if key == "bgn" and text and "лв" not in text:
+        text = text + " лв."
+    if key == "eur" and text and "€" not in text:
+        text = "€" + text
+    return text
@@ -1,5 +1,6 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTextEdit, QLineEdit, QComboBox, QHBoxLayout, QPushButton, QSpinBox, QDoubleSpinBox
+    QWidget, QVBoxLayout, QLabel, QTextEdit, QLineEdit, QComboBox, QHBoxLayout, QPushButton, QSpinBox, QDoubleSpinBox,
+    QCheckBox
 )
 from PyQt5.QtGui import QFont, QIcon
 from PyQt5.QtCore import pyqtSignal
@@ -37,7 +38,18 @@ class LeftPaneWidget(QWidget):
     style_changed = pyqtSignal(str, dict)  # key, style dict
     conversion_changed = pyqtSignal(str)
     print_clicked = pyqtSignal()
+    print_preview_clicked = pyqtSignal()
+    print_changed_clicked = pyqtSignal()
+    sheet_stock_clicked = pyqtSignal()
+    print_queue_clicked = pyqtSignal()
+    quick_print_clicked = pyqtSignal()
+    save_profile_clicked = pyqtSignal()
+    printer_profile_selected = pyqtSignal(str)
     pdf_clicked = pyqtSignal()
+    image_clicked = pyqtSignal()
+    zpl_clicked = pyqtSignal()
+    reprice_clicked = pyqtSignal()
+    catalog_clicked = pyqtSignal()
     logo_settings_changed = pyqtSignal(dict)  # for logo controls
 
     def __init__(self, fonts=None, parent=None):
@@ -110,8 +122,19 @@ class LeftPaneWidget(QWidget):
 
         layout.addLayout(logo_row)
 
+        # --- Bulk repricing ---
+        layout.addSpacing(10)
+        self.reprice_btn = QPushButton("Промяна на цени…")
+        self.reprice_btn.setToolTip("Процент, нов курс или ценова листа за много етикети наведнъж")
+        self.reprice_btn.clicked.connect(self.reprice_clicked.emit)
+        layout.addWidget(self.reprice_btn)
+        self.catalog_btn = QPushButton("Каталог с продукти…")
+        self.catalog_btn.setToolTip("Търсене в каталога и създаване на етикети от резултатите")
+        self.catalog_btn.clicked.connect(self.catalog_clicked.emit)
+        layout.addWidget(self.catalog_btn)
+
         # --- Add fixed space above the buttons ---
-        layout.addSpacing(100)
+        layout.addSpacing(60)
 
         # Print and PDF buttons at bottom left
         btn_row = QHBoxLayout()
@@ -122,9 +145,72 @@ class LeftPaneWidget(QWidget):
         btn_row.addWidget(self.print_btn)
         btn_row.addWidget(self.pdf_btn)
         layout.addLayout(btn_row)
+        self.print_preview_btn = QPushButton("Преглед за печат…")
+        self.print_preview_btn.setToolTip("Листът точно както ще излезе от избрания принтер")
+        self.print_preview_btn.clicked.connect(self.print_preview_clicked.emit)
+        layout.addWidget(self.print_preview_btn)
+        self.image_btn = QPushButton("Запази PNG/TIFF…")
+        self.image_btn.setToolTip("Растерно изображение с висока резолюция (многостраничен TIFF за печатници)")
+        self.image_btn.clicked.connect(self.image_clicked.emit)
+        self.zpl_btn = QPushButton("ZPL за термопринтер…")
+        self.zpl_btn.setToolTip("Етикетите като ZPL команди за Zebra принтери")
+        self.zpl_btn.clicked.connect(self.zpl_clicked.emit)
+        image_row = QHBoxLayout()
+        image_row.addWidget(self.image_btn)
+        image_row.addWidget(self.zpl_btn)
+        layout.addLayout(image_row)
+        profile_row = QHBoxLayout()
+        self.profile_combo = QComboBox()
+        self.profile_combo.setToolTip("Принтерен профил за бърз печат")
+        self.profile_combo.currentTextChanged.connect(self._emit_profile_selected)
+        self.quick_print_btn = QPushButton("Бърз печат")
+        self.quick_print_btn.setToolTip("Печат с избрания профил без диалог")
+        self.quick_print_btn.clicked.connect(self.quick_print_clicked.emit)
+        self.save_profile_btn = QPushButton("Нов профил…")
+        self.save_profile_btn.setToolTip("Настройте принтера веднъж и го запазете като профил")
+        self.save_profile_btn.clicked.connect(self.save_profile_clicked.emit)
+        profile_row.addWidget(self.profile_combo, 1)
+        profile_row.addWidget(self.quick_print_btn)
+        profile_row.addWidget(self.save_profile_btn)
+        layout.addLayout(profile_row)
+        self.print_changed_btn = QPushButton("Печат само на променените")
+        self.print_changed_btn.setToolTip("Отпечатва само етикетите, променени след последния печат (от всички сесии)")
+        self.print_changed_btn.clicked.connect(self.print_changed_clicked.emit)
+        changed_row = QHBoxLayout()
+        changed_row.addWidget(self.print_changed_btn)
+        changed_row.addWidget(QLabel("Копия:"))
+        self.copies_spin = QSpinBox()
+        self.copies_spin.setRange(1, 99)
+        self.copies_spin.setValue(1)
+        self.copies_spin.setToolTip("Брой копия на всеки етикет при печат на променените")
+        changed_row.addWidget(self.copies_spin)
+        layout.addLayout(changed_row)
+        self.sheet_stock_btn = QPushButton("Частично използвани листове…")
+        self.sheet_stock_btn.setToolTip("Листове с вече използвани етикети – попълват се първи")
+        self.sheet_stock_btn.clicked.connect(self.sheet_stock_clicked.emit)
+        layout.addWidget(self.sheet_stock_btn)
+        self.keep_leftover_chk = QCheckBox("Пази остатъка от новите листове")
+        self.keep_leftover_chk.setToolTip("Непълен нов лист се добавя към частично използваните и се попълва при следващ печат")
+        layout.addWidget(self.keep_leftover_chk)
+        self.print_queue_btn = QPushButton("Опашка за печат…")
+        self.print_queue_btn.setToolTip("Печат на няколко сесии наведнъж във фонов режим")
+        self.print_queue_btn.clicked.connect(self.print_queue_clicked.emit)
+        layout.addWidget(self.print_queue_btn)
 
         self.setLayout(layout)
 
+    def set_printer_profiles(self, names, active):
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItems(names)
+        self.profile_combo.setCurrentText(active)
+        self.profile_combo.blockSignals(False)
+        self.quick_print_btn.setEnabled(bool(names))
+
+    def _emit_profile_selected(self, name):
+        if name:
+            self.printer_profile_selected.emit(name)
+
     def _emit_logo_settings(self):
         logo_dict = {
             "position": self.logo_position.currentText(),
@@ -0,0 +1,298 @@
+# page_overview.py
+
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QAbstractScrollArea, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton
+from PyQt5.QtCore import Qt, QThread, QTimer, QRect, QRectF, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen
+
+from label_drawing import draw_label_preview
+from label_greeking import draw_label_greeked
+from preview_pane import PREVIEW_LABEL_SCALE, GREEK_BELOW_PX
+from print_history import is_blank
+from sheet_geometry import sheet_geometry
+from text_fit import fit_label
+
+PAGE_GAP = 28           # px between pages; the page captions sit in it
+THUMB_WIDTH_PX = 240    # thumbnail resolution (page width)
+THUMB_CACHE_SIZE = 48   # thumbnails kept; requests are capped at half of it
+PREFETCH_SCREENS = 1.0  # thumbnails are prepared this many viewport heights above and below
+SETTLE_MS = 150         # scrolling counts as finished after this pause
+MAX_COLUMNS = 8
+
+class PageLayout:
+    """Everything needed to paint a page, taken once from the calibration settings."""
+    def __init__(self, settings):
+        params = settings.get("params", {})
+        self.geometry = sheet_geometry(params, hw_offset=not settings.get("skip_hw_margin", False))
+        self.page_w = float(params.get("page_w", 210))
+        self.page_h = float(params.get("page_h", 297))
+        self.corner_radius = float(params.get("corner_radius", 2.5))
+        # Auto-fit with the print geometry, as the preview pane does
+        self.font_scale = float(params.get("print_font_scale", 12.0)) / PREVIEW_LABEL_SCALE
+
+def render_page(painter, placements, layout, greek, exposed=None):
+    """Paint one page in PREVIEW_LABEL_SCALE units: the white page and the labels inside exposed."""
+    geometry = layout.geometry
+    painter.fillRect(QRectF(0, 0, layout.page_w * PREVIEW_LABEL_SCALE, layout.page_h * PREVIEW_LABEL_SCALE), Qt.white)
+    rects = geometry.device_rects(PREVIEW_LABEL_SCALE, rounded=True)
+    draw = draw_label_greeked if greek else draw_label_preview
+    for slot, label in placements:
+        if slot >= len(rects):
+            continue
+        x, y, w, h = rects[slot]
+        if exposed is not None and not exposed.intersects(QRect(x, y, w, h)):
+            continue
+        if is_blank(label):
+            painter.setPen(QPen(QColor("#dddddd"), 0))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(x, y, w, h, layout.corner_radius, layout.corner_radius)
+            continue
+        label = fit_label(label, geometry.label_w, geometry.label_h, layout.font_scale)
+        draw(painter, x, y, w, h, label, scale=PREVIEW_LABEL_SCALE, corner_radius=layout.corner_radius)
+
+def render_thumbnail(placements, layout):
+    """Greeked low-resolution image of a page (safe outside the GUI thread)."""
+    image = QImage(THUMB_WIDTH_PX, round(THUMB_WIDTH_PX * layout.page_h / layout.page_w), QImage.Format_RGB32)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    zoom = THUMB_WIDTH_PX / (layout.page_w * PREVIEW_LABEL_SCALE)
+    painter.scale(zoom, zoom)
+    render_page(painter, placements, layout, greek=True)
+    painter.end()
+    return image
+
+class ThumbnailWorker(QThread):
+    """Renders page thumbnails nearest first; stops between pages when cancelled."""
+    rendered = pyqtSignal(int, QImage)
+
+    def __init__(self, jobs, layout, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs  # [(page index, placements)]
+        self.page_layout = layout
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        for index, placements in self.jobs:
+            if self._cancelled:
+                return
+            self.rendered.emit(index, render_thumbnail(placements, self.page_layout))
+
+class PageOverview(QAbstractScrollArea):
+    """
+    All pages of a job in a scrollable grid. Only pages in the viewport are
+    painted, and on them only the labels in the exposed area (from the shared
+    sheet geometry), so the cost follows the window, not the job. Small pages
+    and pages passing by while scrolling are blitted from greeked thumbnails,
+    rendered in a worker for the area around the viewport and kept in a
+    bounded LRU cache.
+    """
+    columns_changed = pyqtSignal(int)
+
+    def __init__(self, pages, captions, settings, parent=None):
+        super().__init__(parent)
+        self.pages = pages  # [[(slot, label)]]
+        self.captions = captions
+        self.page_layout = PageLayout(settings)
+        self.columns = 2
+        self._thumbs = OrderedDict()  # page index -> QImage
+        self._worker = None
+        self._pending = None
+        self._requested = []
+        self._scrolling = False
+        self._settle = QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(SETTLE_MS)
+        self._settle.timeout.connect(self._on_settled)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+
+    # --- Layout: uniform page cells, so the visible range is computed, not searched ---
+
+    def page_size(self):
+        width = max(40, (self.viewport().width() - (self.columns + 1) * PAGE_GAP) // self.columns)
+        return width, round(width * self.page_layout.page_h / self.page_layout.page_w)
+
+    def page_rect(self, index):
+        """Page rectangle in content coordinates (scroll offset not applied)."""
+        w, h = self.page_size()
+        row, col = divmod(index, self.columns)
+        return QRect(PAGE_GAP + col * (w + PAGE_GAP), PAGE_GAP + row * (h + PAGE_GAP), w, h)
+
+    def pages_between(self, top, bottom):
+        """Indices of the pages whose rows overlap content y range [top, bottom)."""
+        _, h = self.page_size()
+        row_h = h + PAGE_GAP
+        first = max(0, (top - PAGE_GAP) // row_h)
+        last = max(0, (bottom - PAGE_GAP) // row_h)
+        return range(first * self.columns, min(len(self.pages), (last + 1) * self.columns))
+
+    def set_columns(self, columns):
+        columns = max(1, min(MAX_COLUMNS, columns))
+        if columns == self.columns:
+            return
+        # Keep the page at the top of the window in view
+        _, h = self.page_size()
+        top_page = self.verticalScrollBar().value() // (h + PAGE_GAP) * self.columns
+        self.columns = columns
+        self._update_scrollbar()
+        self.verticalScrollBar().setValue(self.page_rect(top_page).top() - PAGE_GAP)
+        self.viewport().update()
+        self.columns_changed.emit(columns)
+
+    def _update_scrollbar(self):
+        _, h = self.page_size()
+        rows = (len(self.pages) + self.columns - 1) // self.columns
+        total = PAGE_GAP + rows * (h + PAGE_GAP)
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, total - self.viewport().height()))
+        bar.setPageStep(self.viewport().height())
+        bar.setSingleStep(max(20, h // 10))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbar()
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            steps = event.angleDelta().y() // 120
+            self.set_columns(self.columns - steps)
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    # --- Painting ---
+
+    def paintEvent(self, event):
+        qp = QPainter(self.viewport())
+        qp.setRenderHint(QPainter.Antialiasing)
+        qp.fillRect(event.rect(), QColor("#e4e4e4"))
+        scroll = self.verticalScrollBar().value()
+        w, h = self.page_size()
+        px_per_mm = w / self.page_layout.page_w
+        live = w > THUMB_WIDTH_PX and not self._scrolling
+        greek = self.page_layout.geometry.label_h * px_per_mm < GREEK_BELOW_PX
+        exposed = event.rect().translated(0, scroll)
+        for index in self.pages_between(exposed.top(), exposed.bottom() + 1):
+            rect = self.page_rect(index)
+            if not rect.adjusted(0, -PAGE_GAP, 0, 0).intersects(exposed):
+                continue
+            rect.translate(0, -scroll)
+            qp.setPen(QColor("#555"))
+            qp.drawText(QRect(rect.left(), rect.top() - PAGE_GAP, rect.width(), PAGE_GAP),
+                        Qt.AlignLeft | Qt.AlignVCenter, self.captions[index])
+            thumb = self._thumbs.get(index)
+            if thumb is not None:
+                self._thumbs.move_to_end(index)
+            if live or thumb is None and w > THUMB_WIDTH_PX:
+                qp.save()
+                qp.setClipRect(rect)
+                qp.translate(rect.topLeft())
+                zoom = px_per_mm / PREVIEW_LABEL_SCALE
+                qp.scale(zoom, zoom)
+                render_page(qp, self.pages[index], self.page_layout, greek,
+                            qp.worldTransform().inverted()[0].mapRect(event.rect()))
+                qp.restore()
+            elif thumb is not None:
+                qp.drawImage(rect, thumb)
+            else:
+                qp.fillRect(rect, Qt.white)  # placeholder until the thumbnail arrives
+            qp.setPen(QColor("#bbbbbb"))
+            qp.setBrush(Qt.NoBrush)
+            qp.drawRect(rect)
+        qp.end()
+        self._request_thumbnails()
+
+    # --- Thumbnails ---
+
+    def _on_scrolled(self, _value):
+        self._scrolling = True
+        self._settle.start()
+        self.viewport().update()
+
+    def _on_settled(self):
+        self._scrolling = False
+        self.viewport().update()
+
+    def _request_thumbnails(self):
+        """Queue the missing thumbnails around the viewport, nearest to its centre first."""
+        scroll = self.verticalScrollBar().value()
+        height = self.viewport().height()
+        margin = int(height * PREFETCH_SCREENS)
+        centre = scroll + height / 2
+        wanted = sorted(self.pages_between(scroll - margin, scroll + height + margin),
+                        key=lambda i: abs(self.page_rect(i).center().y() - centre))[:THUMB_CACHE_SIZE // 2]
+        missing = [i for i in wanted if i not in self._thumbs]
+        if missing == self._requested:
+            return
+        self._requested = missing
+        if self._worker is not None:
+            self._worker.cancel()  # the window moved; _on_finished starts the new request
+        self._pending = missing
+        self._start()
+
+    def _start(self):
+        if not self._pending or self._worker is not None:
+            return
+        jobs = [(i, self.pages[i]) for i in self._pending]
+        self._pending = None
+        self._worker = ThumbnailWorker(jobs, self.page_layout, self)
+        self._worker.rendered.connect(self._on_rendered)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.start()
+
+    def _on_finished(self):
+        self._worker.deleteLater()
+        self._worker = None
+        self._start()
+
+    def _on_rendered(self, index, image):
+        self._thumbs[index] = image
+        self._thumbs.move_to_end(index)
+        while len(self._thumbs) > THUMB_CACHE_SIZE:
+            self._thumbs.popitem(last=False)
+        if index in self._requested:
+            self._requested.remove(index)
+        self.viewport().update(self.page_rect(index).translated(0, -self.verticalScrollBar().value()))
+
+    def stop(self):
+        self._pending = None
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker.wait()
+
+class PageOverviewDialog(QDialog):
+    """Scrollable overview of every page of a multi-sheet job."""
+    def __init__(self, pages, captions, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Преглед на листовете ({len(pages)})")
+        self.resize(900, 760)
+        layout = QVBoxLayout(self)
+        self.overview = PageOverview(pages, captions, settings, self)
+        top_row = QHBoxLayout()
+        top_row.addWidget(QLabel("Листове на ред:"))
+        self.columns_spin = QSpinBox()
+        self.columns_spin.setRange(1, MAX_COLUMNS)
+        self.columns_spin.setValue(self.overview.columns)
+        self.columns_spin.setToolTip("Също Ctrl + колелце")
+        self.columns_spin.valueChanged.connect(self.overview.set_columns)
+        self.overview.columns_changed.connect(self.columns_spin.setValue)
+        top_row.addWidget(self.columns_spin)
+        top_row.addStretch(1)
+        layout.addLayout(top_row)
+        layout.addWidget(self.overview, 1)
+        close_btn = QPushButton("Затвори")
+        close_btn.clicked.connect(self.close)
+        btn_row = QHBoxLayout()
+        btn_row.addStretch(1)
+        btn_row.addWidget(close_btn)
+        layout.addLayout(btn_row)
+
+    def closeEvent(self, event):
+        self.overview.stop()
+        super().closeEvent(event)
@@ -0,0 +1,169 @@
+# preflight.py
+
+import copy
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from label_layout import text_block
+from label_units import RECORD_DPI
+from print_history import label_fingerprint, is_blank
+from sheet_geometry import sheet_geometry
+from text_fit import fit_label
+
+MEASURE_CACHE_SIZE = 512
+DEBOUNCE_MS = 300
+EPS_MM = 0.05
+
+ERROR = "error"
+WARNING = "warning"
+
+# --- Layout measurement: the same text layout every output backend draws, cached per label ---
+
+_measured = OrderedDict()
+_measured_lock = threading.Lock()
+
+def measure_label(label, w, font_scale, dpi=RECORD_DPI):
+    """(text block height in mm, word wider than the text box) of a label w mm wide; cached per fingerprint."""
+    key = (label_fingerprint(label), w, font_scale, dpi)
+    with _measured_lock:
+        if key in _measured:
+            _measured.move_to_end(key)
+            return _measured[key]
+    result = text_block(label, w, font_scale, dpi)
+    with _measured_lock:
+        _measured[key] = result
+        if len(_measured) > MEASURE_CACHE_SIZE:
+            _measured.popitem(last=False)
+    return result
+
+# --- Checks ---
+
+def preflight_geometry(settings):
+    """Label size, slot rectangles and the printer's printable area, all in mm on the page."""
+    params = settings.get("params", {})
+    scale = float(params.get("user_scale_factor", 1.0))
+    hw = {k: float(params.get(k, 0)) for k in ("hw_left", "hw_top", "hw_right", "hw_bottom")}
+    # render_sheet drops the offset when printing without margins, the printer keeps them
+    slots = sheet_geometry(params, hw_offset=not settings.get("skip_hw_margin", False)).device_rects(scale)
+    label_w, label_h = float(params.get("label_w", 63.5)), float(params.get("label_h", 38.1))
+    page_w, page_h = float(params.get("page_w", 210)), float(params.get("page_h", 297))
+    printable = (hw["hw_left"], hw["hw_top"], page_w - hw["hw_right"], page_h - hw["hw_bottom"])
+    return label_w, label_h, scale, slots, printable
+
+def check_label(label, slot, geometry, font_scale, dpi=RECORD_DPI):
+    """[(severity, message)] for one label at a sheet position, as printed at dpi."""
+    if is_blank(label):
+        return []
+    label_w, label_h, scale, slots, printable = geometry
+    issues = []
+    x, y, w, h = slots[slot % len(slots)]
+    left, top, right, bottom = printable
+    if x < left - EPS_MM or y < top - EPS_MM or x + w > right + EPS_MM or y + h > bottom + EPS_MM:
+        issues.append((ERROR, "Етикетът излиза извън полето за печат на принтера"))
+
+    fitted = fit_label(label, label_w, label_h, font_scale, dpi)
+    block_h, too_wide = measure_label(fitted, label_w * scale, font_scale, dpi)
+    if block_h > label_h * scale + EPS_MM:
+        issues.append((ERROR, "Текстът не се побира по височина"))
+    if too_wide:
+        issues.append((ERROR, "Дума е по-широка от етикета и излиза извън него"))
+
+    if label.get("main", {}).get("text", "").strip():
+        if not label.get("bgn", {}).get("text", "").strip():
+            issues.append((WARNING, "Липсва цена в лв."))
+        if not label.get("eur", {}).get("text", "").strip():
+            issues.append((WARNING, "Липсва цена в €"))
+    return issues
+
+def check_labels(labels, settings, font_scale, dpi=RECORD_DPI):
+    """{label index: [(severity, message)]} for every label with a problem; labels beyond one sheet continue on the next."""
+    geometry = preflight_geometry(settings)
+    issues = {}
+    for idx, label in enumerate(labels):
+        found = check_label(label, idx, geometry, font_scale, dpi)
+        if found:
+            issues[idx] = found
+    return issues
+
+def issues_summary(issues, per_page, limit=12):
+    """Text for the confirmation shown before printing or exporting."""
+    lines = []
+    for idx in sorted(issues):
+        page, pos = divmod(idx, per_page)
+        where = f"Етикет {pos + 1}" if page == 0 else f"Лист {page + 1}, етикет {pos + 1}"
+        for _, message in issues[idx]:
+            lines.append(f"{where}: {message}")
+    more = len(lines) - limit
+    text = "\n".join(lines[:limit])
+    if more > 0:
+        text += f"\n… и още {more}"
+    return text
+
+# --- Background checking ---
+
+class PreflightWorker(QThread):
+    """Checks a snapshot of the labels off the GUI thread."""
+    checked = pyqtSignal(int, dict)  # generation, issues
+
+    def __init__(self, generation, labels, settings, font_scale, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.labels = labels
+        self.settings = settings
+        self.font_scale = font_scale
+
+    def run(self):
+        self.checked.emit(self.generation, check_labels(self.labels, self.settings, self.font_scale))
+
+class Preflight(QObject):
+    """
+    Re-checks the labels in a worker shortly after they change. Unchanged labels
+    come from the measurement cache, so only edited labels are laid out again.
+    Results of a snapshot that was superseded while it ran are dropped.
+    """
+    issues_changed = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.issues = {}
+        self._generation = 0
+        self._pending = None
+        self._worker = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start)
+
+    def schedule(self, labels, settings, font_scale):
+        # Snapshot now: the editor keeps mutating its label dicts in place
+        self._generation += 1
+        self._pending = (self._generation, copy.deepcopy(labels), settings, font_scale)
+        self._timer.start()
+
+    def _start(self):
+        if self._pending is None or (self._worker is not None and self._worker.isRunning()):
+            return
+        generation, labels, settings, font_scale = self._pending
+        self._pending = None
+        self._worker = PreflightWorker(generation, labels, settings, font_scale, self)
+        self._worker.checked.connect(self._on_checked)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.start()
+
+    def _on_finished(self):
+        self._worker.deleteLater()
+        self._worker = None
+        # Labels edited while the worker ran are checked right away
+        self._start()
+
+    def _on_checked(self, generation, issues):
+        if generation != self._generation:
+            return
+        self.issues = issues
+        self.issues_changed.emit(issues)
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.wait()
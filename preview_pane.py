@@ -1,30 +1,44 @@
-from PyQt5.QtWidgets import QWidget, QSizePolicy
-from PyQt5.QtCore import Qt, pyqtSignal, QRect
+from PyQt5.QtWidgets import QWidget, QSizePolicy, QAbstractScrollArea, QStyle
+from PyQt5.QtCore import Qt, pyqtSignal, QRect, QRectF
 from PyQt5.QtGui import QColor, QPainter, QPen
-import os
-import json
 
-# Import the label preview drawing function
-from label_drawing import draw_label_preview
+from label_greeking import draw_label_greeked
+from label_tiles import LabelTiles
+from text_fit import fit_label
+from sheet_geometry import grid_geometry
+from sheet_settings import sheet_settings_store
 
 PREVIEW_LABEL_SCALE = 3.2  # Preview scale for UI
 PREVIEW_LABEL_GAP = 5      # gap in px
+BADGE_SIZE = 16            # preflight warning badge diameter in px
+
+# Zoom: 1.0 shows labels at PREVIEW_LABEL_SCALE; the fit modes follow the available space
+FIT_PAGE = "page"
+FIT_WIDTH = "width"
+MIN_ZOOM = 0.2
+MAX_ZOOM = 4.0
+WHEEL_ZOOM_STEP = 1.15
+GREEK_BELOW_PX = 60  # labels shorter than this on screen get placeholder bars instead of text
+
+def load_sheet_params():
+    # Live calibration from the shared settings store (no restart needed)
+    return sheet_settings_store().params()
 
 def load_current_corner_radius():
-    # Reads corner_radius from sheet_settings.json each time (no restart needed)
-    try:
-        appdata_path = os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "LabelTool")
-        sheet_settings_path = os.path.join(appdata_path, "sheet_settings.json")
-        with open(sheet_settings_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        params = data.get("params", {})
-        return float(params.get("corner_radius", 2.5))
-    except Exception:
-        return 2.5
+    return float(load_sheet_params().get("corner_radius", 2.5))
 
 class PreviewPaneWidget(QWidget):
+    """
+    Sheet preview with zoom. Labels are always laid out at PREVIEW_LABEL_SCALE and
+    the painter scales them, so line breaks do not change with the zoom. Below
+    GREEK_BELOW_PX the full rich-text layout is replaced by greeked line bars.
+    Ctrl+wheel zooms; inside a QScrollArea the fit modes fill its viewport.
+    Readable labels are rasterized on a thread pool (label_tiles); until a tile
+    is ready its previous image, or the greeked version, stands in.
+    """
     label_clicked = pyqtSignal(int, object)
     label_right_clicked = pyqtSignal(int, object)
+    zoom_changed = pyqtSignal(float)
 
     def __init__(self, labels, rows, cols, label_w_mm, label_h_mm, spacing_px=12, parent=None):
         super().__init__(parent)
@@ -35,10 +49,16 @@ class PreviewPaneWidget(QWidget):
         self.label_h_mm = label_h_mm
         self.gap = PREVIEW_LABEL_GAP
         self.selected = []
-        self.setMinimumSize(600, 400)
+        self.zoom_mode = FIT_PAGE  # FIT_PAGE, FIT_WIDTH or None for the manual zoom
+        self.manual_zoom = 1.0
+        self._zoom = None  # last reported zoom
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setMouseTracking(True)
         self.hovered_index = None  # <-- For hover effect
+        self.issues = {}  # label index -> [(severity, message)] from the preflight check
+        self.tiles = LabelTiles(self)
+        self.tiles.tile_ready.connect(lambda _: self.update())
+        self.update_extent()
 
     def update_labels(self, labels):
         self.labels = labels
@@ -48,89 +68,176 @@ class PreviewPaneWidget(QWidget):
         self.selected = selected
         self.update()
 
+    def set_issues(self, issues):
+        self.issues = issues
+        self.update()
+
     def update_calibration(self, rows, cols, label_w_mm, label_h_mm):
         self.rows = rows
         self.cols = cols
         self.label_w_mm = label_w_mm
         self.label_h_mm = label_h_mm
+        self.update_extent()
+
+    # --- Zoom ---
+
+    def label_grid(self):
+        gap_mm = self.gap / PREVIEW_LABEL_SCALE
+        return grid_geometry(self.rows, self.cols, self.label_w_mm, self.label_h_mm, gap_mm, gap_mm)
+
+    def available_size(self):
+        """Space the fit modes fill: the enclosing scroll area (room kept for its scroll bar) or the widget."""
+        viewport = self.parentWidget()
+        area = viewport.parentWidget() if viewport is not None else None
+        if isinstance(area, QAbstractScrollArea):
+            rect = area.contentsRect()
+            bar = self.style().pixelMetric(QStyle.PM_ScrollBarExtent)
+            # Fit width always leaves the bar's room, so the bar appearing cannot change the zoom
+            return rect.width() - (bar if self.zoom_mode == FIT_WIDTH else 0), rect.height()
+        return self.width(), self.height()
+
+    def zoom(self):
+        if self.zoom_mode is None:
+            return self.manual_zoom
+        grid_w, grid_h = self.label_grid().size_mm()
+        avail_w, avail_h = self.available_size()
+        zoom = (avail_w - 2 * self.gap) / (grid_w * PREVIEW_LABEL_SCALE)
+        if self.zoom_mode == FIT_PAGE:
+            zoom = min(zoom, (avail_h - 2 * self.gap) / (grid_h * PREVIEW_LABEL_SCALE))
+        return max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+
+    def set_zoom_mode(self, mode, zoom=None):
+        """FIT_PAGE, FIT_WIDTH, or None with a zoom factor (1.0 = 100%)."""
+        self.zoom_mode = mode
+        if zoom is not None:
+            self.manual_zoom = max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+        self.update_extent()
+
+    def update_extent(self):
+        """Minimum size for the current zoom, so an enclosing scroll area can scroll the sheet."""
+        zoom = self.zoom()
+        grid_w, grid_h = self.label_grid().size_mm()
+        self.setMinimumSize(round(grid_w * PREVIEW_LABEL_SCALE * zoom) + 2 * self.gap,
+                            round(grid_h * PREVIEW_LABEL_SCALE * zoom) + 2 * self.gap)
+        if zoom != self._zoom:
+            self._zoom = zoom
+            self.zoom_changed.emit(zoom)
         self.update()
 
+    def resizeEvent(self, event):
+        if self.zoom_mode is not None:
+            self.update_extent()
+        super().resizeEvent(event)
+
+    def wheelEvent(self, event):
+        if not event.modifiers() & Qt.ControlModifier:
+            event.ignore()  # plain wheel scrolls the enclosing scroll area
+            return
+        steps = event.angleDelta().y() / 120
+        if steps:
+            self.set_zoom_mode(None, self.zoom() * WHEEL_ZOOM_STEP ** steps)
+        event.accept()
+
+    def grid(self):
+        """Preview grid geometry, its origin (centred in the widget) and px per mm at the current zoom."""
+        geometry = self.label_grid()
+        px_per_mm = PREVIEW_LABEL_SCALE * self.zoom()
+        grid_w, grid_h = geometry.size_mm()
+        total_w = round(grid_w * px_per_mm)
+        total_h = round(grid_h * px_per_mm)
+        left = (self.width() - total_w) // 2 if self.width() > total_w else 0
+        top = (self.height() - total_h) // 2 if self.height() > total_h else 0
+        return geometry, (left, top), px_per_mm
+
+    def label_index_at(self, pos):
+        geometry, origin, px_per_mm = self.grid()
+        idx = geometry.slot_at(pos.x(), pos.y(), px_per_mm, origin)
+        return idx if idx is not None and idx < len(self.labels) else None
+
     def paintEvent(self, event):
         qp = QPainter(self)
         qp.setRenderHint(QPainter.Antialiasing)
-        label_w_px = int(self.label_w_mm * PREVIEW_LABEL_SCALE)
-        label_h_px = int(self.label_h_mm * PREVIEW_LABEL_SCALE)
-        gap_px = self.gap
-        total_w = self.cols * label_w_px + (self.cols - 1) * gap_px
-        total_h = self.rows * label_h_px + (self.rows - 1) * gap_px
-        avail_w = self.width()
-        avail_h = self.height()
-        # Center the grid
-        left = (avail_w - total_w) // 2 if avail_w > total_w else 0
-        top = (avail_h - total_h) // 2 if avail_h > total_h else 0
-
-        # Get the latest radius from settings
-        corner_radius = load_current_corner_radius()
-
-        idx = 0
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if idx >= len(self.labels):
-                    break
-                x = left + col * (label_w_px + gap_px)
-                y = top + row * (label_h_px + gap_px)
-                # Draw selection highlight border
-                if idx in self.selected:
-                    qp.save()
-                    qp.setPen(QPen(QColor(70, 130, 255), 3))
-                    qp.setBrush(Qt.NoBrush)
-                    qp.drawRoundedRect(x, y, label_w_px, label_h_px,
-                                      corner_radius, corner_radius)
-                    qp.restore()
-                # Draw hover effect (AFTER selection so it's visible)
-                if idx == self.hovered_index:
-                    qp.save()
-                    qp.setPen(QPen(QColor(130, 200, 255, 180), 4, Qt.DashLine))
-                    qp.setBrush(Qt.NoBrush)
-                    qp.drawRoundedRect(x, y, label_w_px, label_h_px,
-                                      corner_radius, corner_radius)
-                    qp.restore()
-                # Draw the label itself
-                draw_label_preview(qp, x, y, label_w_px, label_h_px, self.labels[idx],
-                                  scale=PREVIEW_LABEL_SCALE, corner_radius=corner_radius)
-                idx += 1
+        geometry, origin, px_per_mm = self.grid()
+        zoom = px_per_mm / PREVIEW_LABEL_SCALE
+        # Labels are laid out at 100% and scaled by the painter; badges stay in widget pixels
+        rects = geometry.device_rects(PREVIEW_LABEL_SCALE, rounded=True)
+        qp.translate(*origin)
+        qp.scale(zoom, zoom)
+        greek = geometry.label_h * px_per_mm < GREEK_BELOW_PX
+        tile_zoom = zoom * self.devicePixelRatioF()
+        dpi = self.logicalDpiY()
+        exposed = qp.worldTransform().inverted()[0].mapRect(event.rect())
 
-    def mouseMoveEvent(self, event):
-        label_w_px = int(self.label_w_mm * PREVIEW_LABEL_SCALE)
-        label_h_px = int(self.label_h_mm * PREVIEW_LABEL_SCALE)
-        gap_px = self.gap
-        total_w = self.cols * label_w_px + (self.cols - 1) * gap_px
-        total_h = self.rows * label_h_px + (self.rows - 1) * gap_px
-        avail_w = self.width()
-        avail_h = self.height()
-        left = (avail_w - total_w) // 2 if avail_w > total_w else 0
-        top = (avail_h - total_h) // 2 if avail_h > total_h else 0
+        # Get the latest radius and print font scale from settings
+        params = load_sheet_params()
+        corner_radius = float(params.get("corner_radius", 2.5))
+        # Auto-fit sizes are resolved with the print geometry so preview and print agree
+        print_font_scale = float(params.get("print_font_scale", 12.0)) / PREVIEW_LABEL_SCALE
 
+        for idx, (x, y, label_w_px, label_h_px) in enumerate(rects[:len(self.labels)]):
+            if not exposed.intersects(QRect(x, y, label_w_px, label_h_px).adjusted(-4, -4, 4, 4)):
+                continue
+            # Draw selection highlight border
+            if idx in self.selected:
+                qp.save()
+                pen = QPen(QColor(70, 130, 255), 3)
+                pen.setCosmetic(True)
+                qp.setPen(pen)
+                qp.setBrush(Qt.NoBrush)
+                qp.drawRoundedRect(x, y, label_w_px, label_h_px,
+                                  corner_radius, corner_radius)
+                qp.restore()
+            # Draw hover effect (AFTER selection so it's visible)
+            if idx == self.hovered_index:
+                qp.save()
+                pen = QPen(QColor(130, 200, 255, 180), 4, Qt.DashLine)
+                pen.setCosmetic(True)
+                qp.setPen(pen)
+                qp.setBrush(Qt.NoBrush)
+                qp.drawRoundedRect(x, y, label_w_px, label_h_px,
+                                  corner_radius, corner_radius)
+                qp.restore()
+            # Draw the label itself
+            label = fit_label(self.labels[idx], self.label_w_mm, self.label_h_mm, print_font_scale)
+            image = None
+            if not greek:
+                image, _ = self.tiles.tile(idx, label, label_w_px, label_h_px, PREVIEW_LABEL_SCALE,
+                                           tile_zoom, dpi, corner_radius)
+            if image is not None:
+                qp.drawImage(QRectF(x, y, label_w_px, label_h_px), image)
+            else:
+                # Small labels, and the placeholder while a tile renders
+                draw_label_greeked(qp, x, y, label_w_px, label_h_px, label,
+                                   scale=PREVIEW_LABEL_SCALE, corner_radius=corner_radius)
+            if idx in self.issues:
+                qp.save()
+                qp.resetTransform()
+                self.draw_issue_badge(qp, round(origin[0] + (x + label_w_px) * zoom), round(origin[1] + y * zoom),
+                                      self.issues[idx])
+                qp.restore()
+
+    def draw_issue_badge(self, qp, right, top, issues):
+        # Red for problems that spoil the print, amber for warnings only
+        error = any(severity == "error" for severity, _ in issues)
+        qp.save()
+        qp.setPen(Qt.NoPen)
+        qp.setBrush(QColor(220, 50, 47) if error else QColor(240, 160, 20))
+        badge = QRect(right - BADGE_SIZE - 3, top + 3, BADGE_SIZE, BADGE_SIZE)
+        qp.drawEllipse(badge)
+        font = qp.font()
+        font.setBold(True)
+        font.setPixelSize(BADGE_SIZE - 4)
+        qp.setFont(font)
+        qp.setPen(Qt.white)
+        qp.drawText(badge, Qt.AlignCenter, "!")
+        qp.restore()
+
+    def mouseMoveEvent(self, event):
         old_hover = self.hovered_index
-        idx = 0
-        found = False
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if idx >= len(self.labels):
-                    break
-                x = left + col * (label_w_px + gap_px)
-                y = top + row * (label_h_px + gap_px)
-                rect = QRect(x, y, label_w_px, label_h_px)
-                if rect.contains(event.pos()):
-                    self.hovered_index = idx
-                    found = True
-                    break
-                idx += 1
-            if found:
-                break
-        else:
-            self.hovered_index = None
+        self.hovered_index = self.label_index_at(event.pos())
         if self.hovered_index != old_hover:
+            issues = self.issues.get(self.hovered_index, [])
+            self.setToolTip("\n".join(message for _, message in issues))
             self.update()
 
     def leaveEvent(self, event):
@@ -141,28 +248,10 @@ class PreviewPaneWidget(QWidget):
     def mousePressEvent(self, event):
         if event.button() not in (Qt.LeftButton, Qt.RightButton):
             return
-        label_w_px = int(self.label_w_mm * PREVIEW_LABEL_SCALE)
-        label_h_px = int(self.label_h_mm * PREVIEW_LABEL_SCALE)
-        gap_px = self.gap
-        total_w = self.cols * label_w_px + (self.cols - 1) * gap_px
-        total_h = self.rows * label_h_px + (self.rows - 1) * gap_px
-        avail_w = self.width()
-        avail_h = self.height()
-        left = (avail_w - total_w) // 2 if avail_w > total_w else 0
-        top = (avail_h - total_h) // 2 if avail_h > total_h else 0
-
-        idx = 0
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if idx >= len(self.labels):
-                    break
-                x = left + col * (label_w_px + gap_px)
-                y = top + row * (label_h_px + gap_px)
-                rect = QRect(x, y, label_w_px, label_h_px)
-                if rect.contains(event.pos()):
-                    if event.button() == Qt.LeftButton:
-                        self.label_clicked.emit(idx, event)
-                    elif event.button() == Qt.RightButton:
-                        self.label_right_clicked.emit(idx, event)
-                    break
-                idx += 1
+        idx = self.label_index_at(event.pos())
+        if idx is None:
+            return
+        if event.button() == Qt.LeftButton:
+            self.label_clicked.emit(idx, event)
+        elif event.button() == Qt.RightButton:
+            self.label_right_clicked.emit(idx, event)
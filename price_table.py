@@ -0,0 +1,162 @@
+# price_table.py
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from currency_manager import EXCHANGE_RATE, parse_price
+from product_catalog import PRODUCT_FIELDS, fill_label_converted
+
+COLUMNS = PRODUCT_FIELDS
+
+def normalize_name(text):
+    return " ".join((text or "").split()).lower()
+
+def normalize_sku(sku):
+    # Price lists match SKUs case-insensitively (see bulk_pricing.label_key)
+    return str(sku).strip().lower()
+
+def _trigrams(text, pad=True):
+    # Indexed names are padded so short words still produce trigrams; queries are not,
+    # since a substring query may end in the middle of a word
+    padded = f"  {text} " if pad else text
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+def _price(value, which):
+    if value is None or value == "":
+        return None
+    return parse_price(str(value), which)
+
+class PriceTable:
+    """
+    Columnar product/price table kept alongside the label model.
+    Each column is a plain list indexed by row number. Lookups go through
+    a hash index on SKU, a sorted prefix index and a trigram index on the
+    normalized name, so they stay sublinear with tens of thousands of rows.
+    Labels filled from a row carry its "sku" and are linked back by index,
+    so sync, reprint and reprice reach a product's labels without a scan.
+    """
+    def __init__(self):
+        self.columns = {c: [] for c in COLUMNS}
+        self._sku_index = {}                   # normalized sku -> row
+        self._prefix_index = []                # sorted [(normalized name, row)]
+        self._trigram_index = defaultdict(set) # trigram -> {rows}
+        self._label_links = defaultdict(set)   # normalized sku -> {label indices}
+        self._unlinked = set()                 # label indices without a sku
+
+    def __len__(self):
+        return len(self.columns["sku"])
+
+    # --- Building ---
+    def upsert(self, sku, name, second="", bgn=None, eur=None, unit=""):
+        """Insert a product or update the row with the same SKU. Returns the row number."""
+        sku = str(sku).strip()
+        values = {
+            "sku": sku, "name": name or "", "second": second or "",
+            "bgn": _price(bgn, "bgn"), "eur": _price(eur, "eur"), "unit": unit or "",
+        }
+        row = self._sku_index.get(normalize_sku(sku))
+        if row is None:
+            row = len(self)
+            for c in COLUMNS:
+                self.columns[c].append(values[c])
+            self._sku_index[normalize_sku(sku)] = row
+        else:
+            self._unindex_name(row)
+            for c in COLUMNS:
+                self.columns[c][row] = values[c]
+        self._index_name(row)
+        return row
+
+    def upsert_product(self, product):
+        """upsert() for a catalog product dict (PRODUCT_FIELDS keys)."""
+        return self.upsert(product["sku"], product.get("name", ""), product.get("second", ""),
+                           product.get("bgn"), product.get("eur"), product.get("unit", ""))
+
+    def _index_name(self, row):
+        name = normalize_name(self.columns["name"][row])
+        insort(self._prefix_index, (name, row))
+        for tri in _trigrams(name):
+            self._trigram_index[tri].add(row)
+
+    def _unindex_name(self, row):
+        name = normalize_name(self.columns["name"][row])
+        pos = bisect_left(self._prefix_index, (name, row))
+        if pos < len(self._prefix_index) and self._prefix_index[pos] == (name, row):
+            del self._prefix_index[pos]
+        for tri in _trigrams(name):
+            rows = self._trigram_index.get(tri)
+            if rows:
+                rows.discard(row)
+
+    # --- Lookups ---
+    def row(self, row):
+        return {c: self.columns[c][row] for c in COLUMNS}
+
+    def find_sku(self, sku):
+        return self._sku_index.get(normalize_sku(sku))
+
+    def search(self, text, limit=50):
+        """Rows whose name starts with text (first) or contains it, best matches first."""
+        query = normalize_name(text)
+        if not query:
+            return []
+        found = []
+        pos = bisect_left(self._prefix_index, (query, -1))
+        while pos < len(self._prefix_index) and len(found) < limit:
+            name, row = self._prefix_index[pos]
+            if not name.startswith(query):
+                break
+            found.append(row)
+            pos += 1
+        if len(found) >= limit or len(query) < 3:
+            return found
+        # Substring matches: intersect the trigram posting lists, smallest first
+        postings = sorted((self._trigram_index.get(tri, set()) for tri in _trigrams(query, pad=False)), key=len)
+        if not postings or not postings[0]:
+            return found
+        candidates = set(postings[0]).intersection(*postings[1:])
+        seen = set(found)
+        names = self.columns["name"]
+        for row in sorted(candidates):
+            if row not in seen and query in normalize_name(names[row]):
+                found.append(row)
+                if len(found) >= limit:
+                    break
+        return found
+
+    # --- Label links ---
+    def link_labels(self, labels):
+        """Rebuild the sku -> label index links from the "sku" key of each label."""
+        self._label_links = defaultdict(set)
+        self._unlinked = set()
+        for idx, label in enumerate(labels):
+            sku = label.get("sku")
+            if sku:
+                self._label_links[normalize_sku(sku)].add(idx)
+            else:
+                self._unlinked.add(idx)
+        return self
+
+    def linked_skus(self):
+        return [sku for sku, indices in self._label_links.items() if indices]
+
+    def labels_for(self, sku):
+        return sorted(self._label_links.get(normalize_sku(sku), ()))
+
+    def labels_for_rows(self, rows):
+        skus = self.columns["sku"]
+        return sorted({idx for row in rows for idx in self._label_links.get(normalize_sku(skus[row]), ())})
+
+    def labels_for_keys(self, keys):
+        """
+        Labels a price list keyed by SKU or product name (see bulk_pricing.label_key) can
+        reach: those linked to one of its SKUs, plus every label without a SKU.
+        """
+        found = set(self._unlinked)
+        for key in keys:
+            found.update(self._label_links.get(normalize_sku(key), ()))
+        return sorted(found)
+
+    def fill_label(self, label, row, mode, rate=EXCHANGE_RATE):
+        """Write a product row into a label dict (texts only), converting a missing price in mode."""
+        return fill_label_converted(label, self.row(row), mode, rate)
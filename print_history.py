@@ -0,0 +1,71 @@
+# print_history.py
+
+import os
+import json
+import hashlib
+
+from PyQt5.QtGui import QColor
+
+from session_manager import default_session_dir
+
+HISTORY_FILENAME = "print_history.json"
+TEXT_FIELDS = ("main", "second", "bgn", "eur")
+
+def history_path():
+    return os.path.join(default_session_dir(), HISTORY_FILENAME)
+
+def label_fingerprint(label):
+    """Hash of everything that affects the printed label (texts, styles, logo); the sku link is ignored."""
+    content = {k: v for k, v in label.items() if k != "sku"}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def has_content(label):
+    """True when the label prints anything besides its outline: text, a logo or a field background."""
+    if any(label.get(k, {}).get("text", "").strip() for k in TEXT_FIELDS):
+        return True
+    if (label.get("logo") or {}).get("position", "без лого") != "без лого":
+        return True
+    return any(QColor(label.get(k, {}).get("bg_color", "#fff")) != QColor("#fff") for k in TEXT_FIELDS)
+
+def is_blank(label):
+    return not has_content(label)
+
+class PrintHistory:
+    """
+    Fingerprint of every label position at the time it was last printed,
+    keyed by session file path and label index. Used to print only labels
+    whose content changed since the last successful print.
+    """
+    def __init__(self, path=None):
+        self.path = path or history_path()
+        self.records = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.records = json.load(f)
+        except (OSError, ValueError):
+            self.records = {}
+
+    def _key(self, session):
+        return os.path.abspath(session) if session else ""
+
+    def changed_labels(self, session, labels):
+        """[(index, label, fingerprint)] of non-blank labels that differ from their last print."""
+        printed = self.records.get(self._key(session), {})
+        changed = []
+        for idx, label in enumerate(labels):
+            if is_blank(label):
+                continue
+            fp = label_fingerprint(label)
+            if printed.get(str(idx)) != fp:
+                changed.append((idx, label, fp))
+        return changed
+
+    def record(self, entries):
+        """Store (session, index, fingerprint) entries of a successful print job and save once."""
+        for session, idx, fp in entries:
+            self.records.setdefault(self._key(session), {})[str(idx)] = fp
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
@@ -0,0 +1,333 @@
+# print_queue.py
+
+import os
+import json
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton, QLabel,
+    QSpinBox, QProgressBar, QFileDialog, QMessageBox, QAbstractItemView, QCheckBox
+)
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QPainter
+from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
+
+from print_history import has_content
+from session_manager import default_session_dir
+from sheet_packing import SheetStock, plan_job, commit_plan, plan_summary
+from sheet_picture import record_sheet, play_sheet
+
+QUEUE_FILENAME = "print_queue.json"
+
+def queue_path():
+    return os.path.join(default_session_dir(), QUEUE_FILENAME)
+
+def read_session_labels(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("labels", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+class PrintQueue:
+    """
+    Print jobs waiting to be printed: {"session": path, "first": page, "last": page or 0 for the last page}.
+    Persisted as JSON next to the sessions so queued jobs survive a restart.
+    """
+    def __init__(self, path=None):
+        self.path = path or queue_path()
+        self.jobs = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.jobs = json.load(f)
+        except (OSError, ValueError):
+            self.jobs = []
+
+    def add(self, session, first=1, last=0):
+        self.jobs.append({"session": os.path.abspath(session), "first": max(1, first), "last": max(0, last)})
+        self.save()
+
+    def remove(self, indices):
+        drop = set(indices)
+        self.jobs = [job for i, job in enumerate(self.jobs) if i not in drop]
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.jobs, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def sheets(self, per_page):
+        """
+        All queued jobs merged into one document: [{"job", "session", "page", "placements", "indices"}]
+        where placements are (slot, label) and indices the label positions in the session.
+        """
+        sheets = []
+        for n, job in enumerate(self.jobs):
+            labels = read_session_labels(job["session"])
+            pages = (len(labels) + per_page - 1) // per_page
+            last = min(job["last"] or pages, pages)
+            for page in range(job["first"], last + 1):
+                start = (page - 1) * per_page
+                chunk = labels[start:start + per_page]
+                sheets.append({
+                    "job": n, "session": job["session"], "page": page,
+                    "placements": list(enumerate(chunk)),
+                    "indices": list(range(start, start + len(chunk))),
+                })
+        return sheets
+
+def plan_queue(sheets, stock):
+    """
+    Pages of (slot, (job, session, index, label)) packing the queued labels with content
+    onto the partial sheets in stock first, then onto fresh sheets (see plan_job).
+    """
+    items = [(sheet["job"], sheet["session"], idx, label)
+             for sheet in sheets
+             for idx, (_, label) in zip(sheet["indices"], sheet["placements"])
+             if has_content(label)]
+    return plan_job(items, stock)
+
+def page_placements(page):
+    """(slot, label) placements of a planned queue page."""
+    return [(slot, item[3]) for slot, item in page["placements"]]
+
+def sheet_labels(sheets, per_page):
+    """The sheets' labels as one list, per_page positions per sheet and empty positions blank."""
+    labels = []
+    for sheet in sheets:
+        page = [{} for _ in range(per_page)]
+        for slot, label in sheet["placements"]:
+            if slot < per_page:
+                page[slot] = label
+        labels.extend(page)
+    return labels
+
+def job_caption(job):
+    pages = f"стр. {job['first']}–{job['last']}" if job["last"] else f"от стр. {job['first']} до края"
+    return f"{os.path.basename(job['session'])}   ({pages})"
+
+class PrintWorker(QThread):
+    """
+    Paints the merged sheets onto an already configured QPrinter as one spooled
+    document. QPainter on a QPrinter is allowed outside the GUI thread.
+    """
+    progress = pyqtSignal(int, int)  # done, total
+    done = pyqtSignal(bool, str)  # ok, message
+
+    def __init__(self, printer, sheets, render, settings, font_scale, parent=None):
+        super().__init__(parent)
+        self.printer = printer
+        self.sheets = sheets
+        self.render = render  # render(painter, dpi, print_font_scale=..., placements=..., settings=...)
+        self.settings = settings  # snapshot taken on the GUI thread; the settings store is not thread-safe
+        self.font_scale = font_scale
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        painter = QPainter()
+        if not painter.begin(self.printer):
+            self.done.emit(False, "Принтерът не може да бъде отворен.")
+            return
+        dpi = self.printer.resolution()
+        for n, sheet in enumerate(self.sheets):
+            if self._cancelled:
+                self.printer.abort()
+                painter.end()
+                self.done.emit(False, "Печатът е отказан.")
+                return
+            if n:
+                self.printer.newPage()
+            play_sheet(painter, record_sheet(self.render, self.font_scale, sheet["placements"], self.settings, dpi))
+            self.progress.emit(n + 1, len(self.sheets))
+        if painter.end() and self.printer.printerState() != QPrinter.Error:
+            self.done.emit(True, f"Отпечатани листове: {len(self.sheets)}.")
+        else:
+            self.done.emit(False, "Грешка при печат.")
+
+class PrintQueueDialog(QDialog):
+    """
+    Non-modal queue window: add sessions, then print them all with one print dialog.
+    snapshot() gives (render, settings, font scale) for the worker; preflight(title,
+    settings, labels, dpi) confirms the queued labels like a direct print does.
+    """
+    def __init__(self, queue, rows, cols, snapshot, preflight, current_session=None, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.rows = rows
+        self.cols = cols
+        self.per_page = rows * cols
+        self.snapshot = snapshot
+        self.preflight = preflight
+        self.current_session = current_session
+        self.worker = None
+        self._stock = None
+        self._pages = []
+        self._jobs = set()
+        self.setWindowTitle("Опашка за печат")
+        self.setMinimumSize(480, 420)
+        layout = QVBoxLayout(self)
+
+        self.job_list = QListWidget()
+        self.job_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        layout.addWidget(self.job_list, 1)
+
+        range_row = QHBoxLayout()
+        range_row.addWidget(QLabel("Страници от:"))
+        self.first_spin = QSpinBox()
+        self.first_spin.setRange(1, 999)
+        range_row.addWidget(self.first_spin)
+        range_row.addWidget(QLabel("до:"))
+        self.last_spin = QSpinBox()
+        self.last_spin.setRange(0, 999)
+        self.last_spin.setSpecialValueText("края")
+        range_row.addWidget(self.last_spin)
+        range_row.addStretch(1)
+        layout.addLayout(range_row)
+        self.keep_leftover_chk = QCheckBox("Пази остатъка от новите листове")
+        self.keep_leftover_chk.setToolTip("Непълен нов лист се добавя към частично използваните и се попълва при следващ печат")
+        layout.addWidget(self.keep_leftover_chk)
+
+        btn_row = QHBoxLayout()
+        self.add_current_btn = QPushButton("Добави текущата")
+        self.add_current_btn.clicked.connect(self._add_current)
+        self.add_current_btn.setEnabled(bool(current_session))
+        self.add_btn = QPushButton("Добави сесии…")
+        self.add_btn.clicked.connect(self._add_sessions)
+        self.remove_btn = QPushButton("Премахни")
+        self.remove_btn.clicked.connect(self._remove_selected)
+        btn_row.addWidget(self.add_current_btn)
+        btn_row.addWidget(self.add_btn)
+        btn_row.addWidget(self.remove_btn)
+        self.overview_btn = QPushButton("Преглед на листовете…")
+        self.overview_btn.clicked.connect(self._show_overview)
+        btn_row.addWidget(self.overview_btn)
+        layout.addLayout(btn_row)
+
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+
+        action_row = QHBoxLayout()
+        self.print_btn = QPushButton("Печат на всички")
+        self.print_btn.clicked.connect(self._start_print)
+        self.cancel_btn = QPushButton("Откажи печата")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self._cancel_print)
+        close_btn = QPushButton("Затвори")
+        close_btn.clicked.connect(self.close)
+        action_row.addWidget(self.print_btn)
+        action_row.addWidget(self.cancel_btn)
+        action_row.addStretch(1)
+        action_row.addWidget(close_btn)
+        layout.addLayout(action_row)
+        self._refresh()
+
+    def _refresh(self):
+        self.job_list.clear()
+        for job in self.queue.jobs:
+            item = QListWidgetItem(job_caption(job))
+            item.setToolTip(job["session"])
+            self.job_list.addItem(item)
+        self.print_btn.setEnabled(bool(self.queue.jobs) and self.worker is None)
+
+    def _add_current(self):
+        self.queue.add(self.current_session, self.first_spin.value(), self.last_spin.value())
+        self._refresh()
+
+    def _add_sessions(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Сесии за печат", default_session_dir(), "Сесии (*.json)")
+        for path in paths:
+            self.queue.add(path, self.first_spin.value(), self.last_spin.value())
+        self._refresh()
+
+    def _remove_selected(self):
+        if self.worker is not None:
+            return
+        self.queue.remove(self.job_list.row(item) for item in self.job_list.selectedItems())
+        self._refresh()
+
+    def _show_overview(self):
+        from page_overview import PageOverviewDialog
+        from sheet_settings import load_sheet_settings
+        # The sheets as they will print: packed onto the partial sheets in stock first
+        pages = plan_queue(self.queue.sheets(self.per_page), SheetStock(self.rows, self.cols))
+        if not pages:
+            QMessageBox.information(self, "Преглед", "Няма страници в опашката.")
+            return
+        captions = []
+        for n, page in enumerate(pages, 1):
+            sheet = f"частичен лист №{page['sheet']}" if page["sheet"] is not None else "нов лист"
+            sessions = sorted({os.path.basename(session) for _, (_, session, _, _) in page["placements"]})
+            captions.append(f"{n}. {sheet} – {', '.join(sessions)}")
+        PageOverviewDialog([page_placements(page) for page in pages], captions, load_sheet_settings(), self).exec_()
+
+    def _start_print(self):
+        sheets = self.queue.sheets(self.per_page)
+        stock = SheetStock(self.rows, self.cols)
+        pages = plan_queue(sheets, stock)
+        if not pages:
+            QMessageBox.information(self, "Печат", "Няма попълнени етикети за печат в опашката.")
+            return
+        render, settings, font_scale = self.snapshot()
+        planned = [{"placements": page_placements(page)} for page in pages]
+        if any(page["sheet"] is not None for page in pages) and \
+                QMessageBox.question(self, "Печат", plan_summary(pages)) != QMessageBox.Yes:
+            return
+        printer = QPrinter(QPrinter.HighResolution)
+        printer.setPageSize(QPrinter.A4)
+        printer.setOrientation(QPrinter.Portrait)
+        printer.setDocName("Етикети – опашка")
+        if QPrintDialog(printer, self).exec_() != QPrintDialog.Accepted:
+            return
+        if not self.preflight("Печат", settings, sheet_labels(planned, self.per_page), printer.resolution()):
+            return
+        self._stock, self._pages = stock, pages
+        self._jobs = {sheet["job"] for sheet in sheets}
+        self.worker = PrintWorker(printer, planned, render, settings, font_scale, self)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.done.connect(self._on_done)
+        self.progress.setRange(0, len(pages))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.print_btn.setEnabled(False)
+        self.remove_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.worker.start()
+
+    def _cancel_print(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+
+    def _on_progress(self, done, total):
+        self.progress.setValue(done)
+        self.progress.setFormat(f"{done} / {total}")
+
+    def _on_done(self, ok, message):
+        from print_history import PrintHistory, label_fingerprint
+        self.worker.wait()
+        self.worker = None
+        self.cancel_btn.setEnabled(False)
+        self.remove_btn.setEnabled(True)
+        self.progress.setVisible(False)
+        if ok:
+            items = [item for page in self._pages for _, item in page["placements"]]
+            PrintHistory().record([(session, idx, label_fingerprint(label)) for _, session, idx, label in items])
+            commit_plan(self._stock, self._pages, self.keep_leftover_chk.isChecked())
+            self.queue.remove(self._jobs)
+        self._stock, self._pages, self._jobs = None, [], set()
+        self._refresh()
+        QMessageBox.information(self, "Печат", message)
+
+    def closeEvent(self, event):
+        # Keep the window alive while a job is spooling
+        if self.worker is not None:
+            event.ignore()
+            self.hide()
+            return
+        super().closeEvent(event)
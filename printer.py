@@ -3,37 +3,38 @@
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 from PyQt5.QtGui import QPainter, QColor
 
-def print_calibration(page_w_mm, page_h_mm, parent=None):
-    printer = QPrinter(QPrinter.HighResolution)
+def print_calibration(page_w_mm, page_h_mm, parent=None, printer=None):
+    """Pass a configured printer (e.g. from a printer profile) to print without the dialog."""
+    quick = printer is not None
+    if not quick:
+        printer = QPrinter(QPrinter.HighResolution)
     printer.setFullPage(True)
-    dlg = QPrintDialog(printer, parent)
-    if dlg.exec_() == QPrintDialog.Accepted:
+    if quick or QPrintDialog(printer, parent).exec_() == QPrintDialog.Accepted:
         painter = QPainter(printer)
         page_rect = printer.pageRect()
         painter.fillRect(page_rect, QColor("#dddddd"))
         painter.end()
 
-def print_sheet(preview_widget, parent=None):
-    printer = QPrinter(QPrinter.HighResolution)
+def print_sheet(preview_widget, parent=None, printer=None):
+    """Print the sheet by painting it straight onto the printer in device units; False when cancelled."""
+    quick = printer is not None
+    if not quick:
+        printer = QPrinter(QPrinter.HighResolution)
     printer.setFullPage(True)
-    dlg = QPrintDialog(printer, parent)
-    if dlg.exec_() == QPrintDialog.Accepted:
+    if quick or QPrintDialog(printer, parent).exec_() == QPrintDialog.Accepted:
         painter = QPainter(printer)
         page_rect = printer.pageRect()
-        old_size = preview_widget.size()
-        preview_widget.resize(page_rect.width(), page_rect.height())
-        preview_widget.render(painter)
-        preview_widget.resize(old_size)
+        preview_widget.paint_sheet(painter, page_rect.width(), page_rect.height(), for_print=True)
         painter.end()
+        return True
+    return False
 
 def print_custom(preview_widget, parent=None, before_paint=None, after_paint=None):
     """
     Advanced: Print preview_widget, running hooks before/after paint.
-    - before_paint(preview_widget, painter) is called before .render()
-    - after_paint(preview_widget, painter) is called after .render()
+    - before_paint(preview_widget, painter) is called before the sheet is painted
+    - after_paint(preview_widget, painter) is called after the sheet is painted
     """
-    from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-    from PyQt5.QtGui import QPainter
     printer = QPrinter(QPrinter.HighResolution)
     printer.setFullPage(True)
     dlg = QPrintDialog(printer, parent)
@@ -42,10 +43,7 @@ def print_custom(preview_widget, parent=None, before_paint=None, after_paint=Non
         if before_paint:
             before_paint(preview_widget, painter)
         page_rect = printer.pageRect()
-        old_size = preview_widget.size()
-        preview_widget.resize(page_rect.width(), page_rect.height())
-        preview_widget.render(painter)
-        preview_widget.resize(old_size)
+        preview_widget.paint_sheet(painter, page_rect.width(), page_rect.height(), for_print=True)
         if after_paint:
             after_paint(preview_widget, painter)
         painter.end()
@@ -0,0 +1,138 @@
+# printer_profiles.py
+
+import os
+import json
+
+from PyQt5.QtGui import QPageSize
+from PyQt5.QtPrintSupport import QPrinter
+
+from session_manager import default_session_dir
+
+PROFILES_FILENAME = "printer_profiles.json"
+# Sheet settings params that belong to one printer rather than to the label sheet
+CALIBRATION_KEYS = (
+    "user_scale_factor", "hw_left", "hw_top", "hw_right", "hw_bottom",
+    "sheet_left", "sheet_top", "print_font_scale",
+)
+
+def profiles_path():
+    return os.path.join(default_session_dir(), PROFILES_FILENAME)
+
+def calibration_of(params):
+    """The printer-specific part of the sheet settings params."""
+    return {k: params[k] for k in CALIBRATION_KEYS if k in params}
+
+def profile_from_printer(printer, params):
+    """Snapshot a printer configured in QPrintDialog together with its calibration from params."""
+    return {
+        "printer_name": printer.printerName(),
+        "paper": int(printer.pageLayout().pageSize().id()),
+        "resolution": printer.resolution(),
+        "duplex": int(printer.duplex()),
+        "copies": printer.copyCount(),
+        "calibration": calibration_of(params),
+    }
+
+def configure_printer(profile):
+    printer = QPrinter(QPrinter.HighResolution)
+    if profile.get("printer_name"):
+        printer.setPrinterName(profile["printer_name"])
+    printer.setPageSize(QPageSize(QPageSize.PageSizeId(profile.get("paper", QPageSize.A4))))
+    printer.setOrientation(QPrinter.Portrait)
+    if profile.get("resolution"):
+        printer.setResolution(int(profile["resolution"]))
+    printer.setDuplex(QPrinter.DuplexMode(profile.get("duplex", QPrinter.DuplexNone)))
+    printer.setCopyCount(max(1, int(profile.get("copies", 1))))
+    return printer
+
+class PrinterProfiles:
+    """
+    Named printer profiles (printer, paper, resolution, duplex, copies and that
+    printer's calibration) stored as JSON. Configured QPrinter objects are cached
+    per profile, so a quick print reuses them without QPrintDialog.
+    """
+    def __init__(self, path=None):
+        self.path = path or profiles_path()
+        self.active = ""
+        self.profiles = {}
+        self._printers = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.profiles = data.get("profiles", {})
+            self.active = data.get("active", "")
+        except (OSError, ValueError, AttributeError):
+            pass
+        if self.active not in self.profiles:
+            self.active = next(iter(self.profiles), "")
+
+    def names(self):
+        return sorted(self.profiles)
+
+    def get(self, name):
+        return self.profiles.get(name)
+
+    def set_active(self, name):
+        if name in self.profiles and name != self.active:
+            self.active = name
+            self.save()
+
+    def store(self, name, profile):
+        self.profiles[name] = profile
+        self._printers.pop(name, None)
+        self.active = name
+        self.save()
+
+    def store_calibration(self, params, name=None):
+        """Replace the profile's (the active one by default) calibration with the one in params."""
+        name = name or self.active
+        if name not in self.profiles:
+            return False
+        self.profiles[name]["calibration"] = calibration_of(params)
+        self.save()
+        return True
+
+    def remove(self, name):
+        self.profiles.pop(name, None)
+        self._printers.pop(name, None)
+        if self.active == name:
+            self.active = next(iter(self.profiles), "")
+        self.save()
+
+    def printer(self, name=None):
+        """
+        Cached, configured QPrinter for the profile (the active one by default), or None.
+        It is handed out with full page off; a calibration print switches it on for its own job.
+        """
+        name = name or self.active
+        if name not in self.profiles:
+            return None
+        if name not in self._printers:
+            self._printers[name] = configure_printer(self.profiles[name])
+        printer = self._printers[name]
+        printer.setFullPage(False)
+        return printer
+
+    def settings(self, settings, name=None):
+        """Sheet settings with the profile's (the active one by default) calibration applied."""
+        profile = self.profiles.get(name or self.active) or {}
+        calibration = profile.get("calibration")
+        if not calibration:
+            return settings
+        return dict(settings, params=dict(settings.get("params", {}), **calibration))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"active": self.active, "profiles": self.profiles}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+_profiles = None
+
+def printer_profiles():
+    """The process-wide profiles shared by the editor and the calibration tab (and their cached printers)."""
+    global _profiles
+    if _profiles is None:
+        _profiles = PrinterProfiles()
+    return _profiles
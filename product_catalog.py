@@ -0,0 +1,200 @@
+# product_catalog.py
+
+import os
+import csv
+import hashlib
+import sqlite3
+from pathlib import Path
+
+from currency_manager import EXCHANGE_RATE, convert_missing, parse_price, format_amount
+
+CATALOG_FILENAME = "catalog.sqlite3"
+PRODUCT_FIELDS = ("sku", "name", "second", "bgn", "eur", "unit")
+
+def catalog_path():
+    return os.path.join(str(Path.home()), "AppData", "Roaming", "LabelTool", CATALOG_FILENAME)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id      INTEGER PRIMARY KEY,
+    sku     TEXT NOT NULL UNIQUE,
+    name    TEXT NOT NULL DEFAULT '',
+    second  TEXT NOT NULL DEFAULT '',
+    bgn     TEXT NOT NULL DEFAULT '',
+    eur     TEXT NOT NULL DEFAULT '',
+    unit    TEXT NOT NULL DEFAULT '',
+    row_hash    TEXT NOT NULL DEFAULT '',
+    updated_at  TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, second,
+    content='products', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, name, second) VALUES (new.id, new.name, new.second);
+END;
+CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, second) VALUES ('delete', old.id, old.name, old.second);
+END;
+CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE OF name, second ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name, second) VALUES ('delete', old.id, old.name, old.second);
+    INSERT INTO products_fts(rowid, name, second) VALUES (new.id, new.name, new.second);
+END;
+"""
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the prepared statement on every call (every keystroke for search)
+_SEARCH_SQL = (
+    "SELECT p.sku, p.name, p.second, p.bgn, p.eur, p.unit FROM products_fts "
+    "JOIN products p ON p.id = products_fts.rowid "
+    "WHERE products_fts MATCH ? LIMIT ?"
+)
+_GET_SQL = "SELECT sku, name, second, bgn, eur, unit FROM products WHERE sku = ?"
+_UPSERT_SQL = (
+    "INSERT INTO products (sku, name, second, bgn, eur, unit, row_hash, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(sku) DO UPDATE SET name=excluded.name, second=excluded.second, "
+    "bgn=excluded.bgn, eur=excluded.eur, unit=excluded.unit, "
+    "row_hash=excluded.row_hash, updated_at=excluded.updated_at"
+)
+_SYNC_STATE_SQL = "SELECT sku, row_hash, updated_at FROM products"
+_DELETE_SQL = "DELETE FROM products WHERE sku = ?"
+_COUNT_SQL = "SELECT COUNT(*) FROM products"
+
+def fts_query(text, anchored=False):
+    """
+    Turn free user text into an FTS5 query: every word must match as a prefix.
+    anchored=True additionally requires the name to start with the first word.
+    """
+    words = [w.replace('"', '') for w in (text or "").split()]
+    query = " ".join(f'"{w}"*' for w in words if w)
+    if query and anchored:
+        query = "name: ^" + query
+    return query
+
+def product_from_row(row):
+    sku, name, second, bgn, eur, unit = row
+    return {
+        "sku": sku, "name": name, "second": second,
+        "bgn": parse_price(bgn, "bgn"), "eur": parse_price(eur, "eur"), "unit": unit,
+    }
+
+def fill_label(label, product):
+    """Write a product dict (PRODUCT_FIELDS keys) into a label dict. Only texts change, styles are kept."""
+    label["main"]["text"] = product.get("name", "")
+    label["second"]["text"] = product.get("second", "")
+    label["bgn"]["text"] = format_amount(product.get("bgn"))
+    label["eur"]["text"] = format_amount(product.get("eur"))
+    label["sku"] = product.get("sku", "")
+    return label
+
+def fill_label_converted(label, product, mode, rate=EXCHANGE_RATE):
+    """fill_label, with a price the product lacks converted from the other one in conversion mode."""
+    bgn, eur = convert_missing(product.get("bgn"), product.get("eur"), mode, rate)
+    return fill_label(label, dict(product, bgn=bgn, eur=eur))
+
+def db_row(product):
+    values = (
+        str(product["sku"]).strip(),
+        product.get("name", "") or "",
+        product.get("second", "") or "",
+        format_amount(parse_price(str(product.get("bgn") or ""), "bgn")),
+        format_amount(parse_price(str(product.get("eur") or ""), "eur")),
+        product.get("unit", "") or "",
+    )
+    return values + (row_hash(values), str(product.get("updated_at", "") or ""))
+
+def row_hash(values):
+    """Content hash of a normalized product row (as stored), used to detect changed rows on sync."""
+    return hashlib.sha1("\x1f".join(values).encode("utf-8")).hexdigest()
+
+class ProductCatalog:
+    """
+    Local SQLite product catalog with FTS5 search over product names.
+    One connection is opened per catalog and reused for every query.
+    Products are returned as dicts with PRODUCT_FIELDS keys (prices as Decimal or None).
+    """
+    def __init__(self, path=None):
+        self.path = path or catalog_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        # Catalogs created before sync support lack the change-detection columns
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(products)")}
+        if cols and "row_hash" not in cols:
+            with self.conn:
+                self.conn.execute("ALTER TABLE products ADD COLUMN row_hash TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("ALTER TABLE products ADD COLUMN updated_at TEXT NOT NULL DEFAULT ''")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def count(self):
+        return self.conn.execute(_COUNT_SQL).fetchone()[0]
+
+    def search(self, text, limit=20):
+        """
+        Names starting with the typed text come first, then other matches.
+        No bm25 ranking: scoring every match of a short prefix costs more than
+        the 10 ms per keystroke budget, while LIMIT lets FTS5 stop early.
+        """
+        query = fts_query(text)
+        if not query:
+            return []
+        try:
+            rows = self.conn.execute(_SEARCH_SQL, (fts_query(text, anchored=True), limit)).fetchall()
+            if len(rows) < limit:
+                seen = {r[0] for r in rows}
+                more = self.conn.execute(_SEARCH_SQL, (query, limit + len(rows))).fetchall()
+                rows += [r for r in more if r[0] not in seen][:limit - len(rows)]
+        except sqlite3.OperationalError:
+            # Malformed FTS syntax from odd user input: treat as no match
+            return []
+        return [product_from_row(r) for r in rows]
+
+    def get(self, sku):
+        row = self.conn.execute(_GET_SQL, (str(sku).strip(),)).fetchone()
+        return product_from_row(row) if row else None
+
+    def upsert_many(self, products):
+        """Insert or update products (dicts with PRODUCT_FIELDS keys) in one transaction."""
+        rows = [db_row(p) for p in products if p.get("sku")]
+        with self.conn:
+            self.conn.executemany(_UPSERT_SQL, rows)
+        return len(rows)
+
+    def sync_state(self):
+        """{sku: (row_hash, updated_at)} of every product, for change detection."""
+        return {sku: (h, u) for sku, h, u in self.conn.execute(_SYNC_STATE_SQL)}
+
+    def apply_rows(self, rows, deleted_skus=()):
+        """Write prepared db_row() tuples and deletions in one transaction."""
+        with self.conn:
+            self.conn.executemany(_UPSERT_SQL, rows)
+            self.conn.executemany(_DELETE_SQL, [(str(s),) for s in deleted_skus])
+
+    def delete_many(self, skus):
+        with self.conn:
+            self.conn.executemany(_DELETE_SQL, [(str(s),) for s in skus])
+
+    def import_csv(self, path):
+        """Import a CSV with a header row naming (some of) PRODUCT_FIELDS. Returns the row count."""
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.DictReader(f, dialect=dialect)
+            return self.upsert_many(
+                {(k or "").strip().lower(): (v or "").strip() for k, v in r.items()} for r in reader
+            )
@@ -0,0 +1,146 @@
+# raster_export.py
+
+import zlib
+import struct
+
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import Qt
+
+from label_layout import QPainterBackend
+
+BAND_ROWS = 256  # rows rendered at a time; peak memory is one band, whatever the DPI
+
+def page_size_px(page_w_mm, page_h_mm, dpi):
+    return round(page_w_mm / 25.4 * dpi), round(page_h_mm / 25.4 * dpi)
+
+def render_bands(items, dpi, width, height, band_rows=BAND_ROWS):
+    """
+    Draw a page of layout items (label_layout.layout_sheet) band by band. Yields (top row, list of RGB row bytes);
+    only one band QImage exists at a time.
+    """
+    band = QImage(width, min(band_rows, height), QImage.Format_RGB888)
+    band.setDotsPerMeterX(round(dpi / 0.0254))
+    band.setDotsPerMeterY(round(dpi / 0.0254))
+    row_bytes = width * 3
+    for top in range(0, height, band_rows):
+        rows = min(band_rows, height - top)
+        band.fill(Qt.white)
+        painter = QPainter(band)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipRect(0, 0, width, rows)
+        painter.translate(0, -top)
+        QPainterBackend(painter, dpi).draw(items)
+        painter.end()
+        bits = band.constBits()
+        bits.setsize(band.sizeInBytes())
+        data = bytes(bits)
+        stride = band.bytesPerLine()
+        yield top, [data[r * stride:r * stride + row_bytes] for r in range(rows)]
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+def write_png(path, items, dpi, width, height, band_rows=BAND_ROWS):
+    """8-bit RGB PNG; every band is compressed and written as its own IDAT chunk."""
+    ppm = round(dpi / 0.0254)
+    compressor = zlib.compressobj(6)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(_png_chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1)))
+        for _, rows in render_bands(items, dpi, width, height, band_rows):
+            data = compressor.compress(b"".join(b"\x00" + row for row in rows))
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+        f.write(_png_chunk(b"IDAT", compressor.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+
+class TiffWriter:
+    """
+    Minimal streaming multi-page TIFF (little endian, RGB, deflate-compressed strips).
+    Each page's strips are written first, then its IFD, which is linked from the previous one.
+    """
+    COMPRESSION_DEFLATE = 8
+
+    def __init__(self, path):
+        self.f = open(path, "wb")
+        self.f.write(b"II*\x00")
+        self._next_ifd_pos = self.f.tell()
+        self.f.write(struct.pack("<I", 0))
+
+    def add_page(self, items, dpi, width, height, band_rows=BAND_ROWS):
+        offsets, counts = [], []
+        for _, rows in render_bands(items, dpi, width, height, band_rows):
+            strip = zlib.compress(b"".join(rows), 6)
+            offsets.append(self.f.tell())
+            counts.append(len(strip))
+            self.f.write(strip)
+        self._write_ifd(width, height, dpi, band_rows, offsets, counts)
+
+    def _write_ifd(self, width, height, dpi, band_rows, offsets, counts):
+        f = self.f
+        if f.tell() % 2:
+            f.write(b"\x00")
+        # Out-of-line values: bits per sample, resolutions, strip tables
+        bps_pos = f.tell()
+        f.write(struct.pack("<3H", 8, 8, 8))
+        res_pos = f.tell()
+        f.write(struct.pack("<II", dpi, 1))
+        offsets_pos = f.tell()
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        counts_pos = f.tell()
+        f.write(struct.pack(f"<{len(counts)}I", *counts))
+        single = len(offsets) == 1
+        entries = [
+            (256, 4, 1, width),                    # ImageWidth
+            (257, 4, 1, height),                   # ImageLength
+            (258, 3, 3, bps_pos),                  # BitsPerSample
+            (259, 3, 1, self.COMPRESSION_DEFLATE), # Compression
+            (262, 3, 1, 2),                        # Photometric: RGB
+            (273, 4, len(offsets), offsets[0] if single else offsets_pos),  # StripOffsets
+            (277, 3, 1, 3),                        # SamplesPerPixel
+            (278, 4, 1, band_rows),                # RowsPerStrip
+            (279, 4, len(counts), counts[0] if single else counts_pos),     # StripByteCounts
+            (282, 5, 1, res_pos),                  # XResolution
+            (283, 5, 1, res_pos),                  # YResolution
+            (296, 3, 1, 2),                        # ResolutionUnit: inch
+        ]
+        ifd_pos = f.tell()
+        f.write(struct.pack("<H", len(entries)))
+        for tag, typ, count, value in entries:
+            if typ == 3 and count == 1:
+                f.write(struct.pack("<HHIHH", tag, typ, count, value, 0))
+            else:
+                f.write(struct.pack("<HHII", tag, typ, count, value))
+        next_pos = f.tell()
+        f.write(struct.pack("<I", 0))
+        # Link this IFD from the header or the previous page
+        f.seek(self._next_ifd_pos)
+        f.write(struct.pack("<I", ifd_pos))
+        f.seek(0, 2)
+        self._next_ifd_pos = next_pos
+
+    def close(self):
+        self.f.close()
+
+def export_raster(path, pages, dpi, page_w_mm, page_h_mm, band_rows=BAND_ROWS):
+    """
+    Export pages of layout items (laid out at dpi) to .png (one file per sheet: name.png, name_2.png, ...)
+    or .tif/.tiff (one multi-page file). Returns the written paths.
+    """
+    width, height = page_size_px(page_w_mm, page_h_mm, dpi)
+    if path.lower().endswith((".tif", ".tiff")):
+        writer = TiffWriter(path)
+        try:
+            for items in pages:
+                writer.add_page(items, dpi, width, height, band_rows)
+        finally:
+            writer.close()
+        return [path]
+    paths = []
+    stem = path[:-4] if path.lower().endswith(".png") else path
+    for n, items in enumerate(pages):
+        out = f"{stem}.png" if n == 0 else f"{stem}_{n + 1}.png"
+        write_png(out, items, dpi, width, height, band_rows)
+        paths.append(out)
+    return paths
@@ -0,0 +1,112 @@
+# reprice_dialog.py
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, QDoubleSpinBox,
+    QPushButton, QLabel, QLineEdit, QFileDialog, QDialogButtonBox
+)
+
+from bulk_pricing import OP_PERCENT, OP_RATE, OP_PRICE_LIST, load_price_list
+from currency_manager import EXCHANGE_RATE
+
+SCOPE_SELECTED = "selected"
+SCOPE_ALL = "all"
+SCOPE_SESSIONS = "sessions"
+
+OPERATIONS = [
+    ("Промяна с процент", OP_PERCENT),
+    ("Преизчисляване с курс", OP_RATE),
+    ("Ценова листа (CSV)", OP_PRICE_LIST),
+]
+
+SCOPES = [
+    ("Избраните етикети", SCOPE_SELECTED),
+    ("Всички етикети в листа", SCOPE_ALL),
+    ("Всички запазени сесии", SCOPE_SESSIONS),
+]
+
+class RepriceDialog(QDialog):
+    """
+    Collects a bulk repricing request: operation, its value, exchange rate and scope.
+    The actual work is done by bulk_pricing.reprice().
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Промяна на цени")
+        self.setMinimumWidth(420)
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.op_combo = QComboBox()
+        for label, key in OPERATIONS:
+            self.op_combo.addItem(label, key)
+        form.addRow("Операция:", self.op_combo)
+
+        self.percent = QDoubleSpinBox()
+        self.percent.setRange(-90.0, 500.0)
+        self.percent.setDecimals(2)
+        self.percent.setSuffix(" %")
+        form.addRow("Процент:", self.percent)
+
+        self.rate = QDoubleSpinBox()
+        self.rate.setRange(0.00001, 100.0)
+        self.rate.setDecimals(5)
+        self.rate.setValue(float(EXCHANGE_RATE))
+        form.addRow("Курс BGN/EUR:", self.rate)
+
+        file_row = QHBoxLayout()
+        self.price_file = QLineEdit()
+        self.price_file.setReadOnly(True)
+        browse_btn = QPushButton("Избери…")
+        browse_btn.clicked.connect(self._choose_file)
+        file_row.addWidget(self.price_file)
+        file_row.addWidget(browse_btn)
+        form.addRow("Ценова листа:", file_row)
+
+        self.scope_combo = QComboBox()
+        for label, key in SCOPES:
+            self.scope_combo.addItem(label, key)
+        form.addRow("Обхват:", self.scope_combo)
+        layout.addLayout(form)
+
+        self.status = QLabel("")
+        self.status.setStyleSheet("color: #b00;")
+        layout.addWidget(self.status)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self._on_accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.op_combo.currentIndexChanged.connect(self._update_enabled)
+        self._update_enabled()
+        self._price_list = None
+
+    def _update_enabled(self):
+        op = self.op_combo.currentData()
+        self.percent.setEnabled(op == OP_PERCENT)
+        self.price_file.setEnabled(op == OP_PRICE_LIST)
+
+    def _choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Ценова листа", "", "CSV (*.csv *.txt)")
+        if path:
+            self.price_file.setText(path)
+
+    def _on_accept(self):
+        if self.op_combo.currentData() == OP_PRICE_LIST:
+            try:
+                self._price_list = load_price_list(self.price_file.text())
+            except Exception as e:
+                self.status.setText(f"Неуспешно зареждане на ценовата листа:\n{e}")
+                return
+        self.accept()
+
+    def get_request(self):
+        """Return (operation, value, rate, scope) for bulk_pricing.reprice()."""
+        op = self.op_combo.currentData()
+        if op == OP_PERCENT:
+            value = f"{self.percent.value():.2f}"
+        elif op == OP_PRICE_LIST:
+            value = self._price_list or {}
+        else:
+            value = None
+        return op, value, f"{self.rate.value():.5f}", self.scope_combo.currentData()
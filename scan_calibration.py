@@ -0,0 +1,157 @@
+# scan_calibration.py
+
+import math
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+SQUARE_MM = 10.0      # side of the calibration square printed in every label
+MIN_EDGE_MM = 5.0     # a column/row needs this much dark run to count as a square edge
+SEARCH_MM = 12.0      # half size of the search window around each expected square
+SIDE_TOLERANCE = 0.15 # accepted deviation of the measured square side (printer scale error)
+
+def image_dpi(image):
+    """Resolution stored in the scan, or None when the file carries the 72/96 dpi defaults."""
+    dpi = round(image.dotsPerMeterX() * 0.0254)
+    return None if dpi in (0, 72, 96) else dpi
+
+def dark_mask(image):
+    """Boolean array of ink pixels; the threshold sits halfway between paper and ink."""
+    gray = image.convertToFormat(QImage.Format_Grayscale8)
+    bits = gray.constBits()
+    bits.setsize(gray.sizeInBytes())
+    rows = np.frombuffer(bits, np.uint8).reshape(gray.height(), gray.bytesPerLine())[:, :gray.width()]
+    ink, paper = np.percentile(rows, 1), np.percentile(rows, 99)
+    return rows < (ink + paper) / 2
+
+def _segments(profile, threshold):
+    """(centroid, strength) of every run of the profile above threshold."""
+    above = np.concatenate(([False], profile >= threshold, [False]))
+    edges = np.flatnonzero(above[1:] != above[:-1])
+    segments = []
+    for start, stop in zip(edges[::2], edges[1::2]):
+        weights = profile[start:stop]
+        segments.append((start + float(np.dot(np.arange(stop - start), weights) / weights.sum()), float(weights.sum())))
+    return segments
+
+def _edge_pair(profile, px_per_mm):
+    """Positions of the two square edges in a projection profile, or None."""
+    side = SQUARE_MM * px_per_mm
+    best = None
+    segments = _segments(profile, MIN_EDGE_MM * px_per_mm)
+    for i, (a, wa) in enumerate(segments):
+        for b, wb in segments[i + 1:]:
+            if abs((b - a) - side) <= side * SIDE_TOLERANCE and (best is None or wa + wb > best[2]):
+                best = (a, b, wa + wb)
+    return best[:2] if best else None
+
+def find_square(mask, cx, cy, half_w, half_h, px_per_mm):
+    """Centre and side (scan pixels) of the square near (cx, cy), or None."""
+    h, w = mask.shape
+    x0, x1 = max(0, int(cx - half_w)), min(w, int(cx + half_w))
+    y0, y1 = max(0, int(cy - half_h)), min(h, int(cy + half_h))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    window = mask[y0:y1, x0:x1]
+    cols = _edge_pair(window.sum(axis=0).astype(float), px_per_mm)
+    rows = _edge_pair(window.sum(axis=1).astype(float), px_per_mm)
+    if cols is None or rows is None:
+        return None
+    return x0 + (cols[0] + cols[1]) / 2, y0 + (rows[0] + rows[1]) / 2, ((cols[1] - cols[0]) + (rows[1] - rows[0])) / 2
+
+def _fit(values, a, b):
+    """Least squares values ~ c0 + c1 * a + c2 * b; columns without spread are dropped."""
+    design = [np.ones(len(values))]
+    for column in (a, b):
+        design.append(column if np.ptp(column) > 0 else np.zeros(len(values)))
+    coeffs, *_ = np.linalg.lstsq(np.stack(design, axis=1), values, rcond=None)
+    residual = values - np.stack(design, axis=1) @ coeffs
+    return coeffs, residual
+
+def analyze_scan(image, params, dpi):
+    """
+    Measure a scan of the guides print (calibration squares switched on, paper laid in the
+    scanner's top-left corner) and solve the printer's offset and scale. Returns a dict with
+    the measurements and "params": corrected sheet_left, sheet_top, col_gap, row_gap and
+    user_scale_factor that put the printed grid where params describe it.
+    """
+    k = dpi / 25.4
+    u = float(params.get("user_scale_factor", 1.0))
+    rows, cols = int(params["rows"]), int(params["cols"])
+    label_w, label_h = float(params["label_w"]), float(params["label_h"])
+    pitch_x, pitch_y = label_w + float(params["col_gap"]), label_h + float(params["row_gap"])
+    left, top = float(params["sheet_left"]), float(params["sheet_top"])
+    half_w = min(SEARCH_MM, label_w / 2 - 1) * k
+    half_h = min(SEARCH_MM, label_h / 2 - 1) * k
+
+    mask = dark_mask(image)
+    found = []
+    for row in range(rows):
+        for col in range(cols):
+            # Where the square would be if the printer were exact (the guides print maps the page 1:1)
+            cx = u * (left + label_w / 2 + col * pitch_x) * k
+            cy = u * (top + label_h / 2 + row * pitch_y) * k
+            square = find_square(mask, cx, cy, half_w, half_h, k)
+            if square is not None:
+                found.append((row, col) + square)
+    if len(found) < 2 or len({f[0] for f in found}) * len({f[1] for f in found}) < 2:
+        raise ValueError("Калибриращите квадрати не бяха открити. Отпечатайте помощниците с "
+                         "„Калибрационен квадрат (10мм)“ и сканирайте целия лист.")
+
+    data = np.array(found, dtype=float)
+    r, c, x_mm, y_mm, side_mm = data[:, 0], data[:, 1], data[:, 2] / k, data[:, 3] / k, data[:, 4] / k
+    # x = x0 + sx * col + skew * row, y = y0 + sy * row + skew' * col
+    (x0, sx, x_skew), x_res = _fit(x_mm, c, r)
+    (y0, sy, y_skew), y_res = _fit(y_mm, r, c)
+    square_scale = float(side_mm.mean()) / (SQUARE_MM * u)
+    # Printer scale against the requested coordinates; the long pitch baseline beats the square size
+    scale_x = float(sx / (u * pitch_x)) if cols > 1 and sx else square_scale
+    scale_y = float(sy / (u * pitch_y)) if rows > 1 and sy else square_scale
+    offset_x = float(x0 - scale_x * u * (left + label_w / 2))
+    offset_y = float(y0 - scale_y * u * (top + label_h / 2))
+    skew = math.degrees(math.atan2(x_skew, sy)) if rows > 1 and sy else \
+        -math.degrees(math.atan2(y_skew, sx)) if cols > 1 and sx else 0.0
+
+    # One factor serves both axes: sized for the larger scale, so the other axis only needs
+    # wider gaps (a gap can grow but not go below zero)
+    new_u = max(0.95, min(1.05, 1.0 / max(scale_x, scale_y)))
+    # What is left of each axis' scale after the common factor, absorbed by gaps and offsets
+    rest_x, rest_y = scale_x * new_u, scale_y * new_u
+    corrected = {
+        "user_scale_factor": new_u,
+        "col_gap": max(0.0, pitch_x / rest_x - label_w),
+        "row_gap": max(0.0, pitch_y / rest_y - label_h),
+        "sheet_left": (left + label_w / 2 - offset_x) / rest_x - label_w / 2,
+        "sheet_top": (top + label_h / 2 - offset_y) / rest_y - label_h / 2,
+    }
+    return {
+        "found": len(found),
+        "expected": rows * cols,
+        "scale_x": scale_x,
+        "scale_y": scale_y,
+        "offset_x": offset_x,
+        "offset_y": offset_y,
+        "skew_deg": skew,
+        "residual_mm": float(np.sqrt(np.mean(np.concatenate((x_res, y_res)) ** 2))),
+        "params": corrected,
+    }
+
+def analysis_summary(result, params):
+    lines = [
+        f"Открити квадрати: {result['found']} от {result['expected']}",
+        f"Мащаб на принтера: X {result['scale_x'] * 100:.2f}%, Y {result['scale_y'] * 100:.2f}%",
+        f"Отместване на принтера: X {result['offset_x']:+.2f} мм, Y {result['offset_y']:+.2f} мм",
+        f"Точност на измерването: {result['residual_mm']:.2f} мм",
+    ]
+    if abs(result["skew_deg"]) > 0.3:
+        lines.append(f"Листът е завъртян с {result['skew_deg']:.2f}° – сканирайте го по-изправено.")
+    lines.append("")
+    names = {"sheet_left": "Ляво", "sheet_top": "Горе", "col_gap": "Междина колони",
+             "row_gap": "Междина редове", "user_scale_factor": "Корекция на мащаба"}
+    for key, name in names.items():
+        old, new = float(params.get(key, 1.0 if key == "user_scale_factor" else 0.0)), result["params"][key]
+        if key == "user_scale_factor":
+            lines.append(f"{name}: {old * 100:.2f}% → {new * 100:.2f}%")
+        else:
+            lines.append(f"{name}: {old:.2f} → {new:.2f} мм")
+    return "\n".join(lines)
@@ -5,6 +5,40 @@ import json
 from pathlib import Path
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
 
+def default_session_dir():
+    return os.path.join(str(Path.home()), "AppData", "Roaming", "LabelTool")
+
+def session_files(directory=None):
+    """Paths of the saved session files (JSON files with a "labels" list) in directory."""
+    directory = directory or default_session_dir()
+    paths = []
+    if not os.path.isdir(directory):
+        return paths
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and isinstance(data.get("labels"), list):
+            paths.append(path)
+    return paths
+
+def write_session_file(path, data):
+    """Write a session atomically: a crash mid-write leaves the previous file intact."""
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
 class SessionManager:
     """
     Handles saving/loading session to/from file.
@@ -13,7 +47,7 @@ class SessionManager:
     def __init__(self, sheet_widget, session_filename="session.json"):
         self.sheet_widget = sheet_widget
         # Save sessions in <user>/AppData/Roaming/LabelTool/
-        self._default_session_dir = os.path.join(str(Path.home()), "AppData", "Roaming", "LabelTool")
+        self._default_session_dir = default_session_dir()
         os.makedirs(self._default_session_dir, exist_ok=True)
         self.session_path = os.path.join(self._default_session_dir, session_filename)
         self.last_mode = "bgn_to_eur"  # Default currency mode (string key)
@@ -28,8 +62,7 @@ class SessionManager:
         }
         path = to_file if to_file else self.session_path
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            write_session_file(path, data)
             if to_file:  # If user-initiated save
                 QMessageBox.information(self.sheet_widget, "Успех", f"Сесията е запазена:\n{path}")
         except Exception as e:
@@ -57,6 +90,7 @@ class SessionManager:
             else:
                 from label_editor import blank_label
                 self.sheet_widget.labels[idx] = blank_label()
+        self.sheet_widget.relink_labels()
         # Restore currency conversion mode if present
         mode = data.get("conversion_mode", "bgn_to_eur")
         self.last_mode = mode
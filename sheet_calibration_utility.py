@@ -4,36 +4,27 @@ import json
 import printer
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox,
-    QSpinBox, QDoubleSpinBox, QCheckBox, QSizePolicy, QPushButton, QComboBox
+    QSpinBox, QDoubleSpinBox, QCheckBox, QSizePolicy, QPushButton, QComboBox,
+    QInputDialog, QMessageBox, QFileDialog
 )
-from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPainterPath, QIcon
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPainterPath, QIcon, QPixmap, QImage
 from PyQt5.QtCore import Qt
+from printer_profiles import printer_profiles
+from sheet_geometry import sheet_geometry
+from sheet_settings import load_sheet_settings, sheet_settings_store
+from calibration_sweep import OFFSET, GAPS, DEFAULT_STEP_MM, sweep_cells, zero_cell, cell_caption, paint_sweep
 
 MM_TO_PX = 72 / 25.4
 
-def appdata_path():
-    from pathlib import Path
-    return os.path.join(str(Path.home()), "AppData", "Roaming", "LabelTool")
-
-def sheet_settings_path():
-    return os.path.join(appdata_path(), "sheet_settings.json")
-
-def ensure_appdata():
-    os.makedirs(appdata_path(), exist_ok=True)
-
-def save_sheet_settings(data):
-    ensure_appdata()
-    with open(sheet_settings_path(), "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def load_sheet_settings():
-    try:
-        with open(sheet_settings_path(), "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return None
-
 class SheetPreview(QWidget):
+    """
+    On screen the sheet is composed from two cached layers: the page chrome
+    (rulers, dimensions, page border), keyed by widget size and page size, and
+    the calibration overlay (printer margin, label grid, squares, crosshairs),
+    keyed by the calibration parameters. A spin box change re-renders only the
+    overlay; a plain repaint only blits both. With a sweep set, the overlay and
+    the guides print carry its offset markers instead of the usual helpers.
+    """
     def __init__(self, params, toggles, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.params = params
@@ -41,57 +32,91 @@ class SheetPreview(QWidget):
         self.setMinimumSize(800, 600)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.calibration_mode = False
-        self.rendering_for_print = False
+        self._layers = {}  # name -> (key, QPixmap)
+        self.sweep = None  # sweep_cells() of the sweep sheet, or None
 
     def set_calibration_mode(self, on):
         self.calibration_mode = on
         self.update()
 
     def paintEvent(self, event):
-        p = self.params
-        t = self.toggles
         painter = QPainter(self)
+        w, h = self.width(), self.height()
+        if self.calibration_mode:
+            self.paint_sheet(painter, w, h)
+            return
+        p = self.params
+        # params and toggles are edited in place by CalibrationTab, so keys are built from their values
+        size_key = (w, h, self.devicePixelRatioF())
+        chrome_key = size_key + (p['page_w'], p['page_h'], p.get('user_scale_factor', 1.0),
+                                 self.toggles.get('ruler', True))
+        overlay_key = size_key + (json.dumps(p, sort_keys=True), json.dumps(self.toggles, sort_keys=True),
+                                  json.dumps(self.sweep))
+        # The chrome is opaque (window background around the page), so it blits without blending
+        painter.drawPixmap(0, 0, self._layer("chrome", chrome_key, self.paint_chrome,
+                                             self.palette().color(self.backgroundRole())))
+        painter.drawPixmap(0, 0, self._layer("overlay", overlay_key, self.paint_overlay, Qt.transparent))
+
+    def _layer(self, name, key, paint, background):
+        cached = self._layers.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(background)
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
-
-        w = self.width()
-        h = self.height()
-
+        paint(painter, self.width(), self.height())
+        painter.end()
+        self._layers[name] = (key, pixmap)
+        return pixmap
+
+    def page_transform(self, w, h, for_print=False):
+        """
+        (scale, offset_x, offset_y) placing the page in a w x h area.
+        for_print maps the page 1:1 onto the area (printer device units)
+        instead of fitting it into the widget with a margin.
+        """
+        p = self.params
         page_w_mm = p['page_w']
         page_h_mm = p['page_h']
-        hw_left = p['hw_left']
-        hw_top = p['hw_top']
-        hw_right = p['hw_right']
-        hw_bottom = p['hw_bottom']
+        if for_print:
+            scale = w / (page_w_mm * MM_TO_PX)
+            scale *= p.get('user_scale_factor', 1.0)
+            return scale, 0, 0
+        margin_px = 48  # you can tweak this value!
+        scale = min(
+            (w - 2*margin_px) / (page_w_mm * MM_TO_PX),
+            (h - 2*margin_px) / (page_h_mm * MM_TO_PX)
+        )
+        scale *= p.get('user_scale_factor', 1.0)
+        offset_x = (w - page_w_mm * MM_TO_PX * scale) / 2
+        offset_y = (h - page_h_mm * MM_TO_PX * scale) / 2
+        return scale, offset_x, offset_y
 
-        sheet_left = p['sheet_left']
-        sheet_top = p['sheet_top']
-        label_w = p['label_w']
-        label_h = p['label_h']
-        col_gap = p['col_gap']
-        row_gap = p['row_gap']
-        rows = p['rows']
-        cols = p['cols']
-        # Use the custom corner radius value from params, fallback to 2.5 if not set
-        corner_radius = float(p.get('corner_radius', 2.5))
+    def paint_sheet(self, painter, w, h, for_print=False):
+        """Paint the whole sheet into a w x h area of the painter's device (prints and the calibration fill)."""
+        painter.setRenderHint(QPainter.Antialiasing)
 
-        cal_square = t.get('cal_square', False)
-        cal_square_size = 10.0
+        # --- Calibration print (solid gray) ---
+        if self.calibration_mode:
+            scale, offset_x, offset_y = self.page_transform(w, h, for_print)
+            page_w = self.params['page_w'] * MM_TO_PX * scale
+            page_h = self.params['page_h'] * MM_TO_PX * scale
+            painter.fillRect(int(offset_x), int(offset_y), int(page_w), int(page_h), QColor("#dddddd"))
+            return
 
-        # --- Scaling ---
-        if getattr(self, 'rendering_for_print', False):
-            scale = w / (page_w_mm * MM_TO_PX)
-            scale *= p.get('user_scale_factor', 1.0)
-            offset_x = 0
-            offset_y = 0
-        else:
-            margin_px = 48  # you can tweak this value!
-            scale = min(
-                (w - 2*margin_px) / (page_w_mm * MM_TO_PX),
-                (h - 2*margin_px) / (page_h_mm * MM_TO_PX)
-            )
-            scale *= p.get('user_scale_factor', 1.0)
-            offset_x = (w - page_w_mm * MM_TO_PX * scale) / 2
-            offset_y = (h - page_h_mm * MM_TO_PX * scale) / 2
+        self.paint_chrome(painter, w, h, for_print)
+        self.paint_overlay(painter, w, h, for_print)
+
+    def paint_chrome(self, painter, w, h, for_print=False):
+        """Rulers, dimensions and the page itself: depends only on the area and the page size."""
+        p = self.params
+        t = self.toggles
+        page_w_mm = p['page_w']
+        page_h_mm = p['page_h']
+        scale, offset_x, offset_y = self.page_transform(w, h, for_print)
 
         def mm_to_px(x_mm, y_mm):
             return (
@@ -99,14 +124,6 @@ class SheetPreview(QWidget):
                 offset_y + y_mm * MM_TO_PX * scale,
             )
 
-        # --- Calibration print (solid gray) ---
-        if self.calibration_mode:
-            page_x, page_y = mm_to_px(0, 0)
-            page_w = page_w_mm * MM_TO_PX * scale
-            page_h = page_h_mm * MM_TO_PX * scale
-            painter.fillRect(int(page_x), int(page_y), int(page_w), int(page_h), QColor("#dddddd"))
-            return
-
         # --- Draw ruler, A4 label, and dimensions OUTSIDE page border ---
         if t.get('ruler', True):
             ruler_font = QFont("Arial", 20, QFont.Bold)
@@ -154,6 +171,31 @@ class SheetPreview(QWidget):
         painter.setPen(QPen(QColor("#aaaaaa"), 1, Qt.DashLine))
         painter.drawRect(int(page_x), int(page_y), int(page_w), int(page_h))
 
+    def paint_overlay(self, painter, w, h, for_print=False):
+        """Printer margin, label grid, calibration squares and crosshairs: depends on the calibration."""
+        p = self.params
+        t = self.toggles
+        page_w_mm = p['page_w']
+        page_h_mm = p['page_h']
+        hw_left = p['hw_left']
+        hw_top = p['hw_top']
+        hw_right = p['hw_right']
+        hw_bottom = p['hw_bottom']
+        # Use the custom corner radius value from params, fallback to 2.5 if not set
+        corner_radius = float(p.get('corner_radius', 2.5))
+
+        # On paper the sweep markers are judged against the die cuts alone
+        guides = not (self.sweep and for_print)
+        cal_square = t.get('cal_square', False) and not self.sweep
+        cal_square_size = 10.0
+        scale, offset_x, offset_y = self.page_transform(w, h, for_print)
+
+        def mm_to_px(x_mm, y_mm):
+            return (
+                offset_x + x_mm * MM_TO_PX * scale,
+                offset_y + y_mm * MM_TO_PX * scale,
+            )
+
         # --- HW margin rectangle (toggleable visual) ---
         margin_x, margin_y = mm_to_px(hw_left, hw_top)
         margin_w = (page_w_mm - hw_left - hw_right) * MM_TO_PX * scale
@@ -163,68 +205,49 @@ class SheetPreview(QWidget):
             painter.drawRect(int(margin_x), int(margin_y), int(margin_w), int(margin_h))
 
         # --- Label grid and helpers ---
-        if getattr(self, 'rendering_for_print', False):
-            draw_x_mm = sheet_left
-            draw_y_mm = sheet_top
-        else:
-            draw_x_mm = hw_left + sheet_left
-            draw_y_mm = hw_top + sheet_top
-
-        for row in range(rows):
-            for col in range(cols):
-                x_mm = draw_x_mm + col * (label_w + col_gap)
-                y_mm = draw_y_mm + row * (label_h + row_gap)
-                x, y = mm_to_px(x_mm, y_mm)
-                w_label_px = label_w * MM_TO_PX * scale
-                h_label_px = label_h * MM_TO_PX * scale
-
-                if t.get('grid', True):
-                    painter.setPen(QPen(QColor("#333333"), 2))
-                    if corner_radius > 0:
-                        radius_px = corner_radius * MM_TO_PX * scale
-                        path = QPainterPath()
-                        path.addRoundedRect(x, y, w_label_px, h_label_px, radius_px, radius_px)
-                        painter.drawPath(path)
-                    else:
-                        painter.drawRect(int(x), int(y), int(w_label_px), int(h_label_px))
-
-                if cal_square:
-                    sq_size_px = cal_square_size * MM_TO_PX * scale
-                    cx = x + w_label_px / 2
-                    cy = y + h_label_px / 2
-                    left = cx - sq_size_px / 2
-                    top = cy - sq_size_px / 2
-                    painter.setPen(QPen(QColor("#111"), 2))
-                    painter.drawRect(int(left), int(top), int(sq_size_px), int(sq_size_px))
-                    crosshair_len = sq_size_px * 0.7
-                    painter.drawLine(int(cx - crosshair_len/2), int(cy), int(cx + crosshair_len/2), int(cy))
-                    painter.drawLine(int(cx), int(cy - crosshair_len/2), int(cx), int(cy + crosshair_len/2))
-                    if getattr(self, 'rendering_for_print', False):
-                        font_size_pt = max(int(22 * (1/scale)), 12)
-                    else:
-                        font_size_pt = 12
-                    font = QFont("Arial", font_size_pt, QFont.Normal)
-                    painter.setFont(font)
-                    painter.drawText(int(cx - sq_size_px / 2), int(top - 8), "10 mm")
+        # The print maps the page 1:1, so sheet offsets are taken from the page corner
+        geometry = sheet_geometry(p, hw_offset=not for_print)
+        for x, y, w_label_px, h_label_px in geometry.device_rects(MM_TO_PX * scale, (offset_x, offset_y)):
+            if t.get('grid', True) and guides:
+                painter.setPen(QPen(QColor("#333333"), 2))
+                if corner_radius > 0:
+                    radius_px = corner_radius * MM_TO_PX * scale
+                    path = QPainterPath()
+                    path.addRoundedRect(x, y, w_label_px, h_label_px, radius_px, radius_px)
+                    painter.drawPath(path)
+                else:
+                    painter.drawRect(int(x), int(y), int(w_label_px), int(h_label_px))
+
+            if cal_square:
+                sq_size_px = cal_square_size * MM_TO_PX * scale
+                cx = x + w_label_px / 2
+                cy = y + h_label_px / 2
+                left = cx - sq_size_px / 2
+                top = cy - sq_size_px / 2
+                painter.setPen(QPen(QColor("#111"), 2))
+                painter.drawRect(int(left), int(top), int(sq_size_px), int(sq_size_px))
+                crosshair_len = sq_size_px * 0.7
+                painter.drawLine(int(cx - crosshair_len/2), int(cy), int(cx + crosshair_len/2), int(cy))
+                painter.drawLine(int(cx), int(cy - crosshair_len/2), int(cx), int(cy + crosshair_len/2))
+                if for_print:
+                    font_size_pt = max(int(22 * (1/scale)), 12)
+                else:
+                    font_size_pt = 12
+                font = QFont("Arial", font_size_pt, QFont.Normal)
+                painter.setFont(font)
+                painter.drawText(int(cx - sq_size_px / 2), int(top - 8), "10 mm")
+
+        if self.sweep:
+            paint_sweep(painter, geometry.device_rects(MM_TO_PX * scale, (offset_x, offset_y)),
+                        MM_TO_PX * scale, self.sweep)
 
         # --- Crosshairs ---
-        if t.get('crosshairs', True):
+        if t.get('crosshairs', True) and guides:
             ch_len = 14 * scale
             pen = QPen(QColor("#bd2323"), 1.6)
             pen.setCapStyle(Qt.RoundCap)
             painter.setPen(pen)
-            row_centers_mm = []
-            for r in range(rows - 1):
-                y1 = draw_y_mm + (r + 1) * label_h + r * row_gap
-                y2 = y1 + row_gap
-                center_y = y1 + (y2 - y1) / 2 if row_gap > 0 else y1
-                row_centers_mm.append(center_y)
-            col_centers_mm = []
-            for c in range(cols - 1):
-                x1 = draw_x_mm + (c + 1) * label_w + c * col_gap
-                x2 = x1 + col_gap
-                center_x = x1 + (x2 - x1) / 2 if col_gap > 0 else x1
-                col_centers_mm.append(center_x)
+            col_centers_mm, row_centers_mm = geometry.gap_centers_mm()
             for y_mm in row_centers_mm:
                 for x_mm in col_centers_mm:
                     x, y = mm_to_px(x_mm, y_mm)
@@ -236,6 +259,7 @@ class CalibrationTab(QWidget):
         super().__init__()
         self.setWindowTitle("Редактор на лист – Калибриране")
         self.params = self.default_params()
+        self.sweep = None  # {"kind", "step", "rows", "cols"} of the printed sweep sheet awaiting a pick
         self.toggles = {
             'grid': True,
             'crosshairs': True,
@@ -247,6 +271,7 @@ class CalibrationTab(QWidget):
         if loaded:
             self.params.update(loaded.get("params", {}))
             self.toggles.update(loaded.get("toggles", {}))
+            self.sweep = loaded.get("sweep")
         if "user_scale_factor" not in self.params:
             self.params["user_scale_factor"] = 1.0
         if "print_font_scale" not in self.params:
@@ -269,12 +294,11 @@ class CalibrationTab(QWidget):
         }
 
     def save_settings(self):
-        current = load_sheet_settings() or {}
-        current["params"] = self.params
-        current["toggles"] = self.toggles
+        # In memory at once; the store writes the file after the edits pause
+        values = {"params": self.params, "toggles": self.toggles, "sweep": self.sweep}
         if hasattr(self, "chk_skip_hw_margin"):
-            current["skip_hw_margin"] = self.chk_skip_hw_margin.isChecked()
-        save_sheet_settings(current)
+            values["skip_hw_margin"] = self.chk_skip_hw_margin.isChecked()
+        sheet_settings_store().update(**values)
 
     def update_helper_labels(self):
         offset_left = self.params['hw_left'] + self.params['sheet_left']
@@ -502,6 +526,52 @@ class CalibrationTab(QWidget):
         btns_h.addWidget(self.btn_calib_print)
         btns_h.addWidget(self.btn_print)
         controls.addLayout(btns_h)
+        self.btn_auto_calib = QPushButton("Авто-калибриране от сканиране…")
+        self.btn_auto_calib.setToolTip("Сканирайте отпечатаните помощници с калибрационни квадрати; "
+                                       "отместването, междините и мащабът се изчисляват наведнъж")
+        self.btn_auto_calib.clicked.connect(self.auto_calibrate)
+        controls.addWidget(self.btn_auto_calib)
+
+        # Sweep sheet: many offset variants on one print
+        gb_sweep = QGroupBox("Серия отмествания (един лист)")
+        l_sweep = QVBoxLayout(gb_sweep)
+        l_sweep_row = QHBoxLayout()
+        self.cb_sweep_kind = QComboBox()
+        self.cb_sweep_kind.addItem("Отместване (ляво/горе)", OFFSET)
+        self.cb_sweep_kind.addItem("Междини (колони/редове)", GAPS)
+        self.sp_sweep_step = QDoubleSpinBox()
+        self.sp_sweep_step.setRange(0.05, 3.0)
+        self.sp_sweep_step.setDecimals(2)
+        self.sp_sweep_step.setSingleStep(0.05)
+        self.sp_sweep_step.setValue(DEFAULT_STEP_MM[OFFSET])
+        self.sp_sweep_step.setMaximumWidth(70)
+        self.cb_sweep_kind.currentIndexChanged.connect(
+            lambda _: self.sp_sweep_step.setValue(DEFAULT_STEP_MM[self.cb_sweep_kind.currentData()]))
+        l_sweep_row.addWidget(self.cb_sweep_kind)
+        l_sweep_row.addWidget(QLabel("Стъпка (mm):"))
+        l_sweep_row.addWidget(self.sp_sweep_step)
+        l_sweep_row.addStretch(1)
+        l_sweep.addLayout(l_sweep_row)
+        l_sweep_btns = QHBoxLayout()
+        self.btn_sweep_print = QPushButton("Печат на серия")
+        self.btn_sweep_print.setToolTip("Всеки етикет получава рамка, отместена с различна стойност")
+        self.btn_sweep_print.clicked.connect(self.print_sweep)
+        self.btn_sweep_pick = QPushButton("Избери най-точната клетка…")
+        self.btn_sweep_pick.clicked.connect(self.pick_sweep_cell)
+        self.btn_sweep_cancel = QPushButton("Откажи серията")
+        self.btn_sweep_cancel.clicked.connect(lambda: self.set_sweep(None))
+        l_sweep_btns.addWidget(self.btn_sweep_print)
+        l_sweep_btns.addWidget(self.btn_sweep_pick)
+        l_sweep_btns.addWidget(self.btn_sweep_cancel)
+        l_sweep.addLayout(l_sweep_btns)
+        controls.addWidget(gb_sweep)
+        self.chk_quick_print = QCheckBox("Без диалог (активен принтерен профил)")
+        self.chk_quick_print.setToolTip("Печат с принтера от активния профил, без диалог за печат")
+        controls.addWidget(self.chk_quick_print)
+        self.btn_save_profile_calibration = QPushButton("Запази калибровката в профила")
+        self.btn_save_profile_calibration.setToolTip("Мащаб, хардуерни полета, отмествания и шрифт за принтера от активния профил")
+        self.btn_save_profile_calibration.clicked.connect(self.save_profile_calibration)
+        controls.addWidget(self.btn_save_profile_calibration)
 
         controls.addStretch(1)
         main_h.addLayout(controls, 0)
@@ -511,6 +581,7 @@ class CalibrationTab(QWidget):
         self.preview = SheetPreview(self.params, self.toggles)
         preview_pad.addWidget(self.preview)
         main_h.addLayout(preview_pad, 1)
+        self.show_sweep()
 
         loaded = load_sheet_settings()
         if loaded and "skip_hw_margin" in loaded:
@@ -541,13 +612,109 @@ class CalibrationTab(QWidget):
         self.preview.update()
         self.save_settings()
 
+    def profile_printer(self):
+        """The cached printer of the profile active right now (the editor may have switched it)."""
+        if not self.chk_quick_print.isChecked():
+            return None
+        return printer_profiles().printer()
+
+    def save_profile_calibration(self):
+        """Store the current calibration in the active printer profile; its quick prints use it."""
+        profiles = printer_profiles()
+        if not profiles.store_calibration(self.params):
+            QMessageBox.information(self, "Принтерен профил", "Няма активен принтерен профил.")
+            return
+        QMessageBox.information(self, "Принтерен профил", f"Калибровката е запазена в профил „{profiles.active}“.")
+
     def print_calibration(self):
-        printer.print_calibration(self.params['page_w'], self.params['page_h'], self)
+        printer.print_calibration(self.params['page_w'], self.params['page_h'], self, printer=self.profile_printer())
 
     def print_sheet(self):
-        self.preview.rendering_for_print = True
-        printer.print_sheet(self.preview, self)
-        self.preview.rendering_for_print = False
+        printer.print_sheet(self.preview, self, printer=self.profile_printer())
+
+    def show_sweep(self):
+        sweep = self.sweep
+        self.preview.sweep = sweep_cells(sweep["kind"], sweep["rows"], sweep["cols"], sweep["step"]) if sweep else None
+        self.preview.update()
+        self.btn_sweep_pick.setEnabled(bool(sweep))
+        self.btn_sweep_cancel.setEnabled(bool(sweep))
+
+    def set_sweep(self, sweep):
+        """Show (or clear) the sweep sheet in the preview and remember it until a cell is picked."""
+        self.sweep = sweep
+        self.show_sweep()
+        self.save_settings()
+
+    def print_sweep(self):
+        """Print one sheet on which every label tries a different offset (or gap) delta."""
+        previous = self.sweep
+        self.set_sweep({"kind": self.cb_sweep_kind.currentData(), "step": self.sp_sweep_step.value(),
+                        "rows": self.params['rows'], "cols": self.params['cols']})
+        if not printer.print_sheet(self.preview, self, printer=self.profile_printer()):
+            self.set_sweep(previous)
+
+    def pick_sweep_cell(self):
+        """Apply the deltas of the cell the operator found best aligned."""
+        sweep = self.sweep
+        if not sweep:
+            return
+        if (sweep["rows"], sweep["cols"]) != (self.params['rows'], self.params['cols']):
+            QMessageBox.warning(self, "Серия отмествания", "Редовете или колоните са променени след печата "
+                                "на серията. Отпечатайте я отново.")
+            return
+        cells = sweep_cells(sweep["kind"], sweep["rows"], sweep["cols"], sweep["step"])
+        if sweep["kind"] == GAPS:
+            hint = ("Изберете клетката в реда, където рамките стоят еднакво във всички етикети,\n"
+                    "и в колоната, където стоят еднакво надолу по нея:")
+        else:
+            hint = "Изберете клетката, чиято рамка е най-точно в средата на изрязания етикет:"
+        items = [f"№{n}: {cell_caption(deltas)}" for n, (deltas, _) in enumerate(cells, 1)]
+        item, ok = QInputDialog.getItem(self, "Серия отмествания", hint, items,
+                                        zero_cell(sweep["rows"], sweep["cols"]), False)
+        if not ok:
+            return
+        spins = {"sheet_left": self.sp_sheet_left, "sheet_top": self.sp_sheet_top,
+                 "col_gap": self.sp_cgap, "row_gap": self.sp_rgap}
+        deltas = cells[items.index(item)][0]
+        for key, delta in deltas.items():
+            spins[key].setValue(self.params[key] + delta)
+        self.set_sweep(None)
+
+    def auto_calibrate(self):
+        """Solve offsets, gaps and scale from a scan of the guides print with calibration squares."""
+        try:
+            from scan_calibration import analyze_scan, analysis_summary, image_dpi
+        except ImportError:
+            QMessageBox.warning(self, "Авто-калибриране", "За анализа на сканирането е нужен пакетът NumPy.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Сканиран калибриращ лист", "",
+                                              "Изображения (*.png *.jpg *.jpeg *.tif *.tiff *.bmp)")
+        if not path:
+            return
+        image = QImage(path)
+        if image.isNull():
+            QMessageBox.warning(self, "Авто-калибриране", "Изображението не може да бъде отворено.")
+            return
+        dpi = image_dpi(image)
+        if dpi is None:
+            dpi, ok = QInputDialog.getInt(self, "Авто-калибриране", "Резолюция на сканирането (DPI):", 300, 72, 2400)
+            if not ok:
+                return
+        try:
+            result = analyze_scan(image, self.params, dpi)
+        except ValueError as e:
+            QMessageBox.warning(self, "Авто-калибриране", str(e))
+            return
+        if QMessageBox.question(self, "Авто-калибриране", analysis_summary(result, self.params)
+                                + "\n\nДа приложа ли корекциите?") != QMessageBox.Yes:
+            return
+        values = result["params"]
+        self.sp_sheet_left.setValue(values["sheet_left"])
+        self.sp_sheet_top.setValue(values["sheet_top"])
+        self.sp_cgap.setValue(values["col_gap"])
+        self.sp_rgap.setValue(values["row_gap"])
+        # The scale goes through the measured-width field, which derives the factor from it
+        self.sp_measured_w.setValue(self.sp_expected_w.value() / values["user_scale_factor"])
 
 
 if __name__ == "__main__":
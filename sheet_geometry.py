@@ -0,0 +1,94 @@
+# sheet_geometry.py
+
+import math
+from functools import lru_cache
+
+DEVICE_CACHE_SIZE = 16  # transforms kept per geometry (print DPIs, preview sizes)
+
+class SheetGeometry:
+    """
+    Label rectangles of one sheet template and calibration, computed once in mm
+    (row-major slots, origin at the page corner). Renderers ask for device
+    rectangles at a px-per-mm factor and origin; each transform is computed
+    once and cached, and hit-testing uses the same numbers, so every view of
+    the sheet places labels identically.
+    """
+    def __init__(self, rows, cols, label_w, label_h, col_gap=0.0, row_gap=0.0, left=0.0, top=0.0):
+        self.rows = rows
+        self.cols = cols
+        self.label_w = label_w
+        self.label_h = label_h
+        self.col_gap = col_gap
+        self.row_gap = row_gap
+        self.left = left
+        self.top = top
+        xs = [left + col * (label_w + col_gap) for col in range(cols)]
+        ys = [top + row * (label_h + row_gap) for row in range(rows)]
+        self.rects_mm = [(x, y, label_w, label_h) for y in ys for x in xs]
+        self._device = {}
+
+    def __len__(self):
+        return len(self.rects_mm)
+
+    def size_mm(self):
+        """Extent of the label grid (without the offsets)."""
+        return (self.cols * self.label_w + (self.cols - 1) * self.col_gap,
+                self.rows * self.label_h + (self.rows - 1) * self.row_gap)
+
+    def device_rects(self, px_per_mm, origin=(0, 0), rounded=False):
+        """[(x, y, w, h)] in device units; rounded gives the integer rectangles the print path draws."""
+        key = (px_per_mm, origin, rounded)
+        rects = self._device.get(key)
+        if rects is None:
+            ox, oy = origin
+            if rounded:
+                w, h = round(self.label_w * px_per_mm), round(self.label_h * px_per_mm)
+                rects = [(round(ox + x * px_per_mm), round(oy + y * px_per_mm), w, h) for x, y, _, _ in self.rects_mm]
+            else:
+                w, h = self.label_w * px_per_mm, self.label_h * px_per_mm
+                rects = [(ox + x * px_per_mm, oy + y * px_per_mm, w, h) for x, y, _, _ in self.rects_mm]
+            if len(self._device) >= DEVICE_CACHE_SIZE:
+                self._device.clear()
+            self._device[key] = rects
+        return rects
+
+    def slot_at(self, x, y, px_per_mm, origin=(0, 0)):
+        """Slot under a device point, or None for gaps and outside the grid."""
+        mx = (x - origin[0]) / px_per_mm - self.left
+        my = (y - origin[1]) / px_per_mm - self.top
+        col = math.floor(mx / (self.label_w + self.col_gap))
+        row = math.floor(my / (self.label_h + self.row_gap))
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        if mx - col * (self.label_w + self.col_gap) > self.label_w or my - row * (self.label_h + self.row_gap) > self.label_h:
+            return None
+        return row * self.cols + col
+
+    def gap_centers_mm(self):
+        """(x centres of the column gaps, y centres of the row gaps), where crosshairs go."""
+        xs = [self.left + (c + 1) * self.label_w + c * self.col_gap + self.col_gap / 2 for c in range(self.cols - 1)]
+        ys = [self.top + (r + 1) * self.label_h + r * self.row_gap + self.row_gap / 2 for r in range(self.rows - 1)]
+        return xs, ys
+
+@lru_cache(maxsize=32)
+def _geometry(rows, cols, label_w, label_h, col_gap, row_gap, left, top):
+    return SheetGeometry(rows, cols, label_w, label_h, col_gap, row_gap, left, top)
+
+def grid_geometry(rows, cols, label_w, label_h, col_gap=0.0, row_gap=0.0, left=0.0, top=0.0):
+    """Shared SheetGeometry for these numbers (device transforms are cached on it)."""
+    return _geometry(int(rows), int(cols), float(label_w), float(label_h), float(col_gap), float(row_gap),
+                     float(left), float(top))
+
+def sheet_geometry(params, hw_offset=True):
+    """
+    Geometry of the calibrated sheet. hw_offset places the grid after the printer's
+    hw_left/hw_top margin as the editor prints it; without it the sheet offsets are
+    taken from the page origin (borderless printing, full-page calibration prints).
+    """
+    left = float(params.get("sheet_left", 0))
+    top = float(params.get("sheet_top", 0))
+    if hw_offset:
+        left += float(params.get("hw_left", 0))
+        top += float(params.get("hw_top", 0))
+    return grid_geometry(params.get("rows", 3), params.get("cols", 3), params.get("label_w", 63.5),
+                         params.get("label_h", 38.1), params.get("col_gap", 0), params.get("row_gap", 0), left, top)
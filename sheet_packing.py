@@ -0,0 +1,234 @@
+# sheet_packing.py
+
+import os
+import json
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QListWidget, QListWidgetItem,
+    QPushButton, QLabel, QToolButton, QDialogButtonBox
+)
+from PyQt5.QtCore import Qt
+
+from session_manager import default_session_dir
+
+STOCK_FILENAME = "sheet_stock.json"
+
+def stock_path():
+    return os.path.join(default_session_dir(), STOCK_FILENAME)
+
+def slots_of(bitmap, count):
+    return [i for i in range(count) if bitmap >> i & 1]
+
+def bitmap_of(slots):
+    bitmap = 0
+    for i in slots:
+        bitmap |= 1 << i
+    return bitmap
+
+class SheetStock:
+    """
+    Partially used physical label sheets. Each sheet is an occupancy bitmap
+    over rows x cols positions (bit set = label already peeled off/printed).
+    Persisted as JSON next to the sessions.
+    """
+    def __init__(self, rows, cols, path=None):
+        self.rows = rows
+        self.cols = cols
+        self.path = path or stock_path()
+        self.sheets = []  # [{"id": int, "used": bitmap}]
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("rows") == rows and data.get("cols") == cols:
+                self.sheets = data.get("sheets", [])
+        except (OSError, ValueError, AttributeError):
+            self.sheets = []
+
+    @property
+    def capacity(self):
+        return self.rows * self.cols
+
+    @property
+    def full_bitmap(self):
+        return (1 << self.capacity) - 1
+
+    def free_count(self, sheet):
+        return self.capacity - bin(sheet["used"] & self.full_bitmap).count("1")
+
+    def add_sheet(self, used_slots):
+        used = bitmap_of(used_slots) & self.full_bitmap
+        if used == self.full_bitmap:
+            return None
+        sheet = {"id": max((s["id"] for s in self.sheets), default=0) + 1, "used": used}
+        self.sheets.append(sheet)
+        return sheet
+
+    def remove_sheet(self, sheet_id):
+        self.sheets = [s for s in self.sheets if s["id"] != sheet_id]
+
+    def mark_used(self, sheet_id, slots):
+        """Mark slots of a stocked sheet as used; a sheet with no free slot left is dropped."""
+        for sheet in self.sheets:
+            if sheet["id"] == sheet_id:
+                sheet["used"] |= bitmap_of(slots)
+                if sheet["used"] & self.full_bitmap == self.full_bitmap:
+                    self.remove_sheet(sheet_id)
+                return
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"rows": self.rows, "cols": self.cols, "sheets": self.sheets}, f, indent=2)
+        os.replace(tmp, self.path)
+
+def expand_copies(items):
+    """[(item, copies)] -> flat list with every item repeated copies times (at least once)."""
+    flat = []
+    for item, copies in items:
+        flat.extend([item] * max(1, int(copies or 1)))
+    return flat
+
+def plan_job(items, stock):
+    """
+    Place items (already expanded for copies) onto the partial sheets in stock first,
+    the emptiest ones first, then onto fresh sheets.
+    Returns pages: [{"sheet": sheet id or None for a fresh sheet, "placements": [(slot, item)]}]
+    with the partial sheets first, in the order they must be fed to the printer.
+    """
+    pages = []
+    pos = 0
+    for sheet in sorted(stock.sheets, key=stock.free_count, reverse=True):
+        if pos >= len(items):
+            break
+        free = [i for i in range(stock.capacity) if not sheet["used"] >> i & 1]
+        take = items[pos:pos + len(free)]
+        pages.append({"sheet": sheet["id"], "placements": list(zip(free, take))})
+        pos += len(take)
+    while pos < len(items):
+        take = items[pos:pos + stock.capacity]
+        pages.append({"sheet": None, "placements": list(enumerate(take))})
+        pos += len(take)
+    return pages
+
+def commit_plan(stock, pages, keep_leftover=False):
+    """
+    Update the stock after a successful print: used partial sheets get their new
+    positions marked; fresh sheets with positions left over become partial sheets
+    only with keep_leftover (the user chose to reuse them).
+    """
+    for page in pages:
+        slots = [slot for slot, _ in page["placements"]]
+        if page["sheet"] is None:
+            if keep_leftover:
+                stock.add_sheet(slots)
+        else:
+            stock.mark_used(page["sheet"], slots)
+    stock.save()
+
+def plan_summary(pages):
+    partial = [p["sheet"] for p in pages if p["sheet"] is not None]
+    fresh = len(pages) - len(partial)
+    parts = []
+    if partial:
+        parts.append("частични листове №" + ", №".join(str(s) for s in partial))
+    if fresh:
+        parts.append(f"{fresh} нов(и) лист(а)")
+    return "Поставете в принтера по ред: " + ", след тях ".join(parts) + "."
+
+class SheetStockDialog(QDialog):
+    """Register partially used sheets by clicking the positions that are already gone."""
+    def __init__(self, stock, parent=None):
+        super().__init__(parent)
+        self.stock = stock
+        self.setWindowTitle("Частично използвани листове")
+        layout = QHBoxLayout(self)
+
+        left = QVBoxLayout()
+        left.addWidget(QLabel("Листове в наличност:"))
+        self.sheet_list = QListWidget()
+        self.sheet_list.currentRowChanged.connect(self._show_sheet)
+        left.addWidget(self.sheet_list, 1)
+        row = QHBoxLayout()
+        add_btn = QPushButton("Добави лист")
+        add_btn.clicked.connect(self._add_sheet)
+        del_btn = QPushButton("Премахни")
+        del_btn.clicked.connect(self._remove_sheet)
+        row.addWidget(add_btn)
+        row.addWidget(del_btn)
+        left.addLayout(row)
+        layout.addLayout(left)
+
+        right = QVBoxLayout()
+        right.addWidget(QLabel("Маркирайте липсващите етикети:"))
+        grid = QGridLayout()
+        grid.setSpacing(3)
+        self.slot_buttons = []
+        for i in range(stock.capacity):
+            btn = QToolButton()
+            btn.setCheckable(True)
+            btn.setFixedSize(54, 32)
+            btn.setStyleSheet("QToolButton:checked { background: #999; color: #fff; }")
+            btn.setText(str(i + 1))
+            btn.toggled.connect(lambda on, i=i: self._toggle_slot(i, on))
+            grid.addWidget(btn, i // stock.cols, i % stock.cols)
+            self.slot_buttons.append(btn)
+        right.addLayout(grid)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        right.addStretch(1)
+        right.addWidget(buttons)
+        layout.addLayout(right)
+        self._refresh_list()
+
+    def _refresh_list(self, select=0):
+        self.sheet_list.blockSignals(True)
+        self.sheet_list.clear()
+        for sheet in self.stock.sheets:
+            item = QListWidgetItem(f"Лист №{sheet['id']} – свободни {self.stock.free_count(sheet)}")
+            item.setData(Qt.UserRole, sheet["id"])
+            self.sheet_list.addItem(item)
+        self.sheet_list.blockSignals(False)
+        if self.stock.sheets:
+            self.sheet_list.setCurrentRow(min(select, len(self.stock.sheets) - 1))
+        self._show_sheet(self.sheet_list.currentRow())
+
+    def _current_sheet(self):
+        row = self.sheet_list.currentRow()
+        return self.stock.sheets[row] if 0 <= row < len(self.stock.sheets) else None
+
+    def _show_sheet(self, row):
+        sheet = self._current_sheet()
+        for i, btn in enumerate(self.slot_buttons):
+            btn.blockSignals(True)
+            btn.setChecked(bool(sheet and sheet["used"] >> i & 1))
+            btn.setEnabled(sheet is not None)
+            btn.blockSignals(False)
+
+    def _toggle_slot(self, i, on):
+        sheet = self._current_sheet()
+        if sheet is None:
+            return
+        if on:
+            sheet["used"] |= 1 << i
+        else:
+            sheet["used"] &= ~(1 << i)
+        item = self.sheet_list.currentItem()
+        item.setText(f"Лист №{sheet['id']} – свободни {self.stock.free_count(sheet)}")
+
+    def _add_sheet(self):
+        self.stock.sheets.append({"id": max((s["id"] for s in self.stock.sheets), default=0) + 1, "used": 0})
+        self._refresh_list(select=len(self.stock.sheets) - 1)
+
+    def _remove_sheet(self):
+        sheet = self._current_sheet()
+        if sheet is not None:
+            self.stock.remove_sheet(sheet["id"])
+            self._refresh_list(select=self.sheet_list.currentRow())
+
+    def accept(self):
+        # Fully used sheets are of no use for packing
+        self.stock.sheets = [s for s in self.stock.sheets if self.stock.free_count(s) > 0]
+        self.stock.save()
+        super().accept()
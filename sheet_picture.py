@@ -0,0 +1,72 @@
+# sheet_picture.py
+
+import json
+
+from PyQt5.QtGui import QPainter, QPicture
+
+from label_units import RECORD_DPI
+from print_history import label_fingerprint
+
+def record_sheet(render, font_scale, placements=None, settings=None, dpi=RECORD_DPI):
+    """
+    Record one sheet painted by render(painter, dpi, print_font_scale, placements, settings)
+    into a QPicture, in the pixels of a dpi device. Label text keeps its pixel size on
+    every device (print_font_scale is calibrated that way), so a sheet is recorded at the
+    resolution of the device it is played on rather than rescaled from another one.
+    """
+    picture = QPicture()
+    painter = QPainter(picture)
+    render(painter, dpi, print_font_scale=font_scale, placements=placements, settings=settings)
+    painter.end()
+    return picture
+
+def play_sheet(painter, picture):
+    """Replay a sheet recorded at the device's dpi (printer, QPdfWriter, image), pixel for pixel."""
+    stamp(painter, picture, 0, 0)
+
+def record_label(draw, w, h, label, **kwargs):
+    """Record one label laid out by draw(painter, 0, 0, w, h, label, **kwargs) into a QPicture."""
+    picture = QPicture()
+    painter = QPainter(picture)
+    painter.setRenderHint(QPainter.Antialiasing)
+    draw(painter, 0, 0, w, h, label, **kwargs)
+    painter.end()
+    return picture
+
+def stamp(painter, picture, x, y):
+    """Draw a recorded label at (x, y) in the painter's current coordinates, unscaled."""
+    factor = picture.logicalDpiX() / painter.device().logicalDpiX()
+    painter.save()
+    painter.translate(x, y)
+    painter.scale(factor, factor)
+    painter.drawPicture(0, 0, picture)
+    painter.restore()
+
+class SheetPictureCache:
+    """
+    Display list of the editor's sheet: render_sheet() runs once per output
+    resolution into a QPicture and the recording is replayed until the labels,
+    the calibration settings or the font scale change.
+    """
+    def __init__(self, editor):
+        self.editor = editor
+        self._pictures = {}  # dpi -> (key, picture)
+
+    def _cache_key(self, settings, font_scale):
+        labels = [label_fingerprint(label) for label in self.editor.labels]
+        return json.dumps([settings, font_scale, self.editor.debug_draw_boxes, labels], sort_keys=True)
+
+    def picture(self, settings, font_scale, dpi=RECORD_DPI):
+        key = self._cache_key(settings, font_scale)
+        cached = self._pictures.get(dpi)
+        if cached is None or cached[0] != key:
+            # Recordings for other resolutions are stale too once the sheet changes
+            self._pictures = {d: c for d, c in self._pictures.items() if c[0] == key}
+            self._pictures[dpi] = (key, record_sheet(self.editor.render_sheet, font_scale, settings=settings, dpi=dpi))
+        return self._pictures[dpi][1]
+
+    def invalidate(self):
+        self._pictures = {}
+
+    def paint(self, painter, dpi, settings, font_scale):
+        play_sheet(painter, self.picture(settings, font_scale, dpi))
@@ -0,0 +1,127 @@
+# sheet_settings.py
+
+import os
+import copy
+import json
+
+from PyQt5.QtCore import Qt, QObject, QTimer, QCoreApplication, pyqtSignal
+
+from session_manager import default_session_dir
+
+SETTINGS_FILENAME = "sheet_settings.json"
+SAVE_DELAY_MS = 500  # edits within this window are written together
+
+def sheet_settings_path():
+    return os.path.join(default_session_dir(), SETTINGS_FILENAME)
+
+def read_sheet_settings(path=None):
+    try:
+        with open(path or sheet_settings_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def write_sheet_settings(data, path=None):
+    path = path or sheet_settings_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+class SheetSettingsStore(QObject):
+    """
+    The calibration settings ({"params", "toggles", "skip_hw_margin", ...}) held in
+    memory for the whole process. Edits notify listeners at once through changed;
+    the file is written once, atomically, after the edits pause. settings() hands out
+    one shared snapshot that is replaced, never modified, so it costs nothing per paint
+    and is safe to read from workers; callers must not modify it. The file is checked
+    for changes by another program only on reload(), which runs whenever the
+    application becomes active again.
+    """
+    changed = pyqtSignal(dict)
+
+    def __init__(self, path=None, parent=None):
+        super().__init__(parent)
+        self.path = path or sheet_settings_path()
+        self._data = {}
+        self._snapshot = {}
+        self._mtime = None
+        self._dirty = False
+        self._reload()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SAVE_DELAY_MS)
+        self._timer.timeout.connect(self.flush)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
+            if hasattr(app, "applicationStateChanged"):
+                app.applicationStateChanged.connect(self._on_application_state)
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _reload(self):
+        self._mtime = self._file_mtime()
+        self._data = read_sheet_settings(self.path)
+        self._snapshot = copy.deepcopy(self._data)
+
+    def _on_application_state(self, state):
+        if state == Qt.ApplicationActive:
+            self.reload()
+
+    def reload(self):
+        """Read the file again if another program changed it and nothing is waiting to be saved."""
+        if self._dirty or self._file_mtime() == self._mtime:
+            return False
+        old = self._data
+        self._reload()
+        if self._data != old:
+            self.changed.emit(self._snapshot)
+        return True
+
+    def settings(self):
+        """The current settings as a read-only snapshot (do not modify it)."""
+        return self._snapshot
+
+    def params(self):
+        return self.settings().get("params", {})
+
+    def update(self, **values):
+        """Set top-level keys (params=..., toggles=..., skip_hw_margin=...) and schedule a save."""
+        values = copy.deepcopy(values)
+        if all(self._data.get(k) == v for k, v in values.items()):
+            return
+        self._data.update(values)
+        self._snapshot = copy.deepcopy(self._data)
+        self._dirty = True
+        self._timer.start()
+        self.changed.emit(self._snapshot)
+
+    def flush(self):
+        self._timer.stop()
+        if not self._dirty:
+            return
+        try:
+            write_sheet_settings(self._data, self.path)
+        except OSError:
+            return  # kept dirty; the next edit or exit tries again
+        self._dirty = False
+        self._mtime = self._file_mtime()
+
+_store = None
+
+def sheet_settings_store():
+    """The process-wide store shared by the editor, the previews and the calibration tab."""
+    global _store
+    if _store is None:
+        _store = SheetSettingsStore()
+    return _store
+
+def load_sheet_settings():
+    return sheet_settings_store().settings()
@@ -0,0 +1,92 @@
+import json
+import os
+from decimal import Decimal
+
+import pytest
+
+from bulk_pricing import (
+    OP_RATE, OP_PERCENT, OP_PRICE_LIST, BGN_TO_EUR, EUR_TO_BGN, MANUAL, reprice, apply_price_changes,
+    reprice_session_file
+)
+
+def label(bgn="", eur="", main="", sku=None):
+    result = {"main": {"text": main}, "bgn": {"text": bgn}, "eur": {"text": eur}}
+    if sku:
+        result["sku"] = sku
+    return result
+
+def test_rate_recomputes_target_from_source():
+    labels = [label("19.56", "1")]
+    assert reprice(labels, OP_RATE) == {0: {"bgn": "19.56", "eur": "10"}}
+
+def test_rate_uses_given_rate_and_direction():
+    labels = [label("1", "10")]
+    assert reprice(labels, OP_RATE, direction=EUR_TO_BGN, rate="2") == {0: {"bgn": "20", "eur": "10"}}
+
+def test_rate_leaves_matching_prices_alone():
+    assert reprice([label("19.56", "10")], OP_RATE) == {}
+
+def test_percent_scales_source_and_converts():
+    labels = [label("10", "5.11")]
+    assert reprice(labels, OP_PERCENT, -10) == {0: {"bgn": "9", "eur": "4.6"}}
+
+def test_percent_manual_scales_both_columns_without_converting():
+    labels = [label("10", "7")]
+    assert reprice(labels, OP_PERCENT, "50", direction=MANUAL) == {0: {"bgn": "15", "eur": "10.5"}}
+
+def test_price_list_matches_sku_then_main_text():
+    labels = [label("1", main="Other", sku="A-1"), label("1", main="  Лепило   Ceresit "), label("3.91", "2", main="x")]
+    prices = {"a-1": Decimal("3.91"), "лепило ceresit": Decimal("7.82")}
+    assert reprice(labels, OP_PRICE_LIST, prices) == {
+        0: {"bgn": "3.91", "eur": "2"},
+        1: {"bgn": "7.82", "eur": "4"},
+    }
+
+def test_indices_limit_the_labels():
+    labels = [label("10"), label("20")]
+    assert reprice(labels, OP_PERCENT, 10, indices=[1, 5]) == {1: {"bgn": "22", "eur": "11.25"}}
+
+@pytest.mark.parametrize("operation, value", [(OP_RATE, None), (OP_PERCENT, 10), (OP_PRICE_LIST, {"x": Decimal(1)})])
+def test_empty_source_keeps_target(operation, value):
+    labels = [label("", "5", main="unlisted"), label("10", "", main="x", sku="s")]
+    changes = reprice(labels, operation, value)
+    assert 0 not in changes
+    assert reprice([label("", "5")], operation, value, direction=BGN_TO_EUR) == {}
+
+def test_empty_source_keeps_target_eur_to_bgn():
+    assert reprice([label("9.78", "")], OP_PERCENT, 10, direction=EUR_TO_BGN) == {}
+
+def test_empty_target_is_filled_from_source():
+    assert reprice([label("19.56", "")], OP_RATE) == {0: {"bgn": "19.56", "eur": "10"}}
+
+def test_unknown_operation():
+    with pytest.raises(ValueError):
+        reprice([label("1")], "nope")
+
+def test_apply_price_changes_writes_texts():
+    labels = [label("10", "5.11"), label("1", "1")]
+    changed = apply_price_changes(labels, reprice(labels, OP_PERCENT, 100, indices=[0]))
+    assert changed == [0]
+    assert (labels[0]["bgn"]["text"], labels[0]["eur"]["text"]) == ("20", "10.23")
+    assert (labels[1]["bgn"]["text"], labels[1]["eur"]["text"]) == ("1", "1")
+
+def test_reprice_session_file_rewrites_the_session(tmp_path):
+    path = tmp_path / "session.json"
+    path.write_text(json.dumps({"labels": [label("10", "5.11")]}), encoding="utf-8")
+    assert reprice_session_file(str(path), OP_PERCENT, 100) == 1
+    assert json.loads(path.read_text(encoding="utf-8"))["labels"][0]["bgn"]["text"] == "20"
+    assert os.listdir(tmp_path) == ["session.json"]
+
+def test_reprice_session_file_keeps_the_session_when_writing_fails(tmp_path, monkeypatch):
+    path = tmp_path / "session.json"
+    original = json.dumps({"labels": [label("10", "5.11")]})
+    path.write_text(original, encoding="utf-8")
+
+    def failing_dump(*args, **kwargs):
+        raise TypeError("not serializable")
+
+    monkeypatch.setattr(json, "dump", failing_dump)
+    with pytest.raises(TypeError):
+        reprice_session_file(str(path), OP_PERCENT, 100)
+    assert path.read_text(encoding="utf-8") == original
+    assert os.listdir(tmp_path) == ["session.json"]
@@ -0,0 +1,59 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from catalog_sync import CatalogSync
+from product_catalog import ProductCatalog
+
+def write_export(path, rows):
+    lines = ["sku,name,bgn,eur"] + [",".join(row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def label(sku, main="", bgn=""):
+    return {"sku": sku, "main": {"text": main}, "second": {"text": ""}, "bgn": {"text": bgn}, "eur": {"text": ""}}
+
+@pytest.fixture
+def catalog():
+    catalog = ProductCatalog(":memory:")
+    catalog.upsert_many([{"sku": "A", "name": "Лепило", "bgn": "10"}, {"sku": "HAND", "name": "Ръчно въведен"}])
+    yield catalog
+    catalog.close()
+
+def test_missing_products_are_kept_by_default(catalog, tmp_path):
+    export = write_export(tmp_path / "export.csv", [("A", "Лепило", "10", "")])
+    result = CatalogSync(catalog).sync(export)
+    assert result.deleted == 0
+    assert catalog.get("HAND") is not None
+
+def test_missing_products_are_deleted_on_request(catalog, tmp_path):
+    export = write_export(tmp_path / "export.csv", [("A", "Лепило", "10", "")])
+    result = CatalogSync(catalog, delete_missing=True).sync(export)
+    assert result.deleted == 1
+    assert catalog.get("HAND") is None
+
+def test_changed_products_refresh_linked_labels(catalog, tmp_path):
+    export = write_export(tmp_path / "export.csv", [("A", "Лепило", "12", "6.14"), ("HAND", "Ръчно въведен", "", "")])
+    labels = [label("A", "Лепило", "10"), label("B", "Друго", "1")]
+    result = CatalogSync(catalog).sync(export, labels=labels, labels_session="s.json")
+    assert result.reprint == [{"session": "s.json", "index": 0, "sku": "A"}]
+    assert (labels[0]["bgn"]["text"], labels[0]["eur"]["text"]) == ("12", "6.14")
+    assert catalog.get("A")["bgn"] == Decimal("12")
+
+def test_sync_converts_a_missing_price(catalog, tmp_path):
+    export = write_export(tmp_path / "export.csv", [("A", "Лепило", "12", "")])
+    labels = [label("A", "Лепило", "10")]
+    CatalogSync(catalog).sync(export, labels=labels)
+    assert (labels[0]["bgn"]["text"], labels[0]["eur"]["text"]) == ("12", "6.14")
+
+def test_sync_converts_in_each_session_mode(catalog, tmp_path):
+    export = write_export(tmp_path / "export.csv", [("A", "Лепило", "", "6.14")])
+    session = tmp_path / "session.json"
+    session.write_text(json.dumps({"conversion_mode": "manual", "labels": [label("A", "Лепило", "10")]}),
+                       encoding="utf-8")
+    labels = [label("A", "Лепило", "10")]
+    CatalogSync(catalog, mode="both").sync(export, labels=labels, session_paths=[str(session)])
+    assert (labels[0]["bgn"]["text"], labels[0]["eur"]["text"]) == ("12.01", "6.14")
+    saved = json.loads(session.read_text(encoding="utf-8"))["labels"][0]
+    assert (saved["bgn"]["text"], saved["eur"]["text"]) == ("", "6.14")
@@ -0,0 +1,54 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from clipboard_manager import ClipboardManager
+
+class Selection:
+    def __init__(self):
+        self.selected = []
+
+    def get_selected(self):
+        return self.selected
+
+def label(text):
+    return {"main": {"text": text, "size": 15}}
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def manager(app):
+    labels = [label(str(n)) for n in range(9)]
+    changed = []
+    widget = QWidget()
+    mgr = ClipboardManager(widget, labels, Selection(), changed.extend, cols=3)
+    mgr.widget = widget  # keep the shortcut parent alive
+    mgr.changed = changed
+    return mgr
+
+def texts(labels):
+    return [l["main"]["text"] for l in labels]
+
+def test_paste_keeps_the_block_layout(manager):
+    assert manager.copy_indices([0, 1, 3, 4])
+    assert manager.paste_at(4) == [4, 5, 7, 8]
+    assert texts(manager.labels) == ["0", "1", "2", "3", "0", "1", "6", "3", "4"]
+
+def test_paste_near_the_last_row_drops_the_overflow(manager):
+    assert manager.copy_indices([0, 1, 3, 4, 6, 7])
+    assert manager.paste_at(7) == [7, 8]
+    assert len(manager.labels) == 9
+    assert texts(manager.labels) == ["0", "1", "2", "3", "4", "5", "6", "0", "1"]
+    assert manager.changed == [7, 8]
+
+def test_single_label_fills_every_selected_index(manager):
+    assert manager.copy_from_index(2)
+    assert manager.paste_at(0, fill_indices=[0, 4, 8]) == [0, 4, 8]
+    assert texts(manager.labels)[::4] == ["2", "2", "2"]
+    manager.labels[0]["main"]["text"] = "x"
+    assert manager.labels[4]["main"]["text"] == "2"
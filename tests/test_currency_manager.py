@@ -0,0 +1,27 @@
+from decimal import Decimal
+
+import pytest
+
+from currency_manager import CurrencyManager, convert_missing
+
+@pytest.mark.parametrize("mode, bgn, eur, expected", [
+    (CurrencyManager.BGN_TO_EUR, Decimal("19.56"), None, (Decimal("19.56"), Decimal("10.00"))),
+    (CurrencyManager.BOTH, Decimal("19.56"), None, (Decimal("19.56"), Decimal("10.00"))),
+    (CurrencyManager.EUR_TO_BGN, None, Decimal("10"), (Decimal("19.56"), Decimal("10"))),
+    (CurrencyManager.BOTH, None, Decimal("10"), (Decimal("19.56"), Decimal("10"))),
+])
+def test_missing_price_is_converted(mode, bgn, eur, expected):
+    assert convert_missing(bgn, eur, mode) == expected
+
+@pytest.mark.parametrize("mode, bgn, eur", [
+    (CurrencyManager.MANUAL, Decimal("19.56"), None),
+    (CurrencyManager.EUR_TO_BGN, Decimal("19.56"), None),
+    (CurrencyManager.BGN_TO_EUR, None, Decimal("10")),
+    (CurrencyManager.BGN_TO_EUR, Decimal("1"), Decimal("7")),
+    (CurrencyManager.BOTH, None, None),
+])
+def test_prices_kept(mode, bgn, eur):
+    assert convert_missing(bgn, eur, mode) == (bgn, eur)
+
+def test_rate():
+    assert convert_missing(Decimal("10"), None, CurrencyManager.BGN_TO_EUR, Decimal("2")) == (Decimal("10"), Decimal("5.00"))
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from price_table import PriceTable
+
+def label(sku=None, main=""):
+    label = {"main": {"text": main}, "second": {"text": ""}, "bgn": {"text": ""}, "eur": {"text": ""}}
+    if sku:
+        label["sku"] = sku
+    return label
+
+def table():
+    table = PriceTable()
+    table.upsert("A-1", "Лепило за плочки", bgn="12.50")
+    table.upsert("B-2", "Грунд дълбокопроникващ", eur="6")
+    table.upsert("C-3", "Лепило монтажно")
+    return table
+
+def test_sku_lookup_ignores_case_and_updates_in_place():
+    t = table()
+    assert t.find_sku(" a-1 ") == 0
+    assert t.row(0)["bgn"] == Decimal("12.50")
+    assert t.upsert("a-1", "Лепило С11") == 0
+    assert len(t) == 3
+    assert t.search("лепило") == [2, 0]
+
+def test_name_search_by_prefix_then_substring():
+    t = table()
+    assert t.search("лепило") == [0, 2]
+    assert t.search("проникващ") == [1]
+    assert t.search("пл") == []
+
+def test_labels_are_found_through_their_sku_links():
+    t = table().link_labels([label("A-1"), label(), label("c-3"), label("A-1")])
+    assert t.labels_for("a-1") == [0, 3]
+    assert t.labels_for_rows(t.search("лепило")) == [0, 2, 3]
+    assert t.labels_for_keys({"c-3": Decimal("1")}) == [1, 2]
+
+def test_fill_label_converts_a_missing_price():
+    t = table()
+    filled = t.fill_label(label(), t.find_sku("B-2"), "both")
+    assert (filled["sku"], filled["bgn"]["text"], filled["eur"]["text"]) == ("B-2", "11.73", "6")
@@ -0,0 +1,19 @@
+from print_history import has_content, is_blank
+
+def label(**fields):
+    base = {k: {"text": "", "bg_color": "#fff"} for k in ("main", "second", "bgn", "eur")}
+    base["logo"] = {"position": "без лого"}
+    for key, value in fields.items():
+        base[key] = dict(base[key], **value)
+    return base
+
+def test_empty_label_has_no_content():
+    assert not has_content(label())
+    assert is_blank(label())
+    assert is_blank({})
+
+def test_text_logo_and_background_are_content():
+    assert has_content(label(main={"text": "Лепило"}))
+    assert has_content(label(logo={"position": "долу ляво"}))
+    assert has_content(label(bgn={"bg_color": "#ffee00"}))
+    assert not has_content(label(bgn={"bg_color": "#ffffff"}))
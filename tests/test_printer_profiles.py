@@ -0,0 +1,39 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+from printer_profiles import PrinterProfiles
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def profiles(app, tmp_path):
+    profiles = PrinterProfiles(str(tmp_path / "printer_profiles.json"))
+    profiles.store("Офис", {"printer_name": "", "resolution": 600,
+                            "calibration": {"user_scale_factor": 0.98, "hw_left": 4.2}})
+    return profiles
+
+def test_quick_print_settings_use_the_profile_calibration(profiles):
+    settings = {"params": {"user_scale_factor": 1.0, "hw_left": 5.0, "label_w": 63.5}, "skip_hw_margin": True}
+    applied = profiles.settings(settings)
+    assert applied["params"] == {"user_scale_factor": 0.98, "hw_left": 4.2, "label_w": 63.5}
+    assert applied["skip_hw_margin"] is True
+    assert settings["params"]["hw_left"] == 5.0
+
+def test_store_calibration_keeps_only_printer_params(profiles, tmp_path):
+    assert profiles.store_calibration({"hw_top": 3.0, "sheet_left": 1.5, "rows": 7})
+    reloaded = PrinterProfiles(str(tmp_path / "printer_profiles.json"))
+    assert reloaded.get("Офис")["calibration"] == {"hw_top": 3.0, "sheet_left": 1.5}
+
+def test_printer_is_cached_per_profile(profiles):
+    printer = profiles.printer()
+    printer.setFullPage(True)
+    assert profiles.printer() is printer
+    assert not printer.fullPage()
+    profiles.store("Офис", {"printer_name": ""})
+    assert profiles.printer() is not printer
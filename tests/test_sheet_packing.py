@@ -0,0 +1,20 @@
+from sheet_packing import SheetStock, commit_plan, plan_job
+
+def stock(tmp_path):
+    return SheetStock(2, 2, path=str(tmp_path / "sheet_stock.json"))
+
+def test_leftover_of_a_fresh_sheet_is_kept_only_on_request(tmp_path):
+    pages = plan_job(["a", "b", "c"], stock(tmp_path))
+    commit_plan(stock(tmp_path), pages)
+    assert stock(tmp_path).sheets == []
+    commit_plan(stock(tmp_path), pages, keep_leftover=True)
+    assert stock(tmp_path).sheets == [{"id": 1, "used": 0b0111}]
+
+def test_partial_sheets_are_always_marked_used(tmp_path):
+    partial = stock(tmp_path)
+    partial.add_sheet([0])
+    partial.save()
+    pages = plan_job(["a"], stock(tmp_path))
+    assert pages == [{"sheet": 1, "placements": [(1, "a")]}]
+    commit_plan(stock(tmp_path), pages)
+    assert stock(tmp_path).sheets == [{"id": 1, "used": 0b0011}]
@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from sheet_settings import SheetSettingsStore
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+@pytest.fixture
+def store(app, tmp_path):
+    path = tmp_path / "sheet_settings.json"
+    path.write_text(json.dumps({"params": {"rows": 3}}), encoding="utf-8")
+    return SheetSettingsStore(str(path))
+
+def test_settings_is_one_shared_snapshot(store):
+    assert store.settings() is store.settings()
+    assert store.params() == {"rows": 3}
+
+def test_update_replaces_the_snapshot(store):
+    before = store.settings()
+    seen = []
+    store.changed.connect(seen.append)
+    store.update(params={"rows": 5})
+    assert before == {"params": {"rows": 3}}
+    assert store.settings() == {"params": {"rows": 5}}
+    assert seen == [store.settings()]
+
+def test_file_is_reread_only_on_reload(store):
+    with open(store.path, "w", encoding="utf-8") as f:
+        json.dump({"params": {"rows": 7}}, f)
+    os.utime(store.path, ns=(1, 1))
+    assert store.params() == {"rows": 3}
+    seen = []
+    store.changed.connect(seen.append)
+    assert store.reload()
+    assert store.params() == {"rows": 7}
+    assert len(seen) == 1
+
+def test_reload_keeps_unsaved_edits(store):
+    store.update(params={"rows": 5})
+    os.utime(store.path, ns=(1, 1))
+    assert not store.reload()
+    assert store.params() == {"rows": 5}
+    store.flush()
+    with open(store.path, encoding="utf-8") as f:
+        assert json.load(f) == {"params": {"rows": 5}}
@@ -0,0 +1,158 @@
+# text_fit.py
+
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtGui import QFont, QFontMetricsF
+
+from label_units import (
+    TEXT_FIELDS, LINE_HEIGHT, MEASURE_PX, RECORD_DPI, field_text, print_margin_mm, text_height_mm
+)
+from print_history import label_fingerprint
+
+MIN_SIZE = 6       # smallest point size auto-fit goes down to (the toolbar minimum)
+PREVIEW_MARGIN_MM = 6.0  # draw_label_preview margin (6 px per preview mm)
+FIT_CACHE_SIZE = 512
+
+class AdvanceCache:
+    """
+    Per-(font, bold, italic) glyph advances at MEASURE_PX; each character is measured once.
+    Shared by the GUI thread and the preflight, print and thumbnail workers: lookups are
+    plain dict reads, a new character is measured under the lock.
+    """
+    def __init__(self, family, bold, italic):
+        font = QFont(family)
+        font.setPixelSize(MEASURE_PX)
+        font.setBold(bold)
+        font.setItalic(italic)
+        self.fm = QFontMetricsF(font)
+        self.line_height = self.fm.height() / MEASURE_PX
+        self.ascent = self.fm.ascent() / MEASURE_PX
+        self.advances = {}
+        self._lock = threading.Lock()
+
+    def width(self, text):
+        """Advance of text in em units (kerning ignored)."""
+        adv = self.advances
+        total = 0.0
+        for ch in text:
+            w = adv.get(ch)
+            if w is None:
+                w = self._measure(ch)
+            total += w
+        return total
+
+    def _measure(self, ch):
+        with self._lock:
+            w = self.advances.get(ch)
+            if w is None:
+                w = self.advances[ch] = self.fm.horizontalAdvance(ch) / MEASURE_PX
+            return w
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def advance_cache(family, bold, italic):
+    key = (family, bool(bold), bool(italic))
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = AdvanceCache(*key)
+    return cache
+
+def line_widths(text, box_w, em, cache):
+    """Widths of the lines greedy word wrap gives at em in box_w (any one unit)."""
+    widths = []
+    space = cache.width(" ") * em
+    for paragraph in text.split("\n"):
+        used = 0.0
+        for word in paragraph.split(" "):
+            w = cache.width(word) * em
+            if used and used + space + w > box_w:
+                widths.append(used)
+                used = w
+            else:
+                used += (space if used else 0) + w
+        widths.append(used)
+    return widths
+
+def _lines(text, box_w, em, cache):
+    """Number of lines greedy word wrap needs at em (mm) in box_w (mm)."""
+    return len(line_widths(text, box_w, em, cache))
+
+def _widest_word(text, cache):
+    return max(cache.width(word) for word in text.split())
+
+def _largest(lo, hi, fits):
+    """Largest integer size in [lo, hi] with fits(size), binary search (lo if none fits)."""
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def fit_sizes(label, label_w_mm, label_h_mm, font_scale, dpi=RECORD_DPI):
+    """
+    {field key: point size} for fields with "fit" set: the largest size (up to the
+    field's own size) at which no word is wider than the label, then all fitted
+    fields shrink together until the whole wrapped text block fits the label height.
+    Text and margin sizes in mm depend on the dpi of the device printed to.
+    """
+    # The wider of the preview and print margins, so a fit never overflows either
+    box_w = label_w_mm - 2 * max(print_margin_mm(dpi), PREVIEW_MARGIN_MM)
+    fields = []
+    for key in TEXT_FIELDS:
+        field = label.get(key, {})
+        text = field_text(key, field.get("text", "")).strip()
+        if text:
+            cache = advance_cache(field.get("font", "Arial"), field.get("bold", False), field.get("italic", False))
+            fields.append((key, field, text, cache))
+    sizes = {}
+    for key, field, text, cache in fields:
+        if field.get("fit"):
+            widest = _widest_word(text, cache)
+            sizes[key] = _largest(MIN_SIZE, max(MIN_SIZE, int(field.get("size", 15))),
+                                  lambda s: widest * text_height_mm(s, font_scale, dpi) <= box_w)
+    if not sizes:
+        return sizes
+
+    def block_height(cap):
+        total = 0.0
+        for key, field, text, cache in fields:
+            size = min(sizes[key], cap) if key in sizes else field.get("size", 15)
+            em = text_height_mm(size, font_scale, dpi)
+            total += _lines(text, box_w, em, cache) * cache.line_height * em * LINE_HEIGHT
+        return total
+
+    top = max(sizes.values())
+    cap = _largest(MIN_SIZE, top, lambda c: block_height(c) <= label_h_mm)
+    return {key: min(size, cap) for key, size in sizes.items()}
+
+_fitted = OrderedDict()
+_fitted_lock = threading.Lock()  # the preflight worker fits labels off the GUI thread
+
+def fit_label(label, label_w_mm, label_h_mm, font_scale, dpi=RECORD_DPI):
+    """
+    The label with auto-fit field sizes resolved (the same label object when nothing
+    is fitted). Preview and print both call this with the print geometry, so they agree.
+    """
+    if not any(label.get(k, {}).get("fit") for k in TEXT_FIELDS):
+        return label
+    key = (label_fingerprint(label), label_w_mm, label_h_mm, font_scale, dpi)
+    with _fitted_lock:
+        sizes = _fitted.get(key)
+        if sizes is None:
+            sizes = fit_sizes(label, label_w_mm, label_h_mm, font_scale, dpi)
+            _fitted[key] = sizes
+            if len(_fitted) > FIT_CACHE_SIZE:
+                _fitted.popitem(last=False)
+        else:
+            _fitted.move_to_end(key)
+    fitted = dict(label)
+    for k, size in sizes.items():
+        fitted[k] = dict(label[k], size=size)
+    return fitted
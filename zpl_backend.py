@@ -0,0 +1,244 @@
+# zpl_backend.py
+
+import os
+import re
+import math
+import socket
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton, QLabel,
+    QFileDialog, QInputDialog, QMessageBox
+)
+from PyQt5.QtGui import QImage, QPainter, QColor, QFont, QFontMetrics, QIcon, QPixmap
+from PyQt5.QtCore import Qt, QRect, QRectF, QSize
+from PyQt5.QtSvg import QSvgRenderer
+
+from print_history import is_blank
+from text_fit import fit_label
+from label_layout import logo_path
+from label_units import TEXT_FIELDS, LINE_HEIGHT, field_text, print_margin_mm, px_to_mm, text_height_mm
+
+ZPL_DPI = 203  # 8 dots/mm, the common Zebra head; 300 dpi heads use 12 dots/mm
+CHAR_WIDTH = 0.55  # average ^A0 advance as a fraction of the font height, for line wrapping
+
+def zpl_escape(text):
+    """Field data is sent with ^FH: control characters become _XX hex escapes."""
+    return text.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+def logo_graphic(size_dots):
+    """Monochrome ~DG graphic of the logo: (bytes per row, hex data)."""
+    row_bytes = (size_dots + 7) // 8
+    img = QImage(size_dots, size_dots, QImage.Format_ARGB32)
+    img.fill(Qt.white)
+    painter = QPainter(img)
+    QSvgRenderer(logo_path()).render(painter, QRectF(0, 0, size_dots, size_dots))
+    painter.end()
+    rows = []
+    for y in range(size_dots):
+        bits = 0
+        for x in range(row_bytes * 8):
+            bits <<= 1
+            if x < size_dots and QColor(img.pixel(x, y)).lightness() < 128:
+                bits |= 1
+        rows.append(f"{bits:0{row_bytes * 2}X}")
+    return row_bytes, "".join(rows)
+
+class ZplBuilder:
+    """
+    Turns label dicts into ZPL II. Text is sent as native font commands (^A0 scalable
+    font, ^FB field blocks for wrapping and alignment, UTF-8 via ^CI28); bold is
+    emulated by a second pass offset by one dot, italic has no ZPL equivalent.
+    Logos are downloaded once per job as stored graphics (~DG) and recalled with ^XG.
+    Text, margin and logo keep the Qt print path's pixel sizes, as dots at the head's dpi.
+    """
+    def __init__(self, label_w_mm, label_h_mm, font_scale, dpi=ZPL_DPI):
+        self.dpi = dpi
+        self.dpmm = dpi / 25.4
+        self.width = round(label_w_mm * self.dpmm)
+        self.height = round(label_h_mm * self.dpmm)
+        self.font_scale = font_scale
+        self._graphics = {}  # size in dots -> stored graphic name
+
+    def dots(self, mm):
+        return max(1, round(mm * self.dpmm))
+
+    def font_dots(self, size):
+        return self.dots(text_height_mm(size, self.font_scale, self.dpi))
+
+    def _logo_command(self, logo):
+        if not logo or logo.get("position", "без лого") == "без лого" or not os.path.exists(logo_path()):
+            return [], ""
+        size = self.dots(px_to_mm(logo.get("size", 24) * self.font_scale, self.dpi))
+        download = []
+        if size not in self._graphics:
+            name = f"LG{size}"
+            row_bytes, data = logo_graphic(size)
+            download = [f"~DGR:{name}.GRF,{row_bytes * size},{row_bytes},{data}"]
+            self._graphics[size] = name
+        margin = self.dots(px_to_mm(6 * self.font_scale, self.dpi))
+        x = margin if logo.get("position") == "долу ляво" else self.width - size - margin
+        y = self.height - size - margin
+        return download, f"^FO{x},{y}^XGR:{self._graphics[size]}.GRF,1,1^FS"
+
+    def label(self, label):
+        """(graphic downloads, ^XA…^XZ format) for one label."""
+        label = fit_label(label, self.width / self.dpmm, self.height / self.dpmm, self.font_scale, self.dpi)
+        margin = self.dots(print_margin_mm(self.dpi))
+        box_w = self.width - 2 * margin
+        blocks = []
+        for key in TEXT_FIELDS:
+            field = label.get(key, {})
+            text = field_text(key, field.get("text", "").strip())
+            if not text:
+                continue
+            h = self.font_dots(field.get("size", 15))
+            per_line = max(1, int(box_w / (h * CHAR_WIDTH)))
+            lines = sum(max(1, math.ceil(len(part) / per_line)) for part in text.split("\n"))
+            blocks.append((field, text, h, lines))
+        total = sum(round(h * LINE_HEIGHT) * lines for _, _, h, lines in blocks)
+        y = max(0, (self.height - total) // 2)
+        out = ["^XA", "^CI28", f"^PW{self.width}", f"^LL{self.height}", "^LH0,0"]
+        for field, text, h, lines in blocks:
+            align = field.get("align", Qt.AlignCenter)
+            justify = "L" if align == Qt.AlignLeft else "R" if align == Qt.AlignRight else "C"
+            line_h = round(h * LINE_HEIGHT)
+            data = zpl_escape(text).replace("\n", "\\&")
+            passes = (0, 1) if field.get("bold", False) else (0,)
+            for dx in passes:
+                out.append(f"^FO{margin + dx},{y + (line_h - h) // 2}^A0N,{h},{h}"
+                           f"^FB{box_w},{lines},{line_h - h},{justify},0^FH^FD{data}^FS")
+            y += line_h * lines
+        downloads, logo_cmd = self._logo_command(label.get("logo"))
+        if logo_cmd:
+            out.append(logo_cmd)
+        out.append("^XZ")
+        return downloads, "\n".join(out)
+
+    def job(self, labels, copies=1):
+        """One ZPL job: every stored graphic once up front, then one format per non-blank label."""
+        downloads, formats = [], []
+        for label in labels:
+            if is_blank(label):
+                continue
+            dl, fmt = self.label(label)
+            downloads += dl
+            if copies > 1:
+                fmt = fmt.replace("^XZ", f"^PQ{copies}^XZ")
+            formats.append(fmt)
+        return "\n".join(downloads + formats) + "\n"
+
+def send_zpl(host, data, port=9100, timeout=10):
+    """Send a job to a networked Zebra printer (raw port 9100)."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(data.encode("utf-8"))
+
+# --- Offline preview: a stand-in renderer for the ZPL subset ZplBuilder emits ---
+
+_FORMAT_RE = re.compile(r"\^XA(.*?)\^XZ", re.S)
+_DG_RE = re.compile(r"~DGR:([^.]+)\.GRF,(\d+),(\d+),([0-9A-F]+)")
+_CMD_RE = re.compile(r"\^([A-Z][A-Z0-9@])([^\^~]*)")
+
+def _graphic_image(row_bytes, data):
+    rows = len(data) // (row_bytes * 2)
+    img = QImage(row_bytes * 8, rows, QImage.Format_ARGB32)
+    img.fill(Qt.transparent)
+    for y in range(rows):
+        bits = int(data[y * row_bytes * 2:(y + 1) * row_bytes * 2], 16)
+        for x in range(row_bytes * 8):
+            if bits >> (row_bytes * 8 - 1 - x) & 1:
+                img.setPixel(x, y, 0xff000000)
+    return img
+
+def _unescape(data):
+    return re.sub(r"_([0-9A-Fa-f]{2})", lambda m: chr(int(m.group(1), 16)), data).replace("\\&", "\n")
+
+def preview_zpl(zpl):
+    """Render every ^XA…^XZ format of a job to a QImage (1 pixel = 1 dot) for checking without a printer."""
+    graphics = {name: _graphic_image(int(rb), data) for name, _, rb, data in _DG_RE.findall(zpl)}
+    images = []
+    for body in _FORMAT_RE.findall(zpl):
+        cmds = _CMD_RE.findall(body)
+        params = {c: a for c, a in cmds}
+        img = QImage(int(params.get("PW", 400)), int(params.get("LL", 300)), QImage.Format_RGB32)
+        img.fill(Qt.white)
+        painter = QPainter(img)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setPen(Qt.black)
+        x = y = 0
+        font_h = 30
+        block = None
+        for cmd, args in cmds:
+            if cmd == "FO":
+                x, y = (int(v) for v in args.split(",")[:2])
+            elif cmd == "A0":
+                font_h = int(args.split(",")[1])
+            elif cmd == "FB":
+                w, lines, spacing, justify = args.split(",")[:4]
+                block = (int(w), int(lines), int(spacing), justify)
+            elif cmd == "FD":
+                font = QFont("Arial")
+                font.setPixelSize(font_h)
+                painter.setFont(font)
+                if block:
+                    w, lines, spacing, justify = block
+                    flags = {"L": Qt.AlignLeft, "R": Qt.AlignRight}.get(justify, Qt.AlignHCenter)
+                    line_h = max(font_h + spacing, QFontMetrics(font).height())
+                    painter.drawText(QRect(x, y, w, line_h * lines), flags | Qt.AlignTop | Qt.TextWordWrap,
+                                     _unescape(args))
+                else:
+                    painter.drawText(x, y + font_h, _unescape(args))
+                block = None
+            elif cmd == "XG":
+                name = args.split(",")[0].split(":")[-1].split(".")[0]
+                if name in graphics:
+                    painter.drawImage(x, y, graphics[name])
+        painter.end()
+        images.append(img)
+    return images
+
+class ZplPreviewDialog(QDialog):
+    """Shows the job as the stand-in renderer sees it; save it as .zpl or send it to a printer."""
+    def __init__(self, zpl, parent=None):
+        super().__init__(parent)
+        self.zpl = zpl
+        self.setWindowTitle("ZPL за термопринтер")
+        self.setMinimumSize(640, 480)
+        layout = QVBoxLayout(self)
+        self.previews = QListWidget()
+        self.previews.setViewMode(QListWidget.IconMode)
+        self.previews.setIconSize(QSize(240, 160))
+        self.previews.setResizeMode(QListWidget.Adjust)
+        for n, img in enumerate(preview_zpl(zpl), 1):
+            self.previews.addItem(QListWidgetItem(QIcon(QPixmap.fromImage(img)), str(n)))
+        layout.addWidget(self.previews, 1)
+        layout.addWidget(QLabel(f"Етикети: {self.previews.count()}, размер на заданието: "
+                                f"{len(zpl.encode('utf-8')) / 1024:.1f} KB"))
+        row = QHBoxLayout()
+        save_btn = QPushButton("Запази .zpl…")
+        save_btn.clicked.connect(self._save)
+        send_btn = QPushButton("Изпрати към принтер…")
+        send_btn.clicked.connect(self._send)
+        close_btn = QPushButton("Затвори")
+        close_btn.clicked.connect(self.accept)
+        row.addWidget(save_btn)
+        row.addWidget(send_btn)
+        row.addStretch(1)
+        row.addWidget(close_btn)
+        layout.addLayout(row)
+
+    def _save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Запази ZPL", "", "ZPL (*.zpl)")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.zpl)
+
+    def _send(self):
+        host, ok = QInputDialog.getText(self, "Изпрати към принтер", "IP адрес на принтера:")
+        if not ok or not host.strip():
+            return
+        try:
+            send_zpl(host.strip(), self.zpl)
+        except OSError as e:
+            QMessageBox.warning(self, "Грешка", f"Неуспешно изпращане:\n{e}")
+            return
+        QMessageBox.information(self, "Успех", "Заданието е изпратено.")